@@ -1,13 +1,29 @@
 import os
+import asyncio
+import threading
+import time
+import weakref
 import requests
 
-from typing import Dict, Union
+from enum import Enum
+from pathlib import Path
+from typing import Dict, IO, List, Optional, Tuple, Union
+from requests.adapters import HTTPAdapter
 from importlib_metadata import version
 from urllib import parse
 from dotenv import load_dotenv
-from ratelimit import limits
 
 from escavador.exceptions import ApiKeyNotFoundException
+from escavador.hooks import RequestHooks, Requisicao
+from escavador.rate_limit import RateLimiter, TokenBucket, SqliteTokenBucket
+from escavador.retry import RetryPolicy
+from escavador.json_decoder import JsonDecoder, decodificador_padrao
+from escavador.resources.helpers.documento import Documento, TAMANHO_BLOCO
+
+try:
+    import aiohttp
+except ImportError:  # dependência opcional, necessária apenas para o AsyncApi
+    aiohttp = None
 
 load_dotenv()
 
@@ -15,14 +31,52 @@ SUPPORTED_VERSIONS = [1, 2]
 
 DEFAULT_RATE_LIMIT = 500
 
+DEFAULT_POOL_CONNECTIONS = 10
+
+DEFAULT_POOL_MAXSIZE = 10
+
+DEFAULT_ASYNC_POOL_LIMIT = 100
+
 __APIKEY__ = None
 
 
+def _rate_limiter_padrao(max_requests_per_min: int) -> RateLimiter:
+    """
+    Cria o limitador de requisições padrão. Se a variável `ESCAVADOR_RATE_LIMIT_DB` estiver definida, o
+    limite é compartilhado por todos os processos que apontarem para o mesmo arquivo.
+
+    :param max_requests_per_min: quantidade de requisições permitidas por minuto
+    :return: RateLimiter
+    """
+    path = os.environ.get("ESCAVADOR_RATE_LIMIT_DB")
+    if path:
+        return SqliteTokenBucket(path, calls=max_requests_per_min, period=60)
+    return TokenBucket(calls=max_requests_per_min, period=60)
+
+
 class Api(object):
     MAX_REQUESTS_PER_MIN = int(
         os.environ.get("ESCAVADOR_MAX_REQ_PER_MIN", DEFAULT_RATE_LIMIT)
     )
 
+    rate_limiter: RateLimiter = _rate_limiter_padrao(MAX_REQUESTS_PER_MIN)
+    RATE_LIMIT_TIMEOUT: Optional[float] = None
+
+    retry_policy: RetryPolicy = RetryPolicy()
+
+    json_decoder: JsonDecoder = decodificador_padrao()
+
+    hooks: List[RequestHooks] = []
+
+    POOL_CONNECTIONS = int(
+        os.environ.get("ESCAVADOR_POOL_CONNECTIONS", DEFAULT_POOL_CONNECTIONS)
+    )
+    POOL_MAXSIZE = int(os.environ.get("ESCAVADOR_POOL_MAXSIZE", DEFAULT_POOL_MAXSIZE))
+    POOL_BLOCK = False
+
+    _session: Optional[requests.Session] = None
+    _session_lock = threading.Lock()
+
     def __init__(self, version):
         global __APIKEY__
         if version not in SUPPORTED_VERSIONS:
@@ -48,6 +102,85 @@ class Api(object):
         global __APIKEY__
         __APIKEY__ = value
 
+    def __enter__(self) -> "Api":
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        # a sessão é compartilhada por todas as instâncias, então sair do bloco não a fecha. Para encerrar as
+        # conexões do processo, use `Api.fechar_pool()`
+        pass
+
+    @classmethod
+    def session(cls) -> requests.Session:
+        """
+        Retorna a sessão HTTP compartilhada por todas as instâncias de `Api`
+
+        A sessão é criada sob demanda e mantém um pool de conexões keep-alive, evitando um novo
+        handshake TCP + TLS a cada requisição. O pool é thread-safe.
+
+        :return: requests.Session
+        """
+        session = cls._session
+        if session is None:
+            with cls._session_lock:
+                if cls._session is None:
+                    cls._session = cls._nova_session()
+                session = cls._session
+        return session
+
+    @classmethod
+    def _nova_session(cls) -> requests.Session:
+        session = requests.Session()
+        adapter = HTTPAdapter(
+            pool_connections=cls.POOL_CONNECTIONS,
+            pool_maxsize=cls.POOL_MAXSIZE,
+            pool_block=cls.POOL_BLOCK,
+        )
+        session.mount("https://", adapter)
+        session.mount("http://", adapter)
+        return session
+
+    @classmethod
+    def configurar_pool(
+        cls,
+        pool_connections: Optional[int] = None,
+        pool_maxsize: Optional[int] = None,
+        pool_block: Optional[bool] = None,
+    ):
+        """
+        Configura o pool de conexões compartilhado. A sessão atual é fechada e uma nova é criada
+        na próxima requisição.
+
+        :param pool_connections: quantidade de hosts distintos mantidos no pool
+        :param pool_maxsize: quantidade máxima de conexões mantidas abertas por host
+        :param pool_block: se True, aguarda uma conexão livre ao invés de abrir conexões
+        excedentes quando o pool estiver cheio, limitando as conexões simultâneas por host
+        """
+        with cls._session_lock:
+            if pool_connections is not None:
+                cls.POOL_CONNECTIONS = pool_connections
+            if pool_maxsize is not None:
+                cls.POOL_MAXSIZE = pool_maxsize
+            if pool_block is not None:
+                cls.POOL_BLOCK = pool_block
+            cls._fechar_session()
+
+    @classmethod
+    def fechar_pool(cls):
+        """
+        Fecha a sessão compartilhada e todas as conexões abertas do pool, para todas as instâncias de `Api`.
+
+        Requisições feitas depois disso abrem uma nova sessão.
+        """
+        with cls._session_lock:
+            cls._fechar_session()
+
+    @classmethod
+    def _fechar_session(cls):
+        if cls._session is not None:
+            cls._session.close()
+            cls._session = None
+
     def headers(self) -> Dict:
         """
         Retorna os headers padrões para a API
@@ -61,13 +194,14 @@ class Api(object):
             "Accept-Encoding": "gzip, deflate, br",
         }
 
-    @limits(calls=MAX_REQUESTS_PER_MIN, period=60)
     def request(
         self, method: str, url: str, data: Dict = None, params: Dict = None, **kwargs
     ) -> Union[Dict, bytes]:
         """
         Executa um request HTTP para a API
 
+        Caso o limite de requisições por minuto tenha sido atingido, aguarda até que seja possível executá-lo.
+        Falhas transitórias são tentadas novamente de acordo com `retry_policy`.
         Keyword arguments extras são adicionados ao corpo da requisição (json)
 
         :param method: método HTTP
@@ -76,6 +210,150 @@ class Api(object):
         :param params: parâmetros a serem enviados na URL
         :return: Union[Dict, bytes]
         """
+        url, data, params = self._preparar(url, data, params, **kwargs)
+        resp, _ = self._enviar(method, url, data, params)
+        with resp:
+            if resp.headers["Content-Type"] == "application/pdf":
+                return resp.content
+            return self._resposta_json(resp)
+
+    def baixar(
+        self,
+        url: str,
+        destino: Union[str, Path, IO],
+        params: Dict = None,
+        sha256: Optional[str] = None,
+    ) -> Dict:
+        """
+        Baixa um arquivo da API diretamente para o disco (ou para um arquivo aberto), em blocos
+
+        Ao contrário de `request`, o arquivo nunca fica inteiro em memória: o consumo de memória é o mesmo
+        para qualquer tamanho de documento. Veja `Documento.salvar_stream`.
+
+        :param url: slug do endpoint do arquivo
+        :param destino: caminho do arquivo a ser criado, ou um arquivo binário já aberto
+        :param params: parâmetros a serem enviados na URL
+        :param sha256: hash SHA-256 esperado do arquivo, em hexadecimal
+        :return: o resultado de `Documento.salvar_stream`, ou o json da resposta se ela não for um arquivo
+        """
+        url, _, params = self._preparar(url, None, params)
+        resp, requisicao = self._enviar("GET", url, None, params, stream=True)
+        with resp:
+            if resp.headers["Content-Type"] != "application/pdf":
+                return self._resposta_json(resp)
+            try:
+                return Documento.salvar_stream(resp.iter_content(TAMANHO_BLOCO), destino, sha256=sha256)
+            except Exception as erro:
+                # o corpo é lido depois de `_enviar` retornar: falhas no meio do download são notificadas aqui
+                if requisicao is not None:
+                    self._notificar("ao_falhar", requisicao, erro, requisicao.duracao)
+                raise
+
+    def _enviar(
+        self,
+        method: str,
+        url: str,
+        data: Optional[Dict],
+        params: Optional[Dict],
+        stream: bool = False,
+    ) -> Tuple[requests.Response, Optional[Requisicao]]:
+        """
+        Envia a requisição, respeitando o limite de requisições e tentando novamente as falhas transitórias
+
+        :return: a resposta, que deve ser fechada por quem a recebe, e a última tentativa notificada aos ganchos
+        (None se não há ganchos)
+        """
+        hooks = self.hooks
+        requisicao = None
+        tentativa = 0
+        while True:
+            tentativa += 1
+            aguardado = self.rate_limiter.acquire(timeout=self.RATE_LIMIT_TIMEOUT)
+            self.retry_policy.registrar_tentativa(tentativa)
+            if hooks:
+                requisicao = Requisicao(method, url, tentativa, aguardado)
+                self._notificar("antes_da_requisicao", requisicao)
+            try:
+                resp = self.session().request(
+                    method=method,
+                    url=url,
+                    headers=self.headers(),
+                    json=data,
+                    params=params,
+                    stream=stream,
+                )
+            except Exception as erro:
+                if hooks:
+                    self._notificar("ao_falhar", requisicao, erro, requisicao.duracao)
+                if not isinstance(erro, (requests.ConnectionError, requests.Timeout)):
+                    raise
+                if not self.retry_policy.deve_tentar_novamente(method, tentativa, erro=erro):
+                    raise
+                espera = self.retry_policy.espera(tentativa)
+            else:
+                if hooks:
+                    duracao = requisicao.duracao
+                    transferidos = self._bytes_transferidos(resp, stream)
+                    self._notificar("apos_resposta", requisicao, resp.status_code, transferidos, duracao)
+                if not self.retry_policy.deve_tentar_novamente(method, tentativa, status=resp.status_code):
+                    return resp, requisicao
+                resp.close()
+                espera = self.retry_policy.espera(tentativa, resp.headers.get("Retry-After"))
+
+            if hooks:
+                self._notificar("ao_tentar_novamente", requisicao, espera)
+            time.sleep(espera)
+
+    @staticmethod
+    def _bytes_transferidos(resp: requests.Response, stream: bool) -> int:
+        """
+        Bytes do corpo da resposta recebidos pela rede, ainda comprimidos. Sem stream, o corpo já foi lido pelo
+        requests e a contagem vem do urllib3. Com stream, nada foi lido ainda, e vale o Content-Length.
+        """
+        if not stream:
+            try:
+                return resp.raw.tell()
+            except (AttributeError, OSError):
+                pass
+        return int(resp.headers.get("Content-Length") or 0)
+
+    def _notificar(self, evento: str, *args):
+        for hook in self.hooks:
+            getattr(hook, evento)(*args)
+
+    def _resposta_json(self, resp: requests.Response) -> Dict:
+        content = self._decodificar(resp.content, resp.status_code, resp)
+        code = resp.status_code
+        success = code < 400
+        return {"resposta": content, "http_status": code, "sucesso": success}
+
+    @classmethod
+    def _decodificar(cls, corpo: bytes, status: int, resp: Optional[requests.Response] = None):
+        """
+        Decodifica o corpo json da resposta com `json_decoder`
+
+        Um corpo que não é json (ex: a página HTML de um 502 do gateway) lança
+        `requests.exceptions.JSONDecodeError`, como o `resp.json()` do requests, qualquer que seja o decodificador.
+        """
+        try:
+            return cls.json_decoder(corpo)
+        except ValueError as erro:
+            documento = corpo.decode("utf-8", errors="replace")
+            raise requests.exceptions.JSONDecodeError(
+                f"A resposta com status {status} não é um json válido: {erro}",
+                documento,
+                getattr(erro, "pos", 0) or 0,
+                response=resp,
+            ) from erro
+
+    def _preparar(
+        self, url: str, data: Optional[Dict], params: Optional[Dict], **kwargs
+    ) -> Tuple[str, Optional[Dict], Optional[Dict]]:
+        """
+        Monta a url completa e remove os valores nulos do corpo e da query string da requisição
+
+        :return: tupla com a url, o corpo e a query string da requisição
+        """
         url = parse.urljoin(self.base_url, url)
         if data is not None:
             data = {k: v for k, v in data.items() if v is not None}
@@ -84,16 +362,157 @@ class Api(object):
             )
         if params is not None:
             params = {k: v for k, v in params.items() if v is not None}
-        with requests.Session() as session:
-            with session.request(
-                method=method, url=url, headers=self.headers(), json=data, params=params
-            ) as resp:
-                if resp.headers["Content-Type"] == "application/pdf":
-                    return resp.content
-                content = resp.json()
-                code = resp.status_code
-                success = code < 400
-                return {"resposta": content, "http_status": code, "sucesso": success}
+        return url, data, params
+
+
+class AsyncApi(Api):
+    """Versão assíncrona de `Api`, baseada no aiohttp.
+
+    Cada event loop possui sua própria sessão, compartilhada por todas as instâncias de `AsyncApi`
+    que executam nele, com até `POOL_LIMIT` conexões simultâneas.
+
+    A sessão não é fechada automaticamente quando o event loop termina: chame `AsyncApi.fechar_pool_async()` ao
+    final da corrotina principal, antes de o loop ser encerrado (ex: no fim da função passada a `asyncio.run`).
+    Caso contrário, cada loop encerrado deixa uma sessão aberta, e o aiohttp avisa "Unclosed client session".
+
+    >>> async def main():
+    ...     try:
+    ...         return await Processo.por_numero_async("0000000-00.0000.0.00.0000")
+    ...     finally:
+    ...         await AsyncApi.fechar_pool_async()
+    >>> asyncio.run(main()) # doctest: +SKIP
+    """
+
+    POOL_LIMIT = int(os.environ.get("ESCAVADOR_ASYNC_POOL_LIMIT", DEFAULT_ASYNC_POOL_LIMIT))
+
+    _async_sessions: "weakref.WeakKeyDictionary[asyncio.AbstractEventLoop, aiohttp.ClientSession]" = (
+        weakref.WeakKeyDictionary()
+    )
+
+    def __init__(self, version):
+        if aiohttp is None:
+            raise ImportError(
+                "O AsyncApi depende do aiohttp. Instale-o com `pip install escavador[async]`"
+            )
+        super().__init__(version)
+
+    async def __aenter__(self) -> "AsyncApi":
+        return self
+
+    async def __aexit__(self, exc_type, exc_value, traceback):
+        # assim como no `Api`, a sessão do event loop é compartilhada. Use `AsyncApi.fechar_pool_async()`
+        pass
+
+    @classmethod
+    def async_session(cls) -> "aiohttp.ClientSession":
+        """
+        Retorna a sessão HTTP do event loop em execução, criando-a caso ainda não exista
+
+        :return: aiohttp.ClientSession
+        """
+        loop = asyncio.get_running_loop()
+        with cls._session_lock:
+            session = cls._async_sessions.get(loop)
+            if session is None or session.closed:
+                session = aiohttp.ClientSession(
+                    connector=aiohttp.TCPConnector(limit=cls.POOL_LIMIT)
+                )
+                cls._async_sessions[loop] = session
+        return session
+
+    @classmethod
+    async def fechar_pool_async(cls):
+        """
+        Fecha a sessão do event loop em execução e todas as suas conexões abertas, para todas as instâncias de
+        `AsyncApi`. Deve ser chamado antes de o event loop terminar; uma nova sessão é criada na próxima requisição.
+        """
+        with cls._session_lock:
+            session = cls._async_sessions.pop(asyncio.get_running_loop(), None)
+        if session is not None:
+            await session.close()
+
+    async def request(
+        self, method: str, url: str, data: Dict = None, params: Dict = None, **kwargs
+    ) -> Union[Dict, bytes]:
+        """
+        Executa um request HTTP assíncrono para a API
+
+        Keyword arguments extras são adicionados ao corpo da requisição (json)
+
+        :param method: método HTTP
+        :param url: slug do endpoint a ser chamado
+        :param data: dados a serem enviados no formato json
+        :param params: parâmetros a serem enviados na URL
+        :return: Union[Dict, bytes]
+        """
+        url, data, params = self._preparar(url, data, params, **kwargs)
+        hooks = self.hooks
+        tentativa = 0
+        while True:
+            tentativa += 1
+            aguardado = await self.rate_limiter.acquire_async(timeout=self.RATE_LIMIT_TIMEOUT)
+            self.retry_policy.registrar_tentativa(tentativa)
+            if hooks:
+                requisicao = Requisicao(method, url, tentativa, aguardado)
+                self._notificar("antes_da_requisicao", requisicao)
+            try:
+                async with self.async_session().request(
+                    method=method,
+                    url=url,
+                    headers=self.headers(),
+                    json=data,
+                    params=self._params_aiohttp(params),
+                ) as resp:
+                    if self.retry_policy.deve_tentar_novamente(method, tentativa, status=resp.status):
+                        if hooks:
+                            duracao = requisicao.duracao
+                            transferidos = resp.content_length or 0
+                            self._notificar("apos_resposta", requisicao, resp.status, transferidos, duracao)
+                        espera = self.retry_policy.espera(tentativa, resp.headers.get("Retry-After"))
+                    else:
+                        corpo = await resp.read()
+                        if hooks:
+                            # o aiohttp descomprime o corpo, então o tamanho na rede é o do Content-Length
+                            duracao = requisicao.duracao
+                            transferidos = len(corpo) if resp.content_length is None else resp.content_length
+                            self._notificar("apos_resposta", requisicao, resp.status, transferidos, duracao)
+                        if resp.headers["Content-Type"] == "application/pdf":
+                            return corpo
+                        content = self._decodificar(corpo, resp.status)
+                        code = resp.status
+                        success = code < 400
+                        return {"resposta": content, "http_status": code, "sucesso": success}
+            except Exception as erro:
+                if hooks:
+                    self._notificar("ao_falhar", requisicao, erro, requisicao.duracao)
+                if not isinstance(erro, (aiohttp.ClientConnectionError, asyncio.TimeoutError)):
+                    raise
+                if not self.retry_policy.deve_tentar_novamente(method, tentativa, erro=erro):
+                    raise
+                espera = self.retry_policy.espera(tentativa)
+
+            if hooks:
+                self._notificar("ao_tentar_novamente", requisicao, espera)
+            await asyncio.sleep(espera)
+
+    @staticmethod
+    def _params_aiohttp(params: Optional[Dict]) -> Optional[List[Tuple[str, str]]]:
+        """
+        Converte a query string para o formato aceito pelo aiohttp, expandindo listas em
+        parâmetros repetidos como o requests faz
+
+        :return: lista de pares chave-valor
+        """
+        if params is None:
+            return None
+
+        pares = []
+        for chave, valor in params.items():
+            for item in valor if isinstance(valor, (list, tuple)) else [valor]:
+                if isinstance(item, Enum):
+                    item = item.value
+                pares.append((chave, item if isinstance(item, str) else str(item)))
+        return pares
 
 
 def config(api_key: str):
@@ -0,0 +1,183 @@
+"""Cache local de respostas de endpoints somente leitura
+
+O cache é opcional e desabilitado por padrão. Para habilitá-lo, atribua uma instância de `ResponseCache` a
+`Method.cache`:
+
+>>> from escavador.method import Method
+>>> from escavador.cache import SqliteResponseCache
+>>> Method.cache = SqliteResponseCache("escavador-cache.db") # doctest: +SKIP
+
+Apenas requisições GET bem-sucedidas para endpoints com TTL definido são armazenadas.
+"""
+import abc
+import json
+import os
+import re
+import sqlite3
+import threading
+import time
+from pathlib import Path
+from typing import Dict, Optional, Pattern, Union
+from urllib import parse
+
+TTLS_PADRAO = {
+    r"/api/v2/tribunais$": 24 * 60 * 60,
+    r"/api/v2/processos/numero_cnj/[^/]+$": 5 * 60,
+    r"/api/v2/processos/numero_cnj/[^/]+/movimentacoes$": 5 * 60,
+    r"/api/v2/(envolvido|advogado)/resumo$": 10 * 60,
+    r"/api/v2/(envolvido|advogado)/processos$": 5 * 60,
+}
+
+
+def chave_requisicao(
+    method: str, url: str, params: Optional[Dict] = None, data: Optional[Dict] = None, **kwargs
+) -> str:
+    """Gera uma chave que identifica unicamente uma requisição
+
+    :param method: método HTTP
+    :param url: url completa do endpoint
+    :param params: parâmetros da query string
+    :param data: corpo da requisição
+    :return: chave da requisição
+    """
+    return json.dumps(
+        [method.upper(), url, params or {}, data or {}, kwargs],
+        sort_keys=True,
+        ensure_ascii=False,
+        default=str,
+    )
+
+
+class ResponseCache(object):
+    """Interface dos caches de respostas.
+
+    :attr ttls: tempo de vida, em segundos, das respostas de cada endpoint. As chaves são expressões regulares
+    aplicadas ao caminho da url (ex: "/api/v2/tribunais")
+    :attr ttl_padrao: tempo de vida das respostas de endpoints que não estão em `ttls`. Se 0, não são armazenadas
+    """
+
+    __metaclass__ = abc.ABCMeta
+
+    def __init__(self, ttls: Optional[Dict[str, float]] = None, ttl_padrao: float = 0):
+        self.ttls: Dict[Pattern, float] = {
+            re.compile(padrao): ttl for padrao, ttl in (TTLS_PADRAO if ttls is None else ttls).items()
+        }
+        self.ttl_padrao = ttl_padrao
+        self._estatisticas = dict.fromkeys(("hits", "misses", "expirados", "despejos"), 0)
+        self._lock = threading.Lock()
+
+    def ttl(self, url: str) -> float:
+        """Retorna o tempo de vida das respostas do endpoint da url informada.
+
+        :param url: url completa do endpoint
+        :return: tempo de vida em segundos. 0 se as respostas não devem ser armazenadas
+        """
+        caminho = parse.urlsplit(url).path
+        for padrao, ttl in self.ttls.items():
+            if padrao.search(caminho):
+                return ttl
+        return self.ttl_padrao
+
+    @abc.abstractmethod
+    def obter(self, chave: str) -> Optional[Dict]:
+        """Retorna a resposta armazenada para a chave, ou None se não houver uma resposta válida."""
+        pass
+
+    @abc.abstractmethod
+    def guardar(self, chave: str, resposta: Dict, ttl: float):
+        """Armazena a resposta por `ttl` segundos."""
+        pass
+
+    @abc.abstractmethod
+    def limpar(self):
+        """Remove todas as respostas armazenadas."""
+        pass
+
+    def _registrar(self, estatistica: str, quantidade: int = 1):
+        with self._lock:
+            self._estatisticas[estatistica] += quantidade
+
+    @property
+    def estatisticas(self) -> Dict[str, float]:
+        """Quantidade de hits, misses, respostas expiradas e despejadas, e a taxa de acerto do cache."""
+        with self._lock:
+            estatisticas = dict(self._estatisticas)
+        consultas = estatisticas["hits"] + estatisticas["misses"]
+        estatisticas["taxa_acerto"] = estatisticas["hits"] / consultas if consultas else 0.0
+        return estatisticas
+
+
+class SqliteResponseCache(ResponseCache):
+    """Cache de respostas persistido em um arquivo SQLite, que pode ser compartilhado entre processos.
+
+    Quando a quantidade de respostas armazenadas passa de `max_entradas`, as menos acessadas recentemente são
+    removidas (LRU).
+
+    :attr path: caminho do arquivo SQLite
+    :attr max_entradas: quantidade máxima de respostas armazenadas
+    """
+
+    def __init__(
+        self,
+        path: Union[str, Path],
+        ttls: Optional[Dict[str, float]] = None,
+        ttl_padrao: float = 0,
+        max_entradas: int = 10000,
+    ):
+        super().__init__(ttls, ttl_padrao)
+        self.path = os.fspath(path)
+        self.max_entradas = max_entradas
+        self._local = threading.local()
+        conexao = self._conexao()
+        conexao.execute(
+            "CREATE TABLE IF NOT EXISTS respostas (chave TEXT PRIMARY KEY, resposta TEXT NOT NULL, "
+            "expira_em REAL NOT NULL, acessado_em REAL NOT NULL)"
+        )
+        conexao.execute("CREATE INDEX IF NOT EXISTS respostas_acessado_em ON respostas (acessado_em)")
+
+    def _conexao(self) -> sqlite3.Connection:
+        conexao = getattr(self._local, "conexao", None)
+        if conexao is None:
+            conexao = sqlite3.connect(self.path, timeout=30, isolation_level=None)
+            conexao.execute("PRAGMA journal_mode=WAL")
+            self._local.conexao = conexao
+        return conexao
+
+    def obter(self, chave: str) -> Optional[Dict]:
+        conexao = self._conexao()
+        agora = time.time()
+        linha = conexao.execute(
+            "SELECT resposta, expira_em FROM respostas WHERE chave = ?", (chave,)
+        ).fetchone()
+
+        if linha is None:
+            self._registrar("misses")
+            return None
+        if linha[1] <= agora:
+            conexao.execute("DELETE FROM respostas WHERE chave = ?", (chave,))
+            self._registrar("expirados")
+            self._registrar("misses")
+            return None
+
+        conexao.execute("UPDATE respostas SET acessado_em = ? WHERE chave = ?", (agora, chave))
+        self._registrar("hits")
+        return json.loads(linha[0])
+
+    def guardar(self, chave: str, resposta: Dict, ttl: float):
+        conexao = self._conexao()
+        agora = time.time()
+        conexao.execute(
+            "INSERT OR REPLACE INTO respostas (chave, resposta, expira_em, acessado_em) VALUES (?, ?, ?, ?)",
+            (chave, json.dumps(resposta, ensure_ascii=False), agora + ttl, agora),
+        )
+        excedentes = conexao.execute("SELECT COUNT(*) FROM respostas").fetchone()[0] - self.max_entradas
+        if excedentes > 0:
+            conexao.execute(
+                "DELETE FROM respostas WHERE chave IN "
+                "(SELECT chave FROM respostas ORDER BY acessado_em LIMIT ?)",
+                (excedentes,),
+            )
+            self._registrar("despejos", excedentes)
+
+    def limpar(self):
+        self._conexao().execute("DELETE FROM respostas")
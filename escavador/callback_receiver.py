@@ -0,0 +1,585 @@
+"""Recebe os callbacks enviados pelo Escavador, processando-os em segundo plano
+
+O recebimento só valida o conteúdo e o coloca em uma fila limitada, respondendo imediatamente. Os callbacks são
+processados por um pool de threads, e os ids dos callbacks processados são marcados como recebidos em lotes.
+Callbacks cujo processamento falha voltam para a fila e são tentados novamente, até `max_tentativas` vezes.
+"""
+import abc
+import heapq
+import hmac
+import itertools
+import json
+import os
+import queue
+import sqlite3
+import threading
+import time
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import Callable, Dict, Iterable, List, Optional, Tuple, Union
+from socketserver import ThreadingMixIn
+from wsgiref.simple_server import make_server, WSGIRequestHandler, WSGIServer
+
+from escavador.v1.resources.callback import Callback
+
+
+@dataclass
+class CallbackRecebido:
+    """Callback recebido, aguardando processamento.
+
+    :attr evento: o evento do callback (ex: "diario_movimentacao_nova")
+    :attr dados: o json enviado pelo Escavador
+    :attr id: id do callback, usado para marcá-lo como recebido. None se o json não o informa.
+    :attr recebido_em: timestamp do recebimento
+    :attr chave: identificador do callback na fila
+    :attr tentativas: quantidade de vezes em que o processamento do callback falhou
+    :attr erro: descrição da última falha
+    """
+
+    evento: str
+    dados: Dict
+    id: Optional[int] = None
+    recebido_em: float = field(default_factory=time.time)
+    chave: Optional[int] = None
+    tentativas: int = 0
+    erro: Optional[str] = None
+
+    @classmethod
+    def from_json(cls, json_dict: Dict) -> "CallbackRecebido":
+        return cls(
+            evento=json_dict["event"],
+            dados=json_dict,
+            id=json_dict.get("callback_id", json_dict.get("id")),
+        )
+
+
+class CallbackQueue(object):
+    """Fila limitada de callbacks recebidos.
+
+    Um callback devolvido com `devolver` volta para a fila após uma espera que dobra a cada falha, a partir de
+    `espera_tentativas` segundos (até 5 minutos). Ao atingir `max_tentativas` falhas, deixa de ser retirado e fica
+    disponível em `falhas()`.
+
+    :attr max_tentativas: quantidade máxima de vezes que um callback é processado
+    :attr espera_tentativas: espera, em segundos, antes de processar novamente um callback que falhou
+    """
+
+    __metaclass__ = abc.ABCMeta
+
+    max_tentativas: int = 5
+    espera_tentativas: float = 5.0
+
+    def _espera(self, tentativas: int) -> float:
+        return min(self.espera_tentativas * 2 ** (tentativas - 1), 300.0)
+
+    @abc.abstractmethod
+    def colocar(self, callback: CallbackRecebido) -> bool:
+        """Coloca o callback na fila, retornando False (sem bloquear) se ela estiver cheia."""
+        pass
+
+    @abc.abstractmethod
+    def retirar(self, timeout: float) -> Optional[CallbackRecebido]:
+        """Retira o próximo callback da fila, aguardando até `timeout` segundos. None se a fila continuar vazia."""
+        pass
+
+    def concluir(self, callback: CallbackRecebido):
+        """Informa que o callback retirado já foi processado."""
+        pass
+
+    @abc.abstractmethod
+    def devolver(self, callback: CallbackRecebido, erro: BaseException):
+        """Informa que o processamento do callback retirado falhou, devolvendo-o para a fila ou, se já atingiu
+        `max_tentativas`, movendo-o para as falhas."""
+        pass
+
+    @abc.abstractmethod
+    def falhas(self) -> List[CallbackRecebido]:
+        """Callbacks que atingiram `max_tentativas` sem serem processados."""
+        pass
+
+
+class MemoryCallbackQueue(CallbackQueue):
+    """Fila em memória. Os callbacks ainda não processados são perdidos se o processo terminar.
+
+    :attr tamanho_maximo: quantidade máxima de callbacks aguardando processamento
+    """
+
+    def __init__(self, tamanho_maximo: int = 10000, max_tentativas: int = 5, espera_tentativas: float = 5.0):
+        self.tamanho_maximo = tamanho_maximo
+        self.max_tentativas = max_tentativas
+        self.espera_tentativas = espera_tentativas
+        self._fila = queue.Queue(maxsize=tamanho_maximo)
+        self._lock = threading.Lock()
+        # callbacks devolvidos, aguardando a próxima tentativa: (disponível em, ordem, callback)
+        self._adiados: List[Tuple[float, int, CallbackRecebido]] = []
+        self._ordem = itertools.count()
+        self._falhas: List[CallbackRecebido] = []
+
+    def colocar(self, callback: CallbackRecebido) -> bool:
+        try:
+            self._fila.put_nowait(callback)
+        except queue.Full:
+            return False
+        return True
+
+    def retirar(self, timeout: float) -> Optional[CallbackRecebido]:
+        with self._lock:
+            if self._adiados:
+                restante = self._adiados[0][0] - time.monotonic()
+                if restante <= 0:
+                    return heapq.heappop(self._adiados)[2]
+                timeout = max(0.0, min(timeout, restante))
+        try:
+            return self._fila.get(timeout=timeout)
+        except queue.Empty:
+            return None
+
+    def devolver(self, callback: CallbackRecebido, erro: BaseException):
+        callback.tentativas += 1
+        callback.erro = repr(erro)
+        with self._lock:
+            if callback.tentativas >= self.max_tentativas:
+                self._falhas.append(callback)
+            else:
+                disponivel_em = time.monotonic() + self._espera(callback.tentativas)
+                heapq.heappush(self._adiados, (disponivel_em, next(self._ordem), callback))
+
+    def falhas(self) -> List[CallbackRecebido]:
+        with self._lock:
+            return list(self._falhas)
+
+    def __len__(self):
+        with self._lock:
+            return self._fila.qsize() + len(self._adiados)
+
+
+class SqliteCallbackQueue(CallbackQueue):
+    """Fila persistida em um arquivo SQLite: um callback só sai do arquivo depois de processado.
+
+    Vários processos podem usar o mesmo arquivo. Um callback retirado fica reservado por `prazo_processamento`
+    segundos: se não for concluído nem devolvido nesse prazo (ex: o processo terminou durante o processamento),
+    volta a ser retirado por qualquer processo. Callbacks cujo processamento falhou voltam após a espera, então
+    cada callback é processado pelo menos uma vez. Os que atingem `max_tentativas` continuam no arquivo, em
+    `falhas()`.
+
+    :attr path: caminho do arquivo SQLite
+    :attr tamanho_maximo: quantidade máxima de callbacks aguardando processamento
+    :attr prazo_processamento: segundos que um callback retirado fica reservado. Deve ser maior que o tempo de
+    processamento de um callback, ou ele pode ser processado duas vezes ao mesmo tempo
+    """
+
+    # valores da coluna `retirado`
+    _PENDENTE, _RETIRADO, _FALHOU = 0, 1, 2
+
+    def __init__(
+        self,
+        path: Union[str, Path],
+        tamanho_maximo: int = 100000,
+        max_tentativas: int = 5,
+        espera_tentativas: float = 5.0,
+        prazo_processamento: float = 600.0,
+    ):
+        self.path = os.fspath(path)
+        self.tamanho_maximo = tamanho_maximo
+        self.max_tentativas = max_tentativas
+        self.espera_tentativas = espera_tentativas
+        self.prazo_processamento = prazo_processamento
+        self._local = threading.local()
+        self._disponivel = threading.Condition()
+        conexao = self._conexao()
+        conexao.execute(
+            "CREATE TABLE IF NOT EXISTS callbacks (chave INTEGER PRIMARY KEY AUTOINCREMENT, "
+            "dados TEXT NOT NULL, recebido_em REAL NOT NULL, retirado INTEGER NOT NULL DEFAULT 0, "
+            "tentativas INTEGER NOT NULL DEFAULT 0, disponivel_em REAL NOT NULL DEFAULT 0, erro TEXT)"
+        )
+        # arquivos criados antes das novas tentativas não possuem essas colunas
+        existentes = {linha[1] for linha in conexao.execute("PRAGMA table_info(callbacks)")}
+        for nome, definicao in (
+            ("tentativas", "INTEGER NOT NULL DEFAULT 0"),
+            ("disponivel_em", "REAL NOT NULL DEFAULT 0"),
+            ("erro", "TEXT"),
+        ):
+            if nome not in existentes:
+                conexao.execute(f"ALTER TABLE callbacks ADD COLUMN {nome} {definicao}")
+
+    def _conexao(self) -> sqlite3.Connection:
+        conexao = getattr(self._local, "conexao", None)
+        if conexao is None:
+            conexao = sqlite3.connect(self.path, timeout=30, isolation_level=None)
+            conexao.execute("PRAGMA journal_mode=WAL")
+            conexao.execute("PRAGMA synchronous=NORMAL")
+            self._local.conexao = conexao
+        return conexao
+
+    def colocar(self, callback: CallbackRecebido) -> bool:
+        conexao = self._conexao()
+        conexao.execute("BEGIN IMMEDIATE")
+        try:
+            (pendentes,) = conexao.execute(
+                "SELECT COUNT(*) FROM callbacks WHERE retirado = 0"
+            ).fetchone()
+            if pendentes >= self.tamanho_maximo:
+                conexao.execute("ROLLBACK")
+                return False
+            conexao.execute(
+                "INSERT INTO callbacks (dados, recebido_em) VALUES (?, ?)",
+                (json.dumps(callback.dados, ensure_ascii=False), callback.recebido_em),
+            )
+            conexao.execute("COMMIT")
+        except BaseException:
+            conexao.execute("ROLLBACK")
+            raise
+
+        with self._disponivel:
+            self._disponivel.notify()
+        return True
+
+    def retirar(self, timeout: float) -> Optional[CallbackRecebido]:
+        limite = time.monotonic() + timeout
+        while True:
+            callback = self._retirar_proximo()
+            restante = limite - time.monotonic()
+            if callback is not None or restante <= 0:
+                return callback
+            # a espera também é interrompida periodicamente, para ver callbacks colocados por outro processo
+            with self._disponivel:
+                self._disponivel.wait(min(restante, 1.0))
+
+    def _retirar_proximo(self) -> Optional[CallbackRecebido]:
+        conexao = self._conexao()
+        agora = time.time()
+        conexao.execute("BEGIN IMMEDIATE")
+        try:
+            # enquanto retirado, `disponivel_em` é o fim da reserva: depois dele, o callback é considerado abandonado
+            linha = conexao.execute(
+                "SELECT chave, dados, recebido_em, tentativas, erro FROM callbacks "
+                "WHERE retirado IN (?, ?) AND disponivel_em <= ? ORDER BY chave LIMIT 1",
+                (self._PENDENTE, self._RETIRADO, agora),
+            ).fetchone()
+            if linha is not None:
+                conexao.execute(
+                    "UPDATE callbacks SET retirado = ?, disponivel_em = ? WHERE chave = ?",
+                    (self._RETIRADO, agora + self.prazo_processamento, linha[0]),
+                )
+            conexao.execute("COMMIT")
+        except BaseException:
+            conexao.execute("ROLLBACK")
+            raise
+
+        if linha is None:
+            return None
+        return self._callback(linha)
+
+    @staticmethod
+    def _callback(linha: Tuple) -> CallbackRecebido:
+        chave, dados, recebido_em, tentativas, erro = linha
+        callback = CallbackRecebido.from_json(json.loads(dados))
+        callback.recebido_em = recebido_em
+        callback.chave = chave
+        callback.tentativas = tentativas
+        callback.erro = erro
+        return callback
+
+    def concluir(self, callback: CallbackRecebido):
+        self._conexao().execute("DELETE FROM callbacks WHERE chave = ?", (callback.chave,))
+
+    def devolver(self, callback: CallbackRecebido, erro: BaseException):
+        callback.tentativas += 1
+        callback.erro = repr(erro)
+        falhou = callback.tentativas >= self.max_tentativas
+        self._conexao().execute(
+            "UPDATE callbacks SET retirado = ?, tentativas = ?, disponivel_em = ?, erro = ? WHERE chave = ?",
+            (
+                self._FALHOU if falhou else self._PENDENTE,
+                callback.tentativas,
+                time.time() + self._espera(callback.tentativas),
+                callback.erro,
+                callback.chave,
+            ),
+        )
+
+    def falhas(self) -> List[CallbackRecebido]:
+        linhas = self._conexao().execute(
+            "SELECT chave, dados, recebido_em, tentativas, erro FROM callbacks WHERE retirado = ? ORDER BY chave",
+            (self._FALHOU,),
+        )
+        return [self._callback(linha) for linha in linhas]
+
+    def __len__(self):
+        conexao = self._conexao()
+        return conexao.execute("SELECT COUNT(*) FROM callbacks WHERE retirado = 0").fetchone()[0]
+
+
+class CallbackReceiver(object):
+    """Aplicação WSGI (e ASGI, em `asgi`) que recebe os callbacks do Escavador.
+
+    Cada POST é validado e colocado na fila, e a resposta é enviada em seguida: 202 se o callback foi aceito, 503
+    se a fila está cheia (o Escavador tentará enviá-lo novamente mais tarde) e 4xx se o conteúdo é inválido. Os
+    callbacks da fila são passados para `handler` por `max_workers` threads, iniciadas por `iniciar()`. Os ids dos
+    callbacks processados sem erro são marcados como recebidos com `Callback.marcarRecebido`, em lotes de até
+    `tamanho_lote` ids, ou a cada `intervalo_confirmacao` segundos.
+
+    Callbacks cujo handler lança uma exceção não são marcados como recebidos: voltam para a fila, para serem
+    processados novamente (veja `CallbackQueue`), e a exceção é passada para `ao_falhar`, se informado.
+
+    >>> receptor = CallbackReceiver(processar, token="token do painel") # doctest: +SKIP
+    >>> receptor.iniciar() # doctest: +SKIP
+    >>> # em um servidor WSGI: gunicorn "app:receptor"; ou ASGI: uvicorn "app:receptor.asgi"
+
+    :attr fila: fila onde os callbacks aguardam processamento
+    :attr token: se informado, o header Authorization de cada callback precisa conter esse token
+    """
+
+    def __init__(
+        self,
+        handler: Callable[[CallbackRecebido], None],
+        *,
+        fila: Optional[CallbackQueue] = None,
+        token: Optional[str] = None,
+        max_workers: int = 4,
+        tamanho_lote: int = 100,
+        intervalo_confirmacao: float = 5.0,
+        confirmar: bool = True,
+        tamanho_maximo_corpo: int = 10 * 1024 * 1024,
+        ao_falhar: Optional[Callable[[CallbackRecebido, Exception], None]] = None,
+    ):
+        """
+        :param handler: função chamada com cada callback recebido
+        :param fila: fila dos callbacks. Se omitida, usa uma `MemoryCallbackQueue`
+        :param token: token de segurança dos callbacks, configurado no painel da API
+        :param max_workers: quantidade de threads que executam o handler
+        :param tamanho_lote: quantidade máxima de ids marcados como recebidos por requisição
+        :param intervalo_confirmacao: segundos máximos entre o processamento e a marcação como recebido
+        :param confirmar: se False, os callbacks não são marcados como recebidos
+        :param tamanho_maximo_corpo: tamanho máximo, em bytes, do conteúdo de um callback
+        :param ao_falhar: função chamada com o callback e a exceção quando o handler falha
+        """
+        self.handler = handler
+        self.fila = fila if fila is not None else MemoryCallbackQueue()
+        self.token = token
+        self.max_workers = max_workers
+        self.tamanho_lote = tamanho_lote
+        self.intervalo_confirmacao = intervalo_confirmacao
+        self.confirmar = confirmar
+        self.tamanho_maximo_corpo = tamanho_maximo_corpo
+        self.ao_falhar = ao_falhar
+
+        self._parar = threading.Event()
+        self._parar_confirmacao = threading.Event()
+        self._threads: List[threading.Thread] = []
+        self._thread_confirmacao: Optional[threading.Thread] = None
+        self._ids_processados: List[int] = []
+        self._lock_ids = threading.Lock()
+        self._lote_cheio = threading.Event()
+
+    def receber(self, metodo: str, headers: Dict[str, str], corpo: bytes) -> Tuple[int, str]:
+        """Valida um callback e o coloca na fila.
+
+        :param metodo: método HTTP da requisição
+        :param headers: headers da requisição, com os nomes em minúsculas
+        :param corpo: conteúdo da requisição
+        :return: status HTTP e mensagem da resposta
+        """
+        if metodo != "POST":
+            return 405, "Method Not Allowed"
+        if self.token is not None and not self._autorizado(headers.get("authorization", "")):
+            return 401, "Unauthorized"
+        if len(corpo) > self.tamanho_maximo_corpo:
+            return 413, "Payload Too Large"
+
+        try:
+            dados = json.loads(corpo)
+            callback = CallbackRecebido.from_json(dados)
+        except (ValueError, TypeError, KeyError):
+            return 400, "Bad Request"
+
+        if not self.fila.colocar(callback):
+            return 503, "Service Unavailable"
+        return 202, "Accepted"
+
+    def _autorizado(self, authorization: str) -> bool:
+        recebido = authorization[7:] if authorization.lower().startswith("bearer ") else authorization
+        return hmac.compare_digest(recebido.strip().encode(), self.token.encode())
+
+    def __call__(self, environ: Dict, start_response: Callable) -> Iterable[bytes]:
+        try:
+            tamanho = int(environ.get("CONTENT_LENGTH") or 0)
+        except ValueError:
+            tamanho = 0
+        if tamanho > self.tamanho_maximo_corpo:
+            status, mensagem = 413, "Payload Too Large"
+        else:
+            headers = {
+                chave[5:].replace("_", "-").lower(): valor
+                for chave, valor in environ.items()
+                if chave.startswith("HTTP_")
+            }
+            corpo = environ["wsgi.input"].read(tamanho) if tamanho else b""
+            status, mensagem = self.receber(environ["REQUEST_METHOD"], headers, corpo)
+
+        resposta = mensagem.encode()
+        cabecalhos = [("Content-Type", "text/plain"), ("Content-Length", str(len(resposta)))]
+        if status == 503:
+            cabecalhos.append(("Retry-After", "30"))
+        start_response(f"{status} {mensagem}", cabecalhos)
+        return [resposta]
+
+    async def asgi(self, scope: Dict, receive: Callable, send: Callable):
+        """Aplicação ASGI equivalente. As threads são iniciadas e paradas junto com o servidor (lifespan)."""
+        if scope["type"] == "lifespan":
+            while True:
+                mensagem = await receive()
+                if mensagem["type"] == "lifespan.startup":
+                    self.iniciar()
+                    await send({"type": "lifespan.startup.complete"})
+                elif mensagem["type"] == "lifespan.shutdown":
+                    self.parar()
+                    await send({"type": "lifespan.shutdown.complete"})
+                    return
+
+        partes = []
+        tamanho = 0
+        while True:
+            mensagem = await receive()
+            partes.append(mensagem.get("body", b""))
+            tamanho += len(partes[-1])
+            if tamanho > self.tamanho_maximo_corpo or not mensagem.get("more_body"):
+                break
+
+        headers = {
+            chave.decode("latin-1").lower(): valor.decode("latin-1") for chave, valor in scope["headers"]
+        }
+        status, mensagem = self.receber(scope["method"], headers, b"".join(partes))
+
+        resposta = mensagem.encode()
+        cabecalhos = [(b"content-type", b"text/plain"), (b"content-length", str(len(resposta)).encode())]
+        if status == 503:
+            cabecalhos.append((b"retry-after", b"30"))
+        await send({"type": "http.response.start", "status": status, "headers": cabecalhos})
+        await send({"type": "http.response.body", "body": resposta})
+
+    def iniciar(self):
+        """Inicia as threads que processam os callbacks e os marcam como recebidos."""
+        if self._threads:
+            return
+
+        self._parar.clear()
+        self._parar_confirmacao.clear()
+        self._threads = [
+            threading.Thread(target=self._processar, name=f"escavador-callback-{i}", daemon=True)
+            for i in range(self.max_workers)
+        ]
+        for thread in self._threads:
+            thread.start()
+        if self.confirmar:
+            self._thread_confirmacao = threading.Thread(
+                target=self._confirmar, name="escavador-callback-confirmacao", daemon=True
+            )
+            self._thread_confirmacao.start()
+
+    def parar(self, timeout: Optional[float] = None):
+        """Para as threads, após terminarem os callbacks em processamento, e marca os processados como recebidos.
+
+        Os callbacks que ainda estão na fila continuam nela.
+        """
+        self._parar.set()
+        for thread in self._threads:
+            thread.join(timeout)
+        self._threads = []
+
+        if self._thread_confirmacao is not None:
+            self._parar_confirmacao.set()
+            self._lote_cheio.set()
+            self._thread_confirmacao.join(timeout)
+            self._thread_confirmacao = None
+
+    def __enter__(self) -> "CallbackReceiver":
+        self.iniciar()
+        return self
+
+    def __exit__(self, exc_type, exc_val, exc_tb):
+        self.parar()
+
+    def _processar(self):
+        while not self._parar.is_set():
+            callback = self.fila.retirar(timeout=0.5)
+            if callback is None:
+                continue
+
+            try:
+                self.handler(callback)
+            except Exception as e:
+                self.fila.devolver(callback, e)
+                if self.ao_falhar is not None:
+                    self.ao_falhar(callback, e)
+                continue
+
+            self.fila.concluir(callback)
+            if self.confirmar and callback.id is not None:
+                with self._lock_ids:
+                    self._ids_processados.append(callback.id)
+                    if len(self._ids_processados) >= self.tamanho_lote:
+                        self._lote_cheio.set()
+
+    def _confirmar(self):
+        while True:
+            self._lote_cheio.wait(self.intervalo_confirmacao)
+            self._lote_cheio.clear()
+            parar = self._parar_confirmacao.is_set()
+            self.confirmar_processados()
+            if parar:
+                return
+
+    def confirmar_processados(self) -> int:
+        """Marca como recebidos, em lotes de até `tamanho_lote`, os callbacks já processados.
+
+        Ids de lotes que falharem são mantidos para a próxima tentativa.
+
+        :return: quantidade de callbacks marcados como recebidos
+        """
+        with self._lock_ids:
+            ids, self._ids_processados = self._ids_processados, []
+
+        confirmados = 0
+        for inicio in range(0, len(ids), self.tamanho_lote):
+            lote = ids[inicio:inicio + self.tamanho_lote]
+            try:
+                sucesso = Callback.marcarRecebido(lote).get("sucesso", False)
+            except Exception:
+                sucesso = False
+
+            if not sucesso:
+                with self._lock_ids:
+                    self._ids_processados[:0] = ids[inicio:]
+                break
+            confirmados += len(lote)
+        return confirmados
+
+    def servir(self, host: str = "127.0.0.1", porta: int = 8000) -> WSGIServer:
+        """Inicia as threads e um servidor HTTP simples, da biblioteca padrão, em segundo plano.
+
+        Indicado para testes e desenvolvimento. Em produção, use a aplicação em um servidor WSGI ou ASGI.
+
+        :param host: endereço do servidor
+        :param porta: porta do servidor. Se 0, usa uma porta livre (disponível em `servidor.server_port`)
+        :return: o servidor. Use `servidor.shutdown()` e `parar()` para pará-los.
+        """
+        self.iniciar()
+        servidor = make_server(
+            host, porta, self, server_class=_ServidorWSGI, handler_class=_SilenciosoHandler
+        )
+        threading.Thread(
+            target=servidor.serve_forever, name="escavador-callback-servidor", daemon=True
+        ).start()
+        return servidor
+
+
+class _ServidorWSGI(ThreadingMixIn, WSGIServer):
+    daemon_threads = True
+    # o padrão (5) recusa conexões durante rajadas de callbacks
+    request_queue_size = 128
+
+
+class _SilenciosoHandler(WSGIRequestHandler):
+    def log_message(self, format, *args):
+        pass
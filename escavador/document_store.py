@@ -0,0 +1,202 @@
+"""Armazenamento local de documentos baixados da API, endereçado pelo conteúdo
+
+Cada documento é guardado uma única vez, com o nome igual ao seu hash SHA-256, e um índice em SQLite associa cada
+endpoint de download ao hash do documento. Downloads repetidos de um endpoint já indexado não acessam a rede, e
+endpoints diferentes com o mesmo conteúdo compartilham o mesmo arquivo.
+
+O armazenamento é opcional e desabilitado por padrão. Para usá-lo em todos os downloads, atribua uma instância de
+`DocumentStore` a `Method.document_store`:
+
+>>> from escavador.method import Method
+>>> from escavador.document_store import DocumentStore
+>>> Method.document_store = DocumentStore("documentos") # doctest: +SKIP
+"""
+import errno
+import os
+import shutil
+import sqlite3
+import stat
+import threading
+import time
+import uuid
+from pathlib import Path
+from typing import Callable, Dict, IO, Optional, Union
+
+from escavador.resources.helpers.documento import Documento, TAMANHO_BLOCO
+
+
+class DocumentStore(object):
+    """Documentos baixados, guardados em `diretorio/blobs` pelo hash SHA-256, com o índice em `diretorio/indice.db`.
+
+    Os documentos entregues em um caminho são hard links para o arquivo guardado (ou cópias, se o sistema de
+    arquivos não suportar hard links), então não ocupam espaço extra. Os arquivos guardados são somente leitura,
+    para que uma alteração em um documento entregue não altere os demais.
+
+    :attr diretorio: diretório do armazenamento
+    """
+
+    def __init__(self, diretorio: Union[str, Path]):
+        self.diretorio = Path(diretorio)
+        self._blobs = self.diretorio / "blobs"
+        self._temporarios = self.diretorio / "tmp"
+        self._blobs.mkdir(parents=True, exist_ok=True)
+        self._temporarios.mkdir(exist_ok=True)
+        self._local = threading.local()
+        self._conexao().execute(
+            "CREATE TABLE IF NOT EXISTS documentos (chave TEXT PRIMARY KEY, sha256 TEXT NOT NULL, "
+            "tamanho INTEGER NOT NULL, salvo_em REAL NOT NULL)"
+        )
+
+    def _conexao(self) -> sqlite3.Connection:
+        conexao = getattr(self._local, "conexao", None)
+        if conexao is None:
+            conexao = sqlite3.connect(self.diretorio / "indice.db", timeout=30, isolation_level=None)
+            conexao.execute("PRAGMA journal_mode=WAL")
+            self._local.conexao = conexao
+        return conexao
+
+    def _blob(self, sha256: str) -> Path:
+        return self._blobs / sha256[:2] / sha256
+
+    def obter(self, chave: str) -> Optional[Dict]:
+        """Retorna o documento guardado para a chave, ou None se não houver.
+
+        :param chave: identificador do documento (ex: a url do endpoint de download)
+        :return: dict com o caminho ("path") do arquivo guardado, o "sha256" e o "tamanho"
+        """
+        linha = (
+            self._conexao()
+            .execute("SELECT sha256, tamanho FROM documentos WHERE chave = ?", (chave,))
+            .fetchone()
+        )
+        if linha is None:
+            return None
+
+        blob = self._blob(linha[0])
+        if not blob.exists():
+            return None
+        return {"path": blob, "sha256": linha[0], "tamanho": linha[1]}
+
+    def guardar(self, chave: str, arquivo: Union[str, Path], sha256: str, tamanho: int) -> Dict:
+        """Move um arquivo para o armazenamento e o associa à chave.
+
+        Se já existir um documento com o mesmo conteúdo, o arquivo é descartado e o existente é reaproveitado.
+
+        :param chave: identificador do documento
+        :param arquivo: arquivo a guardar, no mesmo sistema de arquivos do armazenamento
+        :param sha256: hash SHA-256 do conteúdo do arquivo
+        :param tamanho: tamanho do arquivo em bytes
+        :return: dict com o caminho ("path") do arquivo guardado, o "sha256" e o "tamanho"
+        """
+        blob = self._blob(sha256)
+        conexao = self._conexao()
+        # a transação impede que `limpar` apague o arquivo antes de ele ser referenciado no índice
+        conexao.execute("BEGIN IMMEDIATE")
+        try:
+            if blob.exists():
+                os.unlink(arquivo)
+            else:
+                blob.parent.mkdir(exist_ok=True)
+                os.chmod(arquivo, stat.S_IRUSR | stat.S_IRGRP | stat.S_IROTH)
+                os.replace(arquivo, blob)
+            conexao.execute(
+                "INSERT OR REPLACE INTO documentos (chave, sha256, tamanho, salvo_em) VALUES (?, ?, ?, ?)",
+                (chave, sha256, tamanho, time.time()),
+            )
+            conexao.execute("COMMIT")
+        except BaseException:
+            conexao.execute("ROLLBACK")
+            raise
+        return {"path": blob, "sha256": sha256, "tamanho": tamanho}
+
+    def baixar(
+        self,
+        chave: str,
+        destino: Union[str, Path, IO],
+        baixar_para: Callable[[Path], Dict],
+        sha256: Optional[str] = None,
+    ) -> Dict:
+        """Entrega o documento da chave no destino, baixando-o apenas se ainda não estiver guardado.
+
+        :param chave: identificador do documento
+        :param destino: caminho do arquivo a ser criado, ou um arquivo binário já aberto
+        :param baixar_para: função que baixa o documento para o caminho recebido, retornando o resultado de
+        `Documento.salvar_stream` (ou a resposta de erro da API)
+        :param sha256: hash SHA-256 esperado do documento. Um documento guardado com outro hash é baixado de novo
+        :return: o mesmo dict de `Documento.salvar_stream`, com "armazenado" True se o documento já estava guardado
+        """
+        if isinstance(destino, (str, Path)):
+            # não baixa um documento que não poderia ser entregue
+            real_path = Path(destino)
+            if real_path.exists():
+                return {"error": os.strerror(errno.EEXIST)}
+            if not real_path.parent.is_dir():
+                return {"error": os.strerror(errno.ENOENT)}
+
+        guardado = self.obter(chave)
+        if guardado is not None and sha256 is not None and guardado["sha256"] != sha256.lower():
+            guardado = None
+        armazenado = guardado is not None
+        if guardado is None:
+            temporario = self._temporarios / f"{uuid.uuid4().hex}.tmp"
+            resultado = baixar_para(temporario)
+            if "sha256" not in resultado:
+                return resultado
+            guardado = self.guardar(chave, temporario, resultado["sha256"], resultado["tamanho"])
+
+        resultado = self._entregar(guardado, destino)
+        if "error" not in resultado:
+            resultado["armazenado"] = armazenado
+        return resultado
+
+    @staticmethod
+    def _entregar(guardado: Dict, destino: Union[str, Path, IO]) -> Dict:
+        if not isinstance(destino, (str, Path)):
+            with open(guardado["path"], "rb") as arquivo:
+                shutil.copyfileobj(arquivo, destino, TAMANHO_BLOCO)
+            return {"sha256": guardado["sha256"], "tamanho": guardado["tamanho"]}
+
+        real_path = Path(destino)
+        try:
+            os.link(guardado["path"], real_path)
+        except (FileExistsError, FileNotFoundError) as error:
+            return {"error": error.strerror}
+        except OSError as error:
+            if error.errno not in (errno.EXDEV, errno.EPERM, errno.EMLINK, errno.ENOTSUP):
+                raise
+            # sem suporte a hard links entre os diretórios: copia o documento
+            with open(guardado["path"], "rb") as arquivo:
+                return Documento.salvar_stream(iter(lambda: arquivo.read(TAMANHO_BLOCO), b""), real_path)
+        return {"path": real_path, "sha256": guardado["sha256"], "tamanho": guardado["tamanho"]}
+
+    def remover(self, chave: str):
+        """Remove a chave do índice. O arquivo é apagado por `limpar` se nenhuma outra chave o referenciar."""
+        self._conexao().execute("DELETE FROM documentos WHERE chave = ?", (chave,))
+
+    def limpar(self) -> int:
+        """Apaga os arquivos guardados que não são referenciados por nenhuma chave, e temporários antigos.
+
+        :return: quantidade de bytes liberados
+        """
+        conexao = self._conexao()
+        liberados = 0
+        # enquanto a transação estiver aberta, nenhum `guardar` (de qualquer thread ou processo) move arquivos
+        conexao.execute("BEGIN IMMEDIATE")
+        try:
+            referenciados = {linha[0] for linha in conexao.execute("SELECT sha256 FROM documentos")}
+            for blob in self._blobs.glob("*/*"):
+                if blob.name not in referenciados:
+                    liberados += blob.stat().st_size
+                    blob.unlink()
+            conexao.execute("COMMIT")
+        except BaseException:
+            conexao.execute("ROLLBACK")
+            raise
+
+        # temporários de downloads interrompidos há mais de um dia
+        limite = time.time() - 24 * 60 * 60
+        for temporario in self._temporarios.iterdir():
+            if temporario.stat().st_mtime < limite:
+                liberados += temporario.stat().st_size
+                temporario.unlink()
+        return liberados
@@ -0,0 +1,94 @@
+"""Ganchos chamados pela `Api` em cada tentativa de requisição
+
+Para observar as requisições feitas pelo SDK (ex: registrar logs ou métricas), crie uma subclasse de
+`RequestHooks`, sobrescrevendo apenas os métodos desejados, e adicione uma instância a `Api.hooks`:
+
+>>> from escavador.api import Api
+>>> from escavador.metrics import MetricsCollector
+>>> Api.hooks.append(MetricsCollector()) # doctest: +SKIP
+
+Os ganchos são chamados de forma síncrona, na thread (ou no event loop) que fez a requisição, então devem ser
+rápidos. Sem ganchos, a `Api` não mede nada.
+"""
+import re
+import time
+from dataclasses import dataclass, field
+from urllib import parse
+
+_SEGMENTO_VARIAVEL = re.compile(r"/(?!v\d+(?:/|$))[^/]*\d[^/]*")
+
+
+def endpoint(url: str) -> str:
+    """Caminho da url com os segmentos variáveis (ids, números CNJ, etc) substituídos por "{id}"
+
+    Agrupa as requisições ao mesmo endpoint, independentemente do recurso consultado.
+
+    >>> endpoint("https://api.escavador.com/api/v2/processos/numero_cnj/0000000-00.0000.0.00.0000/movimentacoes")
+    '/api/v2/processos/numero_cnj/{id}/movimentacoes'
+
+    :param url: url completa da requisição
+    :return: caminho normalizado
+    """
+    return _SEGMENTO_VARIAVEL.sub("/{id}", parse.urlsplit(url).path)
+
+
+@dataclass
+class Requisicao:
+    """Uma tentativa de requisição à API, recebida por todos os ganchos.
+
+    :attr metodo: método HTTP
+    :attr url: url completa, sem a query string
+    :attr tentativa: número da tentativa, começando em 1
+    :attr espera_limite: tempo, em segundos, que a tentativa aguardou pelo limitador de requisições
+    :attr endpoint: caminho normalizado da url (veja `endpoint`)
+    :attr inicio: instante do envio, em `time.perf_counter()`
+    """
+
+    metodo: str
+    url: str
+    tentativa: int = 1
+    espera_limite: float = 0.0
+    endpoint: str = field(init=False)
+    inicio: float = field(default_factory=time.perf_counter, init=False)
+
+    def __post_init__(self):
+        self.endpoint = endpoint(self.url)
+
+    @property
+    def duracao(self) -> float:
+        """Tempo, em segundos, desde o envio da requisição."""
+        return time.perf_counter() - self.inicio
+
+
+class RequestHooks(object):
+    """Ganchos chamados pela `Api`. Por padrão, nenhum deles faz nada."""
+
+    def antes_da_requisicao(self, requisicao: Requisicao):
+        """Chamado antes de cada tentativa, depois de aguardar o limitador de requisições."""
+        pass
+
+    def apos_resposta(self, requisicao: Requisicao, status: int, transferidos: int, duracao: float):
+        """Chamado a cada resposta recebida, inclusive as que serão tentadas novamente.
+
+        :param status: código de status HTTP
+        :param transferidos: bytes do corpo da resposta recebidos pela rede, antes da descompressão. Em downloads,
+        o informado pelo Content-Length, já que o corpo ainda não foi lido
+        :param duracao: tempo, em segundos, até a resposta ser recebida
+        """
+        pass
+
+    def ao_falhar(self, requisicao: Requisicao, erro: BaseException, duracao: float):
+        """Chamado quando a tentativa falha sem resposta (ex: falha de conexão ou timeout), ou quando um download
+        é interrompido depois de `apos_resposta`.
+
+        :param erro: exceção lançada
+        :param duracao: tempo, em segundos, até a falha
+        """
+        pass
+
+    def ao_tentar_novamente(self, requisicao: Requisicao, espera: float):
+        """Chamado quando a tentativa será repetida, antes de aguardar o backoff.
+
+        :param espera: tempo, em segundos, até a próxima tentativa
+        """
+        pass
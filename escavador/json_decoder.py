@@ -0,0 +1,41 @@
+"""Decodificadores de json usados para ler as respostas da API
+
+Se o orjson ou o msgspec estiverem instalados (`pip install escavador[fast-json]`), as respostas são decodificadas
+diretamente dos bytes recebidos por eles, o que é consideravelmente mais rápido que o módulo `json` da biblioteca
+padrão para respostas grandes. Caso contrário, o módulo `json` é usado.
+"""
+import json
+from typing import Any, Callable
+
+try:
+    import orjson
+except ImportError:  # dependência opcional
+    orjson = None
+
+try:
+    import msgspec
+except ImportError:  # dependência opcional
+    msgspec = None
+
+JsonDecoder = Callable[[bytes], Any]
+
+
+def decodificar_stdlib(conteudo: bytes) -> Any:
+    """Decodifica um json com o módulo `json` da biblioteca padrão
+
+    :param conteudo: json em bytes
+    :return: o objeto decodificado
+    """
+    return json.loads(conteudo)
+
+
+def decodificador_padrao() -> JsonDecoder:
+    """Retorna o decodificador mais rápido disponível: orjson, msgspec ou o módulo `json`, nessa ordem
+
+    :return: função que recebe o json em bytes e retorna o objeto decodificado
+    """
+    if orjson is not None:
+        return orjson.loads
+    if msgspec is not None:
+        return msgspec.json.decode
+    return decodificar_stdlib
@@ -1,9 +1,28 @@
-from typing import Optional, Dict, Union
+from pathlib import Path
+from typing import Optional, Dict, IO, Union
+from urllib import parse
 
-from escavador.api import Api
+from escavador.api import Api, AsyncApi
+from escavador.cache import ResponseCache, chave_requisicao
+from escavador.document_store import DocumentStore
+from escavador.single_flight import SingleFlight
 
 
 class Method(object):
+    """Métodos HTTP de uma versão da API.
+
+    :attr cache: cache de respostas das requisições GET, compartilhado por todas as instâncias de `Method` e
+    `AsyncMethod`. Desabilitado se None.
+    :attr document_store: armazenamento local dos arquivos baixados por `baixar`, consultado antes de acessar a
+    rede. Desabilitado se None.
+    :attr single_flight: agrupa requisições GET idênticas feitas ao mesmo tempo, por `Method` e `AsyncMethod`,
+    em uma única requisição. Desabilitado se None.
+    """
+
+    cache: Optional[ResponseCache] = None
+    document_store: Optional[DocumentStore] = None
+    single_flight: Optional[SingleFlight] = None
+
     def __init__(self, api_version):
         self.api = Api(version=api_version)
 
@@ -13,6 +32,7 @@ class Method(object):
         *,
         data: Optional[Dict] = None,
         params: Optional[Dict] = None,
+        usar_cache: bool = True,
         **kwargs
     ) -> Union[Dict, bytes]:
         """Envia um GET para o endpoint especificado em `url`
@@ -22,9 +42,35 @@ class Method(object):
         :param url: slug do endpoint da API
         :param data: Dados a serem enviados no corpo da requisição (json)
         :param params: Dados a serem enviados na query string da requisição
+        :param usar_cache: se False, a resposta é sempre buscada na API (sem agrupar com requisições em andamento),
+        substituindo a que estiver no cache
         :return: Json da resposta da API (Dict), ou arquivo binário (bytes) em caso de download
         """
-        return self.api.request("GET", url, data=data, params=params, **kwargs)
+        cache = Method.cache
+        single_flight = Method.single_flight
+        if cache is None and single_flight is None:
+            return self.api.request("GET", url, data=data, params=params, **kwargs)
+
+        url_completa = parse.urljoin(self.api.base_url, url)
+        ttl = cache.ttl(url_completa) if cache is not None else 0
+        if not ttl and single_flight is None:
+            return self.api.request("GET", url, data=data, params=params, **kwargs)
+
+        chave = chave_requisicao("GET", url_completa, params, data, **kwargs)
+        if ttl and usar_cache:
+            resposta = cache.obter(chave)
+            if resposta is not None:
+                return resposta
+
+        def requisitar():
+            resposta = self.api.request("GET", url, data=data, params=params, **kwargs)
+            if ttl and isinstance(resposta, dict) and resposta["sucesso"]:
+                cache.guardar(chave, resposta, ttl)
+            return resposta
+
+        if single_flight is None or not usar_cache:
+            return requisitar()
+        return single_flight.executar(chave, requisitar)
 
     def post(
         self,
@@ -45,6 +91,34 @@ class Method(object):
         """
         return self.api.request("POST", url, data=data, params=params, **kwargs)
 
+    def baixar(
+        self,
+        url: str,
+        destino: Union[str, Path, IO],
+        *,
+        params: Optional[Dict] = None,
+        sha256: Optional[str] = None
+    ) -> Dict:
+        """Baixa o arquivo do endpoint especificado em `url` em blocos, sem mantê-lo inteiro em memória
+
+        :param url: slug do endpoint da API
+        :param destino: caminho do arquivo a ser criado, ou um arquivo binário já aberto
+        :param params: Dados a serem enviados na query string da requisição
+        :param sha256: hash SHA-256 esperado do arquivo, em hexadecimal
+        :return: Dict com o caminho, o hash e o tamanho do arquivo salvo, ou com o erro
+        """
+        store = Method.document_store
+        if store is None:
+            return self.api.baixar(url, destino, params=params, sha256=sha256)
+
+        chave = chave_requisicao("GET", parse.urljoin(self.api.base_url, url), params)
+        return store.baixar(
+            chave,
+            destino,
+            lambda temporario: self.api.baixar(url, temporario, params=params, sha256=sha256),
+            sha256=sha256,
+        )
+
     def put(
         self,
         url: str,
@@ -82,3 +156,120 @@ class Method(object):
         :return: Json da resposta da API (Dict), ou arquivo binário (bytes) em caso de download
         """
         return self.api.request("DELETE", url, data=data, params=params, **kwargs)
+
+
+class AsyncMethod(object):
+    """Versão assíncrona de `Method`. Requer o aiohttp instalado para executar as requisições."""
+
+    def __init__(self, api_version):
+        self.api_version = api_version
+        self._api = None
+
+    @property
+    def api(self) -> AsyncApi:
+        if self._api is None:
+            self._api = AsyncApi(version=self.api_version)
+        return self._api
+
+    async def get(
+        self,
+        url: str,
+        *,
+        data: Optional[Dict] = None,
+        params: Optional[Dict] = None,
+        usar_cache: bool = True,
+        **kwargs
+    ) -> Union[Dict, bytes]:
+        """Envia, de forma assíncrona, um GET para o endpoint especificado em `url`
+
+        Keyword arguments extras são adicionados ao corpo da requisição (json)
+
+        :param url: slug do endpoint da API
+        :param data: Dados a serem enviados no corpo da requisição (json)
+        :param params: Dados a serem enviados na query string da requisição
+        :param usar_cache: se False, a resposta é sempre buscada na API (sem agrupar com requisições em andamento),
+        substituindo a que estiver no cache
+        :return: Json da resposta da API (Dict), ou arquivo binário (bytes) em caso de download
+        """
+        cache = Method.cache
+        single_flight = Method.single_flight
+        if cache is None and single_flight is None:
+            return await self.api.request("GET", url, data=data, params=params, **kwargs)
+
+        url_completa = parse.urljoin(self.api.base_url, url)
+        ttl = cache.ttl(url_completa) if cache is not None else 0
+        if not ttl and single_flight is None:
+            return await self.api.request("GET", url, data=data, params=params, **kwargs)
+
+        chave = chave_requisicao("GET", url_completa, params, data, **kwargs)
+        if ttl and usar_cache:
+            resposta = cache.obter(chave)
+            if resposta is not None:
+                return resposta
+
+        async def requisitar():
+            resposta = await self.api.request("GET", url, data=data, params=params, **kwargs)
+            if ttl and isinstance(resposta, dict) and resposta["sucesso"]:
+                cache.guardar(chave, resposta, ttl)
+            return resposta
+
+        if single_flight is None or not usar_cache:
+            return await requisitar()
+        return await single_flight.executar_async(chave, requisitar)
+
+    async def post(
+        self,
+        url: str,
+        *,
+        data: Optional[Dict] = None,
+        params: Optional[Dict] = None,
+        **kwargs
+    ) -> Union[Dict, bytes]:
+        """Envia, de forma assíncrona, um POST para o endpoint especificado em `url`
+
+        Keyword arguments extras são adicionados ao corpo da requisição (json)
+
+        :param url: slug do endpoint da API
+        :param data: Dados a serem enviados no corpo da requisição (json)
+        :param params: Dados a serem enviados na query string da requisição
+        :return: Json da resposta da API (Dict), ou arquivo binário (bytes) em caso de download
+        """
+        return await self.api.request("POST", url, data=data, params=params, **kwargs)
+
+    async def put(
+        self,
+        url: str,
+        *,
+        data: Optional[Dict] = None,
+        params: Optional[Dict] = None,
+        **kwargs
+    ) -> Union[Dict, bytes]:
+        """Envia, de forma assíncrona, um PUT para o endpoint especificado em `url`
+
+        Keyword arguments extras são adicionados ao corpo da requisição (json)
+
+        :param url: slug do endpoint da API
+        :param data: Dados a serem enviados no corpo da requisição (json)
+        :param params: Dados a serem enviados na query string da requisição
+        :return: Json da resposta da API (Dict), ou arquivo binário (bytes) em caso de download
+        """
+        return await self.api.request("PUT", url, data=data, params=params, **kwargs)
+
+    async def delete(
+        self,
+        url: str,
+        *,
+        data: Optional[Dict] = None,
+        params: Optional[Dict] = None,
+        **kwargs
+    ) -> Union[Dict, bytes]:
+        """Envia, de forma assíncrona, um DELETE para o endpoint especificado em `url`
+
+        Keyword arguments extras são adicionados ao corpo da requisição (json)
+
+        :param url: slug do endpoint da API
+        :param data: Dados a serem enviados no corpo da requisição (json)
+        :param params: Dados a serem enviados na query string da requisição
+        :return: Json da resposta da API (Dict), ou arquivo binário (bytes) em caso de download
+        """
+        return await self.api.request("DELETE", url, data=data, params=params, **kwargs)
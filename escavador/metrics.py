@@ -0,0 +1,175 @@
+"""Métricas das requisições feitas à API, agrupadas por endpoint
+
+>>> from escavador.api import Api
+>>> from escavador.metrics import MetricsCollector
+>>> metricas = MetricsCollector()
+>>> Api.hooks.append(metricas) # doctest: +SKIP
+>>> print(metricas.prometheus()) # doctest: +SKIP
+"""
+import bisect
+import itertools
+import threading
+from typing import Dict, Iterable, List, Optional, Tuple
+
+from escavador.hooks import RequestHooks, Requisicao
+
+BUCKETS_PADRAO = (0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10, 30, 60)
+
+
+class _MetricasEndpoint(object):
+    __slots__ = ("buckets", "soma", "bytes_transferidos", "status", "erros", "retentativas", "espera_limite")
+
+    def __init__(self, quantidade_buckets: int):
+        # contagens por bucket, não acumuladas. A última posição é o bucket +Inf
+        self.buckets = [0] * (quantidade_buckets + 1)
+        self.soma = 0.0
+        self.bytes_transferidos = 0
+        self.status: Dict[int, int] = {}
+        self.erros: Dict[str, int] = {}
+        self.retentativas = 0
+        self.espera_limite = 0.0
+
+
+class MetricsCollector(RequestHooks):
+    """Registra, por método e endpoint, o histograma de latência, os bytes transferidos pela rede, a contagem de
+    cada status HTTP e de cada erro, as novas tentativas e o tempo de espera pelo limitador de requisições.
+
+    :attr buckets: limites superiores, em segundos, dos buckets do histograma de latência
+    """
+
+    def __init__(self, buckets: Optional[Iterable[float]] = None):
+        self.buckets: Tuple[float, ...] = tuple(sorted(BUCKETS_PADRAO if buckets is None else buckets))
+        self._lock = threading.Lock()
+        self._endpoints: Dict[Tuple[str, str], _MetricasEndpoint] = {}
+
+    def _metricas(self, requisicao: Requisicao) -> _MetricasEndpoint:
+        chave = (requisicao.metodo, requisicao.endpoint)
+        metricas = self._endpoints.get(chave)
+        if metricas is None:
+            metricas = self._endpoints[chave] = _MetricasEndpoint(len(self.buckets))
+        return metricas
+
+    def antes_da_requisicao(self, requisicao: Requisicao):
+        if requisicao.espera_limite:
+            with self._lock:
+                self._metricas(requisicao).espera_limite += requisicao.espera_limite
+
+    def apos_resposta(self, requisicao: Requisicao, status: int, transferidos: int, duracao: float):
+        bucket = bisect.bisect_left(self.buckets, duracao)
+        with self._lock:
+            metricas = self._metricas(requisicao)
+            metricas.buckets[bucket] += 1
+            metricas.soma += duracao
+            metricas.bytes_transferidos += transferidos
+            metricas.status[status] = metricas.status.get(status, 0) + 1
+
+    def ao_falhar(self, requisicao: Requisicao, erro: BaseException, duracao: float):
+        nome = type(erro).__name__
+        with self._lock:
+            metricas = self._metricas(requisicao)
+            metricas.erros[nome] = metricas.erros.get(nome, 0) + 1
+
+    def ao_tentar_novamente(self, requisicao: Requisicao, espera: float):
+        with self._lock:
+            self._metricas(requisicao).retentativas += 1
+
+    def limpar(self):
+        """Descarta todas as métricas registradas."""
+        with self._lock:
+            self._endpoints.clear()
+
+    def snapshot(self) -> Dict[str, Dict]:
+        """Cópia das métricas registradas até o momento.
+
+        :return: dict com uma entrada por "MÉTODO endpoint" (ex: "GET /api/v2/processos/numero_cnj/{id}"), contendo
+        a quantidade de "respostas", a "latencia" (soma, média e contagens acumuladas por bucket, como no
+        Prometheus), os "bytes_transferidos" pela rede (corpos ainda comprimidos), a contagem de cada "status" e de
+        cada tipo de "erros", as "retentativas" e a "espera_limite" total em segundos
+        """
+        with self._lock:
+            endpoints = {
+                chave: (list(m.buckets), m.soma, m.bytes_transferidos, dict(m.status), dict(m.erros), m.retentativas,
+                        m.espera_limite)
+                for chave, m in self._endpoints.items()
+            }
+
+        snapshot = {}
+        for (metodo, endpoint), metricas in endpoints.items():
+            buckets, soma, transferidos, status, erros, retentativas, espera = metricas
+            acumulados = list(itertools.accumulate(buckets))
+            respostas = acumulados[-1]
+            snapshot[f"{metodo} {endpoint}"] = {
+                "respostas": respostas,
+                "latencia": {
+                    "soma": soma,
+                    "media": soma / respostas if respostas else 0.0,
+                    "buckets": dict(zip([*self.buckets, float("inf")], acumulados)),
+                },
+                "bytes_transferidos": transferidos,
+                "status": status,
+                "erros": erros,
+                "retentativas": retentativas,
+                "espera_limite": espera,
+            }
+        return snapshot
+
+    def prometheus(self, prefixo: str = "escavador") -> str:
+        """Métricas registradas no formato de texto do Prometheus, para serem servidas em um endpoint /metrics.
+
+        :param prefixo: prefixo do nome das métricas
+        :return: texto no formato de exposição do Prometheus
+        """
+        with self._lock:
+            endpoints = sorted(
+                (chave, list(m.buckets), m.soma, m.bytes_transferidos, sorted(m.status.items()),
+                 sorted(m.erros.items()), m.retentativas, m.espera_limite)
+                for chave, m in self._endpoints.items()
+            )
+
+        latencia: List[str] = []
+        bytes_transferidos: List[str] = []
+        respostas: List[str] = []
+        erros: List[str] = []
+        retentativas: List[str] = []
+        espera_limite: List[str] = []
+        for (metodo, endpoint), buckets, soma, transferidos, status, tipos_erro, tentativas, espera in endpoints:
+            rotulos = f'method="{_escapar(metodo)}",endpoint="{_escapar(endpoint)}"'
+            acumulados = list(itertools.accumulate(buckets))
+            for limite, quantidade in zip([*map(_formatar, self.buckets), "+Inf"], acumulados):
+                latencia.append(
+                    f'{prefixo}_request_duration_seconds_bucket{{{rotulos},le="{limite}"}} {quantidade}'
+                )
+            latencia.append(f"{prefixo}_request_duration_seconds_sum{{{rotulos}}} {_formatar(soma)}")
+            latencia.append(f"{prefixo}_request_duration_seconds_count{{{rotulos}}} {acumulados[-1]}")
+            bytes_transferidos.append(f"{prefixo}_response_wire_bytes_total{{{rotulos}}} {transferidos}")
+            for codigo, quantidade in status:
+                respostas.append(f'{prefixo}_responses_total{{{rotulos},status="{codigo}"}} {quantidade}')
+            for tipo, quantidade in tipos_erro:
+                rotulos_erro = f'{rotulos},error="{_escapar(tipo)}"'
+                erros.append(f"{prefixo}_request_errors_total{{{rotulos_erro}}} {quantidade}")
+            retentativas.append(f"{prefixo}_request_retries_total{{{rotulos}}} {tentativas}")
+            espera_limite.append(f"{prefixo}_rate_limit_wait_seconds_total{{{rotulos}}} {_formatar(espera)}")
+
+        linhas = []
+        for nome, tipo, descricao, amostras in (
+            ("request_duration_seconds", "histogram", "Latência das respostas da API", latencia),
+            ("response_wire_bytes_total", "counter", "Bytes dos corpos das respostas recebidos pela rede, antes da "
+             "descompressão", bytes_transferidos),
+            ("responses_total", "counter", "Respostas recebidas, por status HTTP", respostas),
+            ("request_errors_total", "counter", "Tentativas que falharam sem resposta, por exceção", erros),
+            ("request_retries_total", "counter", "Tentativas repetidas", retentativas),
+            ("rate_limit_wait_seconds_total", "counter", "Tempo aguardando o limitador de requisições",
+             espera_limite),
+        ):
+            linhas.append(f"# HELP {prefixo}_{nome} {descricao}")
+            linhas.append(f"# TYPE {prefixo}_{nome} {tipo}")
+            linhas.extend(amostras)
+        return "\n".join(linhas) + "\n"
+
+
+def _escapar(valor: str) -> str:
+    return valor.replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+
+
+def _formatar(valor: float) -> str:
+    return repr(float(valor))
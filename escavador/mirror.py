@@ -0,0 +1,484 @@
+"""Espelho local, em SQLite, dos processos e movimentações retornados pela API V2
+
+Permite guardar o que já foi buscado na API e consultar esses dados localmente (por número do CNJ, documento ou OAB
+dos envolvidos, tribunal ou data), sem novas requisições.
+"""
+import os
+import re
+import sqlite3
+import threading
+import time
+from contextlib import contextmanager
+from pathlib import Path
+from typing import Dict, Iterable, Iterator, List, Optional, Sequence, Union
+
+from escavador.v2.resources.envolvido import Envolvido
+from escavador.v2.resources.movimentacao import Movimentacao
+from escavador.v2.resources.processo import Processo, FonteProcesso
+
+_ESQUEMA = """
+CREATE TABLE IF NOT EXISTS processos (
+    numero_cnj TEXT PRIMARY KEY,
+    titulo_polo_ativo TEXT,
+    titulo_polo_passivo TEXT,
+    ano_inicio INTEGER,
+    data_inicio TEXT,
+    data_ultima_movimentacao TEXT,
+    quantidade_movimentacoes INTEGER,
+    fontes_tribunais_estao_arquivadas INTEGER,
+    estado_origem_sigla TEXT,
+    unidade_origem_nome TEXT,
+    salvo_em REAL NOT NULL
+);
+CREATE INDEX IF NOT EXISTS processos_data_ultima_movimentacao ON processos (data_ultima_movimentacao);
+
+CREATE TABLE IF NOT EXISTS fontes (
+    processo_fonte_id INTEGER PRIMARY KEY,
+    numero_cnj TEXT NOT NULL,
+    fonte_id INTEGER,
+    sigla TEXT,
+    nome TEXT,
+    tipo TEXT,
+    grau INTEGER,
+    sistema TEXT,
+    tribunal_sigla TEXT,
+    data_inicio TEXT,
+    data_ultima_movimentacao TEXT,
+    arquivado INTEGER,
+    status_predito TEXT,
+    classe TEXT,
+    assunto TEXT,
+    area TEXT,
+    orgao_julgador TEXT,
+    valor_causa REAL
+);
+CREATE INDEX IF NOT EXISTS fontes_numero_cnj ON fontes (numero_cnj);
+CREATE INDEX IF NOT EXISTS fontes_tribunal_sigla ON fontes (tribunal_sigla, numero_cnj);
+
+CREATE TABLE IF NOT EXISTS envolvidos (
+    id INTEGER PRIMARY KEY,
+    numero_cnj TEXT NOT NULL,
+    processo_fonte_id INTEGER,
+    representado_id INTEGER,
+    nome TEXT,
+    tipo TEXT,
+    tipo_normalizado TEXT,
+    tipo_pessoa TEXT,
+    polo TEXT,
+    documento TEXT
+);
+CREATE INDEX IF NOT EXISTS envolvidos_numero_cnj ON envolvidos (numero_cnj);
+CREATE INDEX IF NOT EXISTS envolvidos_documento ON envolvidos (documento, numero_cnj);
+
+CREATE TABLE IF NOT EXISTS oabs (
+    envolvido_id INTEGER NOT NULL,
+    numero_cnj TEXT NOT NULL,
+    numero TEXT NOT NULL,
+    uf TEXT NOT NULL,
+    tipo TEXT
+);
+CREATE INDEX IF NOT EXISTS oabs_numero_uf ON oabs (numero, uf, numero_cnj);
+CREATE INDEX IF NOT EXISTS oabs_numero_cnj ON oabs (numero_cnj);
+
+CREATE TABLE IF NOT EXISTS movimentacoes (
+    id INTEGER PRIMARY KEY,
+    numero_cnj TEXT NOT NULL,
+    data TEXT,
+    tipo TEXT,
+    tipo_publicacao TEXT,
+    classificacao_predita TEXT,
+    conteudo TEXT,
+    texto_categoria TEXT,
+    fonte_sigla TEXT,
+    fonte_tipo TEXT,
+    tribunal_sigla TEXT
+);
+CREATE INDEX IF NOT EXISTS movimentacoes_numero_cnj_data ON movimentacoes (numero_cnj, data);
+CREATE INDEX IF NOT EXISTS movimentacoes_data ON movimentacoes (data);
+"""
+
+# índice de texto do conteúdo das movimentações, atualizado pelos triggers a cada alteração.
+# remove_diacritics 2 faz "sentenca" encontrar "sentença" e vice-versa.
+_ESQUEMA_BUSCA = """
+CREATE VIRTUAL TABLE IF NOT EXISTS movimentacoes_busca USING fts5 (
+    conteudo, content='movimentacoes', content_rowid='id', tokenize='unicode61 remove_diacritics 2'
+);
+CREATE TRIGGER IF NOT EXISTS movimentacoes_busca_insert AFTER INSERT ON movimentacoes BEGIN
+    INSERT INTO movimentacoes_busca (rowid, conteudo) VALUES (new.id, new.conteudo);
+END;
+CREATE TRIGGER IF NOT EXISTS movimentacoes_busca_delete AFTER DELETE ON movimentacoes BEGIN
+    INSERT INTO movimentacoes_busca (movimentacoes_busca, rowid, conteudo)
+    VALUES ('delete', old.id, old.conteudo);
+END;
+CREATE TRIGGER IF NOT EXISTS movimentacoes_busca_update AFTER UPDATE ON movimentacoes BEGIN
+    INSERT INTO movimentacoes_busca (movimentacoes_busca, rowid, conteudo)
+    VALUES ('delete', old.id, old.conteudo);
+    INSERT INTO movimentacoes_busca (rowid, conteudo) VALUES (new.id, new.conteudo);
+END;
+INSERT INTO movimentacoes_busca (movimentacoes_busca) VALUES ('rebuild');
+"""
+
+
+class SqliteMirror(object):
+    """Espelho local dos processos, fontes, envolvidos e movimentações em um arquivo SQLite.
+
+    Os objetos são gravados com upsert: salvar novamente um processo substitui os dados anteriores dele (inclusive
+    fontes e envolvidos), e salvar novamente uma movimentação com o mesmo id a atualiza. Cada chamada de
+    `salvar_processos` ou `salvar_movimentacoes` é gravada em uma única transação.
+
+    Se o SQLite tiver suporte a FTS5, o conteúdo das movimentações também é indexado para `buscar_movimentacoes`.
+
+    :attr path: caminho do arquivo SQLite
+    :attr busca_disponivel: se o índice de texto das movimentações está disponível
+    """
+
+    def __init__(self, path: Union[str, Path]):
+        self.path = os.fspath(path)
+        self._local = threading.local()
+        conexao = self._conexao()
+        conexao.executescript(_ESQUEMA)
+        self.busca_disponivel = self._criar_indice_busca(conexao)
+
+    @staticmethod
+    def _criar_indice_busca(conexao: sqlite3.Connection) -> bool:
+        existe = conexao.execute(
+            "SELECT 1 FROM sqlite_master WHERE type = 'table' AND name = 'movimentacoes_busca'"
+        ).fetchone()
+        if existe:
+            return True
+
+        try:
+            # o rebuild ao final indexa as movimentações de espelhos criados antes do índice
+            conexao.executescript(f"BEGIN IMMEDIATE; {_ESQUEMA_BUSCA} COMMIT;")
+        except sqlite3.OperationalError:
+            if conexao.in_transaction:
+                conexao.execute("ROLLBACK")
+            return False
+        return True
+
+    def _conexao(self) -> sqlite3.Connection:
+        conexao = getattr(self._local, "conexao", None)
+        if conexao is None:
+            conexao = sqlite3.connect(self.path, timeout=30, isolation_level=None)
+            conexao.execute("PRAGMA journal_mode=WAL")
+            conexao.execute("PRAGMA synchronous=NORMAL")
+            # faz o INSERT OR REPLACE disparar o trigger de delete, mantendo o índice de texto
+            conexao.execute("PRAGMA recursive_triggers=ON")
+            conexao.row_factory = sqlite3.Row
+            self._local.conexao = conexao
+        return conexao
+
+    @contextmanager
+    def _transacao(self) -> Iterator[sqlite3.Connection]:
+        conexao = self._conexao()
+        conexao.execute("BEGIN IMMEDIATE")
+        try:
+            yield conexao
+        except BaseException:
+            conexao.execute("ROLLBACK")
+            raise
+        conexao.execute("COMMIT")
+
+    def fechar(self):
+        """Fecha a conexão da thread atual com o arquivo."""
+        conexao = getattr(self._local, "conexao", None)
+        if conexao is not None:
+            conexao.close()
+            self._local.conexao = None
+
+    def salvar_processos(self, processos: Iterable[Processo]) -> int:
+        """Salva ou atualiza os processos, com suas fontes, envolvidos e OABs.
+
+        :param processos: processos a salvar (ex: o resultado de `Processo.por_oab`)
+        :return: quantidade de processos salvos
+        """
+        salvos = 0
+        agora = time.time()
+        with self._transacao() as conexao:
+            for processo in processos:
+                self._salvar_processo(conexao, processo, agora)
+                salvos += 1
+        return salvos
+
+    def salvar_movimentacoes(self, numero_cnj: str, movimentacoes: Iterable[Movimentacao]) -> int:
+        """Salva ou atualiza as movimentações de um processo.
+
+        :param numero_cnj: número do processo das movimentações
+        :param movimentacoes: movimentações a salvar (ex: o resultado de `Processo.movimentacoes`)
+        :return: quantidade de movimentações salvas
+        """
+        linhas = [self._linha_movimentacao(numero_cnj, mov) for mov in movimentacoes]
+        with self._transacao() as conexao:
+            conexao.executemany(
+                "INSERT OR REPLACE INTO movimentacoes (id, numero_cnj, data, tipo, "
+                "tipo_publicacao, classificacao_predita, conteudo, texto_categoria, fonte_sigla, "
+                "fonte_tipo, tribunal_sigla) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)",
+                linhas,
+            )
+        return len(linhas)
+
+    def _salvar_processo(self, conexao: sqlite3.Connection, processo: Processo, agora: float):
+        numero_cnj = processo.numero_cnj
+        conexao.execute(
+            "INSERT OR REPLACE INTO processos (numero_cnj, titulo_polo_ativo, titulo_polo_passivo, "
+            "ano_inicio, data_inicio, data_ultima_movimentacao, quantidade_movimentacoes, "
+            "fontes_tribunais_estao_arquivadas, estado_origem_sigla, unidade_origem_nome, "
+            "salvo_em) "
+            "VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)",
+            (
+                numero_cnj,
+                processo.titulo_polo_ativo,
+                processo.titulo_polo_passivo,
+                processo.ano_inicio,
+                processo.data_inicio,
+                processo.data_ultima_movimentacao,
+                processo.quantidade_movimentacoes,
+                processo.fontes_tribunais_estao_arquivadas,
+                processo.estado_origem.sigla if processo.estado_origem else None,
+                processo.unidade_origem.nome if processo.unidade_origem else None,
+                agora,
+            ),
+        )
+        for tabela in ("fontes", "envolvidos", "oabs"):
+            conexao.execute(f"DELETE FROM {tabela} WHERE numero_cnj = ?", (numero_cnj,))
+
+        conexao.executemany(
+            "INSERT OR REPLACE INTO fontes (processo_fonte_id, numero_cnj, fonte_id, sigla, nome, "
+            "tipo, grau, sistema, tribunal_sigla, data_inicio, data_ultima_movimentacao, "
+            "arquivado, status_predito, classe, assunto, area, orgao_julgador, valor_causa) "
+            "VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)",
+            [self._linha_fonte(numero_cnj, fonte) for fonte in processo.fontes],
+        )
+        for fonte in processo.fontes:
+            for envolvido in fonte.envolvidos:
+                envolvido_id = self._salvar_envolvido(conexao, numero_cnj, fonte, envolvido, None)
+                for advogado in envolvido.advogados:
+                    self._salvar_envolvido(conexao, numero_cnj, fonte, advogado, envolvido_id)
+
+    def _salvar_envolvido(
+        self,
+        conexao: sqlite3.Connection,
+        numero_cnj: str,
+        fonte: FonteProcesso,
+        envolvido: Envolvido,
+        representado_id: Optional[int],
+    ) -> int:
+        cursor = conexao.execute(
+            "INSERT INTO envolvidos (numero_cnj, processo_fonte_id, representado_id, nome, tipo, "
+            "tipo_normalizado, tipo_pessoa, polo, documento) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)",
+            (
+                numero_cnj,
+                fonte.processo_fonte_id,
+                representado_id,
+                envolvido.nome,
+                envolvido.tipo,
+                envolvido.tipo_normalizado,
+                envolvido.tipo_pessoa,
+                envolvido.polo,
+                _somente_digitos(envolvido.cpf or envolvido.cnpj),
+            ),
+        )
+        if envolvido.oabs:
+            conexao.executemany(
+                "INSERT INTO oabs (envolvido_id, numero_cnj, numero, uf, tipo) "
+                "VALUES (?, ?, ?, ?, ?)",
+                [
+                    (cursor.lastrowid, numero_cnj, str(oab.numero), oab.uf.upper(), oab.tipo)
+                    for oab in envolvido.oabs
+                ],
+            )
+        return cursor.lastrowid
+
+    @staticmethod
+    def _linha_fonte(numero_cnj: str, fonte: FonteProcesso) -> tuple:
+        capa = fonte.capa
+        return (
+            fonte.processo_fonte_id,
+            numero_cnj,
+            fonte.id,
+            fonte.sigla,
+            fonte.nome,
+            fonte.tipo,
+            fonte.grau,
+            fonte.sistema,
+            fonte.tribunal.sigla if fonte.tribunal else None,
+            fonte.data_inicio,
+            fonte.data_ultima_movimentacao,
+            fonte.arquivado,
+            fonte.status_predito,
+            capa.classe if capa else None,
+            capa.assunto if capa else None,
+            capa.area if capa else None,
+            capa.orgao_julgador if capa else None,
+            capa.valor_causa.valor if capa and capa.valor_causa else None,
+        )
+
+    @staticmethod
+    def _linha_movimentacao(numero_cnj: str, movimentacao: Movimentacao) -> tuple:
+        fonte = movimentacao.fonte
+        return (
+            movimentacao.id,
+            numero_cnj,
+            movimentacao.data,
+            movimentacao.tipo,
+            movimentacao.tipo_publicacao,
+            movimentacao.classificacao_predita.nome if movimentacao.classificacao_predita else None,
+            movimentacao.conteudo,
+            movimentacao.texto_categoria,
+            fonte.sigla if fonte else None,
+            fonte.tipo if fonte else None,
+            fonte.tribunal.sigla if fonte and fonte.tribunal else None,
+        )
+
+    def consultar(self, sql: str, parametros: Sequence = ()) -> List[Dict]:
+        """Executa uma consulta SQL qualquer no espelho.
+
+        :param sql: a consulta
+        :param parametros: parâmetros da consulta
+        :return: lista com um dicionário por linha
+        """
+        return [dict(linha) for linha in self._conexao().execute(sql, parametros)]
+
+    def processo(self, numero_cnj: str) -> Optional[Dict]:
+        """Retorna os dados salvos de um processo, com a lista das suas fontes em "fontes".
+
+        :param numero_cnj: número do processo
+        :return: os dados do processo, ou None se ele não foi salvo
+        """
+        processos = self.consultar("SELECT * FROM processos WHERE numero_cnj = ?", (numero_cnj,))
+        if not processos:
+            return None
+
+        processo = processos[0]
+        processo["fontes"] = self.consultar(
+            "SELECT * FROM fontes WHERE numero_cnj = ? ORDER BY grau", (numero_cnj,)
+        )
+        return processo
+
+    def processos_por_documento(self, documento: str) -> List[Dict]:
+        """Processos salvos em que um envolvido tem o CPF ou CNPJ informado (com ou sem pontuação)."""
+        return self.consultar(
+            "SELECT * FROM processos WHERE numero_cnj IN "
+            "(SELECT numero_cnj FROM envolvidos WHERE documento = ?) "
+            "ORDER BY data_ultima_movimentacao DESC",
+            (_somente_digitos(documento),),
+        )
+
+    def processos_por_oab(self, numero: Union[str, int], uf: str) -> List[Dict]:
+        """Processos salvos em que atua o advogado com a carteira da OAB informada."""
+        return self.consultar(
+            "SELECT * FROM processos WHERE numero_cnj IN "
+            "(SELECT numero_cnj FROM oabs WHERE numero = ? AND uf = ?) "
+            "ORDER BY data_ultima_movimentacao DESC",
+            (str(numero), uf.upper()),
+        )
+
+    def processos_por_tribunal(self, sigla: str) -> List[Dict]:
+        """Processos salvos que possuem alguma fonte no tribunal informado (ex: "TJSP")."""
+        return self.consultar(
+            "SELECT * FROM processos WHERE numero_cnj IN "
+            "(SELECT numero_cnj FROM fontes WHERE tribunal_sigla = ?) "
+            "ORDER BY data_ultima_movimentacao DESC",
+            (sigla,),
+        )
+
+    def movimentacoes(
+        self,
+        numero_cnj: Optional[str] = None,
+        data_minima: Optional[str] = None,
+        data_maxima: Optional[str] = None,
+        tribunal: Optional[str] = None,
+        limit: Optional[int] = None,
+    ) -> List[Dict]:
+        """Movimentações salvas, da mais recente para a mais antiga.
+
+        :param numero_cnj: filtra as movimentações de um processo
+        :param data_minima: filtra movimentações a partir da data informada (AAAA-MM-DD)
+        :param data_maxima: filtra movimentações até a data informada (AAAA-MM-DD)
+        :param tribunal: filtra movimentações do tribunal informado (ex: "TJSP")
+        :param limit: quantidade máxima de movimentações
+        :return: lista com um dicionário por movimentação
+        """
+        condicoes, parametros = [], []
+        for condicao, valor in (
+            ("numero_cnj = ?", numero_cnj),
+            ("data >= ?", data_minima),
+            ("data < date(?, '+1 day')", data_maxima),
+            ("tribunal_sigla = ?", tribunal),
+        ):
+            if valor is not None:
+                condicoes.append(condicao)
+                parametros.append(valor)
+
+        sql = "SELECT * FROM movimentacoes"
+        if condicoes:
+            sql += " WHERE " + " AND ".join(condicoes)
+        sql += " ORDER BY data DESC, id DESC"
+        if limit is not None:
+            sql += " LIMIT ?"
+            parametros.append(limit)
+        return self.consultar(sql, parametros)
+
+    def buscar_movimentacoes(
+        self,
+        consulta: str,
+        numero_cnj: Optional[str] = None,
+        tribunal: Optional[str] = None,
+        limit: Optional[int] = 20,
+        sintaxe_fts: bool = False,
+    ) -> List[Dict]:
+        """Busca movimentações salvas pelo conteúdo, ignorando acentos e maiúsculas.
+
+        Por padrão, a consulta é tratada como texto: todas as palavras separadas por espaço precisam estar na
+        movimentação, e pontuação e aspas não têm significado especial (ex: um número CNJ ou 'art. 5º, "caput"').
+        Com `sintaxe_fts=True`, a consulta usa a sintaxe do FTS5: frases exatas vão entre aspas duplas, `OR` e
+        `NOT` combinam termos e `*` busca por prefixo. Nesse caso, uma consulta mal formada lança
+        `sqlite3.OperationalError`.
+
+        :param consulta: texto a buscar (ex: 'sentenca', 'transito em julgado', '0000000-00.0000.0.00.0000')
+        :param numero_cnj: filtra as movimentações de um processo
+        :param tribunal: filtra movimentações do tribunal informado (ex: "TJSP")
+        :param limit: quantidade máxima de movimentações
+        :param sintaxe_fts: se True, `consulta` é repassada sem alterações ao FTS5 (ex: '"transito em julgado"',
+        'penhora OR bloqueio')
+        :return: lista com numero_cnj, id, data, tribunal_sigla e um trecho do conteúdo com os termos
+        encontrados entre colchetes, da mais relevante para a menos relevante
+        """
+        if not self.busca_disponivel:
+            raise RuntimeError(
+                "A busca de movimentações requer um SQLite compilado com suporte a FTS5"
+            )
+        if not sintaxe_fts:
+            consulta = _frases_fts(consulta)
+            if not consulta:
+                return []
+
+        sql = (
+            "SELECT m.numero_cnj, m.id, m.data, m.tribunal_sigla, "
+            "snippet(movimentacoes_busca, 0, '[', ']', '...', 16) AS trecho "
+            "FROM movimentacoes_busca JOIN movimentacoes m ON m.id = movimentacoes_busca.rowid "
+            "WHERE movimentacoes_busca MATCH ?"
+        )
+        parametros = [consulta]
+        if numero_cnj is not None:
+            sql += " AND m.numero_cnj = ?"
+            parametros.append(numero_cnj)
+        if tribunal is not None:
+            sql += " AND m.tribunal_sigla = ?"
+            parametros.append(tribunal)
+        sql += " ORDER BY rank"
+        if limit is not None:
+            sql += " LIMIT ?"
+            parametros.append(limit)
+        return self.consultar(sql, parametros)
+
+
+def _frases_fts(texto: str) -> str:
+    # cada palavra vira uma frase do FTS5, entre aspas duplas (dobradas dentro dela), sem operadores
+    return " ".join('"{}"'.format(palavra.replace('"', '""')) for palavra in texto.split())
+
+
+def _somente_digitos(documento: Optional[str]) -> Optional[str]:
+    if not documento:
+        return None
+    return re.sub(r"\D", "", documento) or None
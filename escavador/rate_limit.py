@@ -0,0 +1,209 @@
+"""Limitadores de requisições por minuto usados pela `Api`
+
+O limitador padrão é um token bucket em memória, que só enxerga as requisições do processo atual. Quando vários
+processos compartilham a mesma chave da API (ex: workers do gunicorn), use um `SqliteTokenBucket` apontando para o
+mesmo arquivo em todos eles, para que o orçamento de requisições seja dividido entre os processos.
+"""
+import abc
+import asyncio
+import os
+import sqlite3
+import threading
+import time
+from typing import Optional
+
+from ratelimit import RateLimitException
+
+
+class RateLimiter(object):
+    """Interface dos limitadores de requisições.
+
+    Ao invés de lançar uma exceção quando o limite é atingido, `acquire` bloqueia até que seja possível
+    fazer a requisição.
+    """
+
+    __metaclass__ = abc.ABCMeta
+
+    @abc.abstractmethod
+    def _tentar(self, tokens: float) -> float:
+        """Tenta consumir `tokens` do limitador.
+
+        :return: 0 se os tokens foram consumidos, ou quantos segundos faltam para que estejam disponíveis
+        """
+        pass
+
+    @property
+    @abc.abstractmethod
+    def disponivel(self) -> float:
+        """Quantidade de tokens disponíveis no momento, útil para métricas."""
+        pass
+
+    def acquire(self, tokens: float = 1, timeout: Optional[float] = None) -> float:
+        """Aguarda até que `tokens` estejam disponíveis e os consome.
+
+        :param tokens: quantidade de tokens a consumir
+        :param timeout: tempo máximo de espera em segundos. Se None, aguarda indefinidamente
+        :return: tempo, em segundos, que foi necessário aguardar
+        """
+        inicio = time.monotonic()
+        while True:
+            espera = self._tentar(tokens)
+            aguardado = time.monotonic() - inicio
+            if not espera:
+                return aguardado
+            if timeout is not None and aguardado + espera > timeout:
+                raise RateLimitException("Limite de requisições por minuto atingido", espera)
+            time.sleep(espera)
+
+    async def acquire_async(self, tokens: float = 1, timeout: Optional[float] = None) -> float:
+        """Versão assíncrona de `acquire`, que libera o event loop enquanto aguarda.
+
+        :param tokens: quantidade de tokens a consumir
+        :param timeout: tempo máximo de espera em segundos. Se None, aguarda indefinidamente
+        :return: tempo, em segundos, que foi necessário aguardar
+        """
+        inicio = time.monotonic()
+        while True:
+            espera = self._tentar(tokens)
+            aguardado = time.monotonic() - inicio
+            if not espera:
+                return aguardado
+            if timeout is not None and aguardado + espera > timeout:
+                raise RateLimitException("Limite de requisições por minuto atingido", espera)
+            await asyncio.sleep(espera)
+
+
+class TokenBucket(RateLimiter):
+    """Token bucket em memória, compartilhado pelas threads do processo atual.
+
+    O bucket é reabastecido continuamente a `calls / period` tokens por segundo, até o limite de `capacidade`
+    tokens, que determina o tamanho máximo de uma rajada de requisições.
+
+    :attr calls: quantidade de requisições permitidas a cada `period` segundos
+    :attr period: duração da janela, em segundos
+    :attr capacidade: quantidade máxima de tokens acumulados
+    """
+
+    def __init__(self, calls: int, period: float = 60, capacidade: Optional[float] = None):
+        if calls <= 0 or period <= 0:
+            raise ValueError("calls e period devem ser positivos")
+        self.calls = calls
+        self.period = period
+        self.capacidade = capacidade if capacidade is not None else max(1, calls // 60)
+        self._tokens = float(self.capacidade)
+        self._atualizado_em = self._agora()
+        self._lock = threading.Lock()
+
+    @property
+    def taxa(self) -> float:
+        """Tokens adicionados ao bucket por segundo."""
+        return self.calls / self.period
+
+    @staticmethod
+    def _agora() -> float:
+        return time.monotonic()
+
+    def _reabastecer(self, tokens: float, atualizado_em: float, agora: float) -> float:
+        return min(self.capacidade, tokens + max(0.0, agora - atualizado_em) * self.taxa)
+
+    def _consumir(self, disponiveis: float, tokens: float) -> float:
+        if tokens > self.capacidade:
+            raise ValueError("Não é possível consumir mais tokens do que a capacidade do bucket")
+        return 0 if disponiveis >= tokens else (tokens - disponiveis) / self.taxa
+
+    def _tentar(self, tokens: float) -> float:
+        with self._lock:
+            agora = self._agora()
+            self._tokens = self._reabastecer(self._tokens, self._atualizado_em, agora)
+            self._atualizado_em = agora
+            espera = self._consumir(self._tokens, tokens)
+            if not espera:
+                self._tokens -= tokens
+            return espera
+
+    @property
+    def disponivel(self) -> float:
+        with self._lock:
+            return self._reabastecer(self._tokens, self._atualizado_em, self._agora())
+
+
+class SqliteTokenBucket(TokenBucket):
+    """Token bucket persistido em um arquivo SQLite, compartilhado por todos os processos que usam o mesmo arquivo.
+
+    Cada consumo é feito em uma transação exclusiva, então o orçamento de requisições é respeitado mesmo com
+    vários processos concorrentes. Para manter o estado em memória compartilhada, use um caminho em `/dev/shm`.
+
+    :attr path: caminho do arquivo SQLite
+    :attr nome: identificador do bucket no arquivo, permitindo manter vários buckets no mesmo arquivo
+    """
+
+    def __init__(
+        self,
+        path: str,
+        calls: int,
+        period: float = 60,
+        capacidade: Optional[float] = None,
+        nome: str = "escavador",
+    ):
+        super().__init__(calls, period, capacidade)
+        self.path = os.fspath(path)
+        self.nome = nome
+        self._local = threading.local()
+
+    @staticmethod
+    def _agora() -> float:
+        # o relógio monotônico não é comparável entre processos
+        return time.time()
+
+    def _conexao(self) -> sqlite3.Connection:
+        """Conexão da thread atual, aberta no primeiro uso.
+
+        Uma conexão SQLite não pode ser usada depois de um `os.fork()`, então cada processo abre as suas (e o
+        bucket pode ser criado antes dos workers serem iniciados, ex: ao importar o módulo).
+        """
+        conexao = getattr(self._local, "conexao", None)
+        if conexao is None or self._local.pid != os.getpid():
+            conexao = sqlite3.connect(self.path, timeout=30, isolation_level=None)
+            conexao.execute("PRAGMA journal_mode=WAL")
+            conexao.execute(
+                "CREATE TABLE IF NOT EXISTS token_buckets "
+                "(nome TEXT PRIMARY KEY, tokens REAL NOT NULL, atualizado_em REAL NOT NULL)"
+            )
+            conexao.execute(
+                "INSERT OR IGNORE INTO token_buckets (nome, tokens, atualizado_em) VALUES (?, ?, ?)",
+                (self.nome, self.capacidade, self._agora()),
+            )
+            self._local.conexao = conexao
+            self._local.pid = os.getpid()
+        return conexao
+
+    def _tentar(self, tokens: float) -> float:
+        conexao = self._conexao()
+        conexao.execute("BEGIN IMMEDIATE")
+        try:
+            disponiveis, atualizado_em = conexao.execute(
+                "SELECT tokens, atualizado_em FROM token_buckets WHERE nome = ?", (self.nome,)
+            ).fetchone()
+            agora = self._agora()
+            disponiveis = self._reabastecer(disponiveis, atualizado_em, agora)
+            espera = self._consumir(disponiveis, tokens)
+            if not espera:
+                disponiveis -= tokens
+            conexao.execute(
+                "UPDATE token_buckets SET tokens = ?, atualizado_em = ? WHERE nome = ?",
+                (disponiveis, agora, self.nome),
+            )
+            conexao.execute("COMMIT")
+        except BaseException:
+            conexao.execute("ROLLBACK")
+            raise
+        return espera
+
+    @property
+    def disponivel(self) -> float:
+        disponiveis, atualizado_em = (
+            self._conexao()
+            .execute("SELECT tokens, atualizado_em FROM token_buckets WHERE nome = ?", (self.nome,))
+            .fetchone()
+        )
+        return self._reabastecer(disponiveis, atualizado_em, self._agora())
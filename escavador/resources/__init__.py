@@ -8,3 +8,4 @@ from .helpers.enums_v2 import (SiglaTribunal,
                                CriterioOrdenacao,
                                Ordem)
 from .helpers.lista_resultados import ListaResultados
+from .helpers.checkpoint import Checkpoint, FileCheckpointStore, SqliteCheckpointStore
@@ -0,0 +1,173 @@
+"""Oferece checkpoints para retomar buscas paginadas longas a partir da última página concluída"""
+import abc
+import json
+import os
+import sqlite3
+import tempfile
+import threading
+import time
+from dataclasses import dataclass, field, asdict
+from pathlib import Path
+from typing import Callable, Dict, Iterator, Optional, Union
+
+from .lista_resultados import ListaResultados
+
+
+@dataclass
+class Checkpoint:
+    """Estado de uma busca paginada.
+
+    :attr id: identificador escolhido pelo usuário para a busca
+    :attr parametros: parâmetros da busca, usados para validar que o checkpoint pertence à mesma busca
+    :attr cursor: cursor da próxima página a ser buscada. Vazio se a busca ainda não passou da primeira página
+    :attr itens: quantidade de itens já processados
+    :attr paginas: quantidade de páginas já processadas
+    :attr concluido: se True, todas as páginas já foram processadas
+    :attr atualizado_em: timestamp da última atualização do checkpoint
+    """
+
+    id: str
+    parametros: Dict = field(default_factory=dict)
+    cursor: str = ""
+    itens: int = 0
+    paginas: int = 0
+    concluido: bool = False
+    atualizado_em: float = field(default_factory=time.time)
+
+    @classmethod
+    def from_json(cls, json_dict: Optional[Dict]) -> Optional["Checkpoint"]:
+        if json_dict is None:
+            return None
+
+        return cls(**json_dict)
+
+
+class CheckpointStore(object):
+    """Armazenamento de checkpoints."""
+
+    __metaclass__ = abc.ABCMeta
+
+    @abc.abstractmethod
+    def carregar(self, checkpoint_id: str) -> Optional[Checkpoint]:
+        """Retorna o checkpoint salvo com o id informado, ou None se não existir."""
+        pass
+
+    @abc.abstractmethod
+    def salvar(self, checkpoint: Checkpoint):
+        """Salva o checkpoint, substituindo o anterior com o mesmo id."""
+        pass
+
+    @abc.abstractmethod
+    def remover(self, checkpoint_id: str):
+        """Remove o checkpoint com o id informado, caso exista."""
+        pass
+
+
+class FileCheckpointStore(CheckpointStore):
+    """Salva cada checkpoint como um arquivo json no diretório informado.
+
+    A escrita é atômica: um checkpoint nunca fica corrompido caso o processo seja interrompido durante o salvamento.
+    """
+
+    def __init__(self, diretorio: Union[str, Path]):
+        self.diretorio = Path(diretorio)
+        self.diretorio.mkdir(parents=True, exist_ok=True)
+
+    def _path(self, checkpoint_id: str) -> Path:
+        return self.diretorio / f"{checkpoint_id}.json"
+
+    def carregar(self, checkpoint_id: str) -> Optional[Checkpoint]:
+        try:
+            with open(self._path(checkpoint_id), encoding="utf-8") as arquivo:
+                return Checkpoint.from_json(json.load(arquivo))
+        except FileNotFoundError:
+            return None
+
+    def salvar(self, checkpoint: Checkpoint):
+        descritor, temporario = tempfile.mkstemp(dir=self.diretorio, suffix=".tmp")
+        try:
+            with os.fdopen(descritor, "w", encoding="utf-8") as arquivo:
+                json.dump(asdict(checkpoint), arquivo, ensure_ascii=False)
+            os.replace(temporario, self._path(checkpoint.id))
+        except BaseException:
+            os.unlink(temporario)
+            raise
+
+    def remover(self, checkpoint_id: str):
+        try:
+            os.unlink(self._path(checkpoint_id))
+        except FileNotFoundError:
+            pass
+
+
+class SqliteCheckpointStore(CheckpointStore):
+    """Salva os checkpoints em uma tabela de um arquivo SQLite, que pode ser compartilhado entre processos."""
+
+    def __init__(self, path: Union[str, Path]):
+        self.path = os.fspath(path)
+        self._local = threading.local()
+        self._conexao().execute(
+            "CREATE TABLE IF NOT EXISTS checkpoints (id TEXT PRIMARY KEY, dados TEXT NOT NULL)"
+        )
+
+    def _conexao(self) -> sqlite3.Connection:
+        conexao = getattr(self._local, "conexao", None)
+        if conexao is None:
+            conexao = sqlite3.connect(self.path, timeout=30, isolation_level=None)
+            self._local.conexao = conexao
+        return conexao
+
+    def carregar(self, checkpoint_id: str) -> Optional[Checkpoint]:
+        linha = (
+            self._conexao()
+            .execute("SELECT dados FROM checkpoints WHERE id = ?", (checkpoint_id,))
+            .fetchone()
+        )
+        return Checkpoint.from_json(json.loads(linha[0])) if linha else None
+
+    def salvar(self, checkpoint: Checkpoint):
+        self._conexao().execute(
+            "INSERT OR REPLACE INTO checkpoints (id, dados) VALUES (?, ?)",
+            (checkpoint.id, json.dumps(asdict(checkpoint), ensure_ascii=False)),
+        )
+
+    def remover(self, checkpoint_id: str):
+        self._conexao().execute("DELETE FROM checkpoints WHERE id = ?", (checkpoint_id,))
+
+
+def iterar_com_checkpoint(
+    checkpoint_id: str,
+    store: CheckpointStore,
+    parametros: Dict,
+    primeira_pagina: Callable[[], ListaResultados],
+    pagina_do_cursor: Callable[[str], ListaResultados],
+) -> Iterator:
+    """Itera sobre todas as páginas de uma busca, salvando um checkpoint ao fim de cada página.
+
+    Se já existir um checkpoint com o mesmo id, a busca é retomada a partir da página seguinte à última concluída.
+    Os itens de uma página interrompida no meio são produzidos novamente ao retomar.
+
+    :param checkpoint_id: identificador da busca
+    :param store: onde os checkpoints são salvos
+    :param parametros: parâmetros da busca. Devem ser serializáveis em json
+    :param primeira_pagina: função que busca a primeira página
+    :param pagina_do_cursor: função que busca a página de um cursor
+    :return: iterador sobre os itens das páginas ainda não concluídas
+    """
+    parametros = json.loads(json.dumps(parametros))
+    checkpoint = store.carregar(checkpoint_id)
+    if checkpoint is None:
+        checkpoint = Checkpoint(id=checkpoint_id, parametros=parametros)
+    elif checkpoint.parametros != parametros:
+        raise ValueError(f"O checkpoint '{checkpoint_id}' pertence a uma busca com outros parâmetros")
+
+    while not checkpoint.concluido:
+        pagina = pagina_do_cursor(checkpoint.cursor) if checkpoint.cursor else primeira_pagina()
+        yield from pagina
+
+        checkpoint.cursor = getattr(pagina[-1], "last_valid_cursor", "") if pagina else ""
+        checkpoint.itens += len(pagina)
+        checkpoint.paginas += 1
+        checkpoint.concluido = not checkpoint.cursor
+        checkpoint.atualizado_em = time.time()
+        store.salvar(checkpoint)
@@ -2,10 +2,12 @@
 import re
 from typing import Dict, Callable, List
 
-from escavador.method import Method
+from escavador.exceptions import FailedRequest
+from escavador.method import Method, AsyncMethod
 from .lista_resultados import ListaResultados
 
 _methods = Method(api_version=2)
+_async_methods = AsyncMethod(api_version=2)
 
 
 def consumir_cursor(cursor: str) -> Dict:
@@ -18,6 +20,32 @@ def consumir_cursor(cursor: str) -> Dict:
     return _methods.get(endpoint_cursor)
 
 
+async def consumir_cursor_async(cursor: str) -> Dict:
+    """Versão assíncrona de `consumir_cursor`
+
+    :param cursor: url do cursor a ser consumido
+    :return: a resposta da requisição
+    """
+    endpoint_cursor = re.sub(r".*/api/v\d/", "", cursor)
+    return await _async_methods.get(endpoint_cursor)
+
+
+def pagina_do_cursor(cursor: str, constructor: Callable) -> ListaResultados:
+    """Consome um cursor e instancia os itens da página retornada
+
+    :param cursor: url do cursor a ser consumido
+    :param constructor: método para construir um objeto da resposta a partir do json
+    :return: a página de resultados, com o cursor da página seguinte em cada item
+    """
+    resposta = consumir_cursor(cursor)
+
+    if not resposta["sucesso"]:
+        conteudo = resposta.get("resposta", {})
+        raise FailedRequest(status=resposta["http_status"], **conteudo)
+
+    return json_to_class(resposta, constructor, add_cursor=True)
+
+
 def json_to_class(
     resposta: Dict, constructor: Callable, add_cursor=False
 ) -> ListaResultados:
@@ -34,6 +62,7 @@ def json_to_class(
     else:
         items, cursor_url = resposta, ""
 
+    items = [item for item in items if item is not None]
     return ListaResultados(
         result
         for result in (
@@ -0,0 +1,80 @@
+import sys
+from dataclasses import dataclass, fields
+
+# `slots=True` existe desde o Python 3.10, mas lá as dataclasses congeladas com slots
+# não podem ser deserializadas pelo pickle (bpo-45897). Nesses casos usamos `_adicionar_slots`.
+_SLOTS_NATIVO = sys.version_info >= (3, 10)
+_SLOTS_NATIVO_FROZEN = sys.version_info >= (3, 11)
+
+
+def dataclass_compacta(cls=None, **kwargs):
+    """Equivalente a `@dataclass`, mas gera uma classe com `__slots__`.
+
+    Objetos com `__slots__` não possuem o `__dict__` por instância, o que reduz bastante o consumo
+    de memória quando milhões de objetos são mantidos ao mesmo tempo (ex: movimentações).
+
+    Usa `@dataclass(slots=True)` quando disponível e, em versões anteriores do Python,
+    reconstrói a classe com os `__slots__` da mesma forma que a biblioteca padrão.
+
+    :param cls: classe decorada, quando usado sem parênteses
+    :param kwargs: os mesmos argumentos aceitos por `dataclass`
+    :return: a nova classe, ou um decorador caso `cls` não seja informada
+
+    >>> @dataclass_compacta(frozen=True)
+    ... class Ponto:
+    ...     x: int
+    ...     y: int
+    >>> hasattr(Ponto(1, 2), "__dict__")
+    False
+    """
+
+    def decorar(classe):
+        nativo = _SLOTS_NATIVO_FROZEN if kwargs.get("frozen") else _SLOTS_NATIVO
+        if nativo:
+            return dataclass(classe, slots=True, **kwargs)
+        return _adicionar_slots(dataclass(classe, **kwargs), kwargs.get("frozen", False))
+
+    if cls is None:
+        return decorar
+    return decorar(cls)
+
+
+def _adicionar_slots(cls, frozen: bool = False):
+    """Recria uma dataclass já processada incluindo `__slots__` para os seus campos.
+
+    :param cls: classe já decorada com `@dataclass`
+    :param frozen: se a dataclass é congelada
+    :return: nova classe com `__slots__`
+    """
+    herdados = set()
+    for base in cls.__mro__[1:-1]:
+        slots = base.__dict__.get("__slots__", ())
+        herdados.update((slots,) if isinstance(slots, str) else slots)
+
+    nomes = tuple(f.name for f in fields(cls) if f.name not in herdados)
+    cls_dict = dict(cls.__dict__)
+    cls_dict["__slots__"] = nomes
+    for nome in nomes:
+        # os valores padrão já foram capturados pelo __init__ gerado e conflitariam com os slots
+        cls_dict.pop(nome, None)
+    cls_dict.pop("__dict__", None)
+    cls_dict.pop("__weakref__", None)
+
+    nova = type(cls)(cls.__name__, cls.__bases__, cls_dict)
+    nova.__qualname__ = cls.__qualname__
+
+    if frozen:
+        # o pickle restaura objetos com slots usando setattr, que é bloqueado em classes congeladas
+        nova.__getstate__ = _obter_estado
+        nova.__setstate__ = _definir_estado
+
+    return nova
+
+
+def _obter_estado(self):
+    return [getattr(self, f.name) for f in fields(self)]
+
+
+def _definir_estado(self, estado):
+    for campo, valor in zip(fields(self), estado):
+        object.__setattr__(self, campo.name, valor)
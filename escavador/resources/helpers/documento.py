@@ -1,5 +1,12 @@
+import errno
+import hashlib
+import os
+import shutil
+import tempfile
 from pathlib import Path
-from typing import AnyStr
+from typing import AnyStr, IO, Iterable, Optional, Union
+
+TAMANHO_BLOCO = 64 * 1024
 
 
 class Documento(object):
@@ -13,10 +20,106 @@ class Documento(object):
         :param path: caminho onde o pdf será salvo
         :return: dict
         """
-        real_path = Path(path) / f"{nome_arquivo}.pdf"
+        return Documento.salvar_stream([conteudo], Documento.caminho(path, nome_arquivo))
+
+    @staticmethod
+    def caminho(path: str, nome_arquivo: str) -> Path:
+        """
+        Caminho do pdf com o nome enviado, no diretório informado
+        :param path: diretório do pdf
+        :param nome_arquivo: nome do arquivo, sem a extensão
+        :return: Path
+        """
+        return Path(path) / f"{nome_arquivo}.pdf"
+
+    @staticmethod
+    def destino(path: Optional[str], nome_arquivo: Optional[str],
+                arquivo: Optional[IO] = None) -> Union[Path, IO, dict]:
+        """
+        Destino de um download: o arquivo já aberto, se informado, ou o caminho do pdf no diretório informado
+        :param path: diretório do pdf
+        :param nome_arquivo: nome do arquivo, sem a extensão
+        :param arquivo: arquivo binário já aberto
+        :return: o arquivo, o Path, ou um dict com o "error" se nenhum destino foi informado
+        """
+        if arquivo is not None:
+            return arquivo
+        if path is None or nome_arquivo is None:
+            return {"error": "Informe o diretório e o nome do arquivo, ou um arquivo já aberto"}
+        return Documento.caminho(path, nome_arquivo)
+
+    @staticmethod
+    def salvar_stream(blocos: Iterable[bytes], destino: Union[str, Path, IO],
+                      sha256: Optional[str] = None) -> dict:
+        """
+        Salva um arquivo recebido em blocos, mantendo apenas um bloco em memória por vez
+        Quando o destino é um caminho, os blocos são escritos em um arquivo temporário no mesmo diretório, que só
+        aparece no caminho final depois de completo. Assim como em `get_pdf`, um arquivo já existente não é
+        substituído. Quando o destino é um arquivo aberto e `sha256` é informado, o conteúdo é guardado em um
+        arquivo temporário e só é copiado para o destino depois de conferido o hash.
+        :param blocos: conteúdo do arquivo, em blocos (ex: `resposta.iter_content(TAMANHO_BLOCO)`)
+        :param destino: caminho do arquivo a ser criado, ou um arquivo binário já aberto
+        :param sha256: hash SHA-256 esperado do conteúdo, em hexadecimal. Se informado e diferente, o arquivo não
+        é salvo
+        :return: dict com o caminho ("path", se o destino é um caminho), o "sha256" e o "tamanho" do conteúdo,
+        ou com o "error"
+        """
+        if not isinstance(destino, (str, Path)):
+            if sha256 is None:
+                hash_sha256, tamanho = Documento._escrever(blocos, destino)
+                return {"sha256": hash_sha256, "tamanho": tamanho}
+            with tempfile.TemporaryFile() as temporario:
+                hash_sha256, tamanho = Documento._escrever(blocos, temporario)
+                if hash_sha256 != sha256.lower():
+                    return {"error": "O hash SHA-256 do conteúdo é diferente do esperado"}
+                temporario.seek(0)
+                shutil.copyfileobj(temporario, destino, TAMANHO_BLOCO)
+            return {"sha256": hash_sha256, "tamanho": tamanho}
+
+        real_path = Path(destino)
         try:
-            with open(real_path, "xb+") as arquivo:
-                arquivo.write(conteudo)
+            if real_path.exists():
+                raise FileExistsError(errno.EEXIST, os.strerror(errno.EEXIST), str(real_path))
+            descritor, temporario = tempfile.mkstemp(dir=real_path.parent, prefix=f".{real_path.name}.",
+                                                     suffix=".tmp")
         except (FileExistsError, FileNotFoundError) as error:
             return {"error": error.strerror}
-        return {"path": real_path}
+
+        try:
+            with open(descritor, "wb") as arquivo:
+                hash_sha256, tamanho = Documento._escrever(blocos, arquivo)
+            if sha256 is not None and hash_sha256 != sha256.lower():
+                return {"error": "O hash SHA-256 do conteúdo é diferente do esperado"}
+            Documento._mover_sem_substituir(temporario, real_path)
+        except FileExistsError as error:
+            return {"error": error.strerror}
+        finally:
+            if os.path.exists(temporario):
+                os.unlink(temporario)
+        return {"path": real_path, "sha256": hash_sha256, "tamanho": tamanho}
+
+    @staticmethod
+    def _escrever(blocos: Iterable[bytes], arquivo: IO) -> tuple:
+        hash_sha256 = hashlib.sha256()
+        tamanho = 0
+        for bloco in blocos:
+            if isinstance(bloco, str):
+                bloco = bloco.encode()
+            arquivo.write(bloco)
+            hash_sha256.update(bloco)
+            tamanho += len(bloco)
+        return hash_sha256.hexdigest(), tamanho
+
+    @staticmethod
+    def _mover_sem_substituir(origem: str, destino: Path):
+        """Move o arquivo de forma atômica, lançando FileExistsError se o destino já existir."""
+        try:
+            # o link falha se o destino existir, sem a janela entre verificar e renomear
+            os.link(origem, destino)
+        except FileExistsError:
+            raise
+        except OSError:
+            # sistemas de arquivos sem suporte a hard links
+            if destino.exists():
+                raise FileExistsError(errno.EEXIST, os.strerror(errno.EEXIST), str(destino))
+            os.replace(origem, destino)
@@ -1,15 +1,18 @@
 import abc
 from typing import Optional, Dict
 
-from escavador.method import Method
+from escavador.method import Method, AsyncMethod
 
 
 class Endpoint(object):
     """Um endpoint da API.
 
     :attr methods: métodos http disponíveis para o endpoint. Deve ser inicializado na classe filha.
+    :attr async_methods: versão assíncrona de `methods`, quando disponível para o endpoint.
     """
+    __slots__ = ()
     methods: Method = None
+    async_methods: AsyncMethod = None
 
 
 class EndpointV1(Endpoint):
@@ -26,10 +29,13 @@ class DataEndpoint(Endpoint):
     Exclusivamente usado na API V2.
 
     :attr methods: métodos http disponíveis para o endpoint
+    :attr async_methods: métodos http assíncronos disponíveis para o endpoint
     :attr last_valid_cursor: cursor retornado pela última requisição válida
     """
+    __slots__ = ()
     __metaclass__ = abc.ABCMeta
     methods = Method(api_version=2)
+    async_methods = AsyncMethod(api_version=2)
     last_valid_cursor: Optional[str] = ""  # se não definido pela classe filha, é sempre uma string vazia
 
     @classmethod
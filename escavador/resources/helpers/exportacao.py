@@ -0,0 +1,163 @@
+"""Exporta os itens de buscas paginadas da API V2 como NDJSON, página a página, sem instanciar objetos"""
+import gzip
+import io
+import json
+import os
+import tempfile
+from enum import Enum
+from pathlib import Path
+from typing import Dict, IO, Iterator, Optional, Sequence, Union
+from urllib.parse import urlencode
+
+from escavador.exceptions import FailedRequest
+from .consume_cursor import consumir_cursor
+from .tabela import extrair
+
+try:
+    import orjson
+except ImportError:  # dependência opcional
+    orjson = None
+
+# mesmo nível padrão do utilitário gzip: o nível 9 do módulo é bem mais lento e comprime pouco mais
+_NIVEL_GZIP = 6
+
+
+def itens_do_cursor(
+    endpoint: str, params: Optional[Dict] = None, max_paginas: Optional[int] = None
+) -> Iterator[Dict]:
+    """Percorre as páginas de uma busca, produzindo o json de cada item.
+
+    A próxima página só é buscada quando todos os itens da página atual foram consumidos, então apenas uma
+    página fica em memória e um consumidor lento (ex: escrita em disco) naturalmente segura as requisições.
+
+    :param endpoint: endpoint da primeira página (ex: "processos/numero_cnj/.../movimentacoes") ou a url de
+    um cursor já obtido
+    :param params: parâmetros da primeira página, adicionados à url
+    :param max_paginas: quantidade máxima de páginas a percorrer. Se omitido, percorre até a última página.
+    :return: iterador sobre o json dos itens
+    """
+    cursor = _com_parametros(endpoint, params)
+    paginas = 0
+    while cursor and (max_paginas is None or paginas < max_paginas):
+        resposta = consumir_cursor(cursor)
+
+        if not resposta["sucesso"]:
+            conteudo = resposta.get("resposta", {})
+            raise FailedRequest(status=resposta["http_status"], **conteudo)
+
+        paginas += 1
+        cursor = resposta["resposta"].get("links", {}).get("next", "")
+        yield from (item for item in resposta["resposta"]["items"] if item is not None)
+
+
+def exportar_ndjson(
+    destino: Union[str, Path, IO],
+    endpoint: str,
+    params: Optional[Dict] = None,
+    campos: Optional[Sequence[str]] = None,
+    comprimir: Optional[bool] = None,
+    max_paginas: Optional[int] = None,
+) -> int:
+    """Escreve cada item de uma busca paginada como uma linha json (NDJSON) em um arquivo.
+
+    Os itens são escritos exatamente como retornados pela API (ou projetados em `campos`), sem instanciar os
+    objetos do SDK. O consumo de memória é constante: só a página atual fica em memória.
+
+    Quando `destino` é um caminho, o arquivo é escrito em um arquivo temporário e só substitui o destino ao
+    final, então uma exportação interrompida não deixa um arquivo pela metade.
+
+    :param destino: caminho do arquivo, ou um arquivo já aberto (binário ou texto; binário se `comprimir`)
+    :param endpoint: endpoint da primeira página ou url de um cursor, como em `itens_do_cursor`
+    :param params: parâmetros da primeira página
+    :param campos: campos a manter em cada item, com "." para campos aninhados (ex: ["id", "fonte.sigla"]).
+    Se omitido, o item é escrito inteiro.
+    :param comprimir: se True, escreve em gzip. Se omitido, comprime apenas quando o caminho termina em ".gz"
+    :param max_paginas: quantidade máxima de páginas a percorrer
+    :return: quantidade de itens escritos
+
+    >>> exportar_ndjson("movimentacoes.ndjson.gz",
+    ...                 "processos/numero_cnj/0000000-00.0000.0.00.0000/movimentacoes",
+    ...                 campos=["id", "data", "conteudo", "fonte.sigla"]) # doctest: +SKIP
+    """
+    itens = itens_do_cursor(endpoint, params, max_paginas)
+
+    if not isinstance(destino, (str, Path)):
+        if comprimir:
+            with gzip.GzipFile(fileobj=destino, mode="wb", compresslevel=_NIVEL_GZIP) as arquivo:
+                return _escrever(arquivo, itens, campos)
+        return _escrever(destino, itens, campos)
+
+    destino = Path(destino)
+    if comprimir is None:
+        comprimir = destino.suffix == ".gz"
+
+    fd, temporario = tempfile.mkstemp(dir=destino.parent, prefix=f".{destino.name}.", suffix=".tmp")
+    try:
+        with open(fd, "wb") as arquivo:
+            if comprimir:
+                with gzip.GzipFile(fileobj=arquivo, mode="wb", compresslevel=_NIVEL_GZIP) as compactado:
+                    escritos = _escrever(compactado, itens, campos)
+            else:
+                escritos = _escrever(arquivo, itens, campos)
+        os.replace(temporario, destino)
+    except BaseException:
+        os.unlink(temporario)
+        raise
+
+    return escritos
+
+
+def projetar(item: Dict, campos: Sequence[str]) -> Dict:
+    """Mantém apenas os campos informados de um item, preservando a estrutura aninhada.
+
+    :param item: json do item
+    :param campos: campos a manter, com "." para campos aninhados (ex: "fonte.sigla")
+    :return: novo dicionário apenas com os campos informados
+
+    >>> projetar({"id": 1, "fonte": {"sigla": "TJSP", "nome": "..."}}, ["id", "fonte.sigla"])
+    {'id': 1, 'fonte': {'sigla': 'TJSP'}}
+    """
+    projetado = {}
+    for campo in campos:
+        caminho = campo.split(".")
+        destino = projetado
+        for pai in caminho[:-1]:
+            destino = destino.setdefault(pai, {})
+        destino[caminho[-1]] = extrair(item, caminho)
+    return projetado
+
+
+def _escrever(arquivo: IO, itens: Iterator[Dict], campos: Optional[Sequence[str]]) -> int:
+    """Escreve os itens no arquivo, um json por linha, retornando quantos foram escritos."""
+    texto = isinstance(arquivo, io.TextIOBase)
+    escritos = 0
+    for item in itens:
+        linha = _codificar(projetar(item, campos) if campos else item)
+        arquivo.write(linha.decode("utf-8") if texto else linha)
+        escritos += 1
+    return escritos
+
+
+def _codificar(item: Dict) -> bytes:
+    """Codifica um item como uma linha json terminada em quebra de linha."""
+    if orjson is not None:
+        return orjson.dumps(item, option=orjson.OPT_APPEND_NEWLINE)
+    return json.dumps(item, ensure_ascii=False, separators=(",", ":")).encode("utf-8") + b"\n"
+
+
+def _com_parametros(endpoint: str, params: Optional[Dict]) -> str:
+    """Adiciona os parâmetros à url do endpoint, ignorando os que são None."""
+    if not params:
+        return endpoint
+
+    params = {
+        chave: [_valor(v) for v in valor] if isinstance(valor, (list, tuple)) else _valor(valor)
+        for chave, valor in params.items()
+        if valor is not None
+    }
+    separador = "&" if "?" in endpoint else "?"
+    return f"{endpoint}{separador}{urlencode(params, doseq=True)}" if params else endpoint
+
+
+def _valor(valor):
+    return valor.value if isinstance(valor, Enum) else valor
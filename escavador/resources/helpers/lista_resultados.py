@@ -1,3 +1,13 @@
+import asyncio
+import queue
+import threading
+from typing import Iterator, AsyncIterator, Optional, List, Sequence
+
+from . import tabela
+
+_FIM_DAS_PAGINAS = object()
+
+
 class CustomListTypeHint(type):
     def __getitem__(self, item):
         if isinstance(item, type):
@@ -6,10 +16,201 @@ class CustomListTypeHint(type):
 
 
 class ListaResultados(list, metaclass=CustomListTypeHint):
+    """Uma página de resultados da API."""
+
     def continuar_busca(self) -> "ListaResultados":
         """Retorna a próxima página de resultados, caso exista."""
         return self[-1].continuar_busca() if len(self) else ListaResultados()
 
+    async def continuar_busca_async(self) -> "ListaResultados":
+        """Versão assíncrona de `continuar_busca`."""
+        return await self[-1].continuar_busca_async() if len(self) else ListaResultados()
+
+    def iterar(
+        self,
+        max_itens: Optional[int] = None,
+        max_paginas: Optional[int] = None,
+        prefetch: int = 0,
+    ) -> Iterator:
+        """Itera sobre os resultados desta página e das próximas, buscando cada página apenas quando necessário.
+
+        Diferente de `mais_paginas`, as páginas seguintes não são acumuladas nesta lista: apenas a página sendo
+        iterada (e as páginas antecipadas por `prefetch`) fica em memória.
+
+        :param max_itens: quantidade máxima de itens a produzir. Se omitido, itera até a última página.
+        :param max_paginas: quantidade máxima de páginas a percorrer, incluindo esta. Se omitido, itera até a
+        última página.
+        :param prefetch: quantidade de páginas a buscar antecipadamente em uma thread, enquanto a página atual é
+        processada. Se 0, cada página só é buscada quando a anterior termina de ser consumida.
+        :return: iterador sobre os itens de todas as páginas
+
+        >>> advogado, processos = Processo.por_oab(1234, "SP") # doctest: +SKIP
+        >>> for processo in processos.iterar(max_itens=10000, prefetch=2): # doctest: +SKIP
+        ...     print(processo.numero_cnj)
+        """
+        paginas = (
+            self._paginas_antecipadas(max_paginas, prefetch)
+            if prefetch > 0
+            else self._paginas(max_paginas)
+        )
+        if max_itens is not None and max_itens <= 0:
+            return
+        itens = 0
+        try:
+            for pagina in paginas:
+                for item in pagina:
+                    yield item
+                    itens += 1
+                    # para antes de buscar a próxima página, que seria cobrada sem ser usada
+                    if max_itens is not None and itens >= max_itens:
+                        return
+        finally:
+            paginas.close()
+
+    async def iterar_async(
+        self,
+        max_itens: Optional[int] = None,
+        max_paginas: Optional[int] = None,
+        prefetch: int = 0,
+    ) -> AsyncIterator:
+        """Versão assíncrona de `iterar`, para ser usada com `async for`.
+
+        Com `prefetch`, as próximas páginas são buscadas em uma task do event loop.
+        """
+        paginas = (
+            self._paginas_antecipadas_async(max_paginas, prefetch)
+            if prefetch > 0
+            else self._paginas_async(max_paginas)
+        )
+        if max_itens is not None and max_itens <= 0:
+            return
+        itens = 0
+        try:
+            async for pagina in paginas:
+                for item in pagina:
+                    yield item
+                    itens += 1
+                    # para antes de buscar a próxima página, que seria cobrada sem ser usada
+                    if max_itens is not None and itens >= max_itens:
+                        return
+        finally:
+            await paginas.aclose()
+
+    def _paginas(self, max_paginas: Optional[int] = None) -> Iterator["ListaResultados"]:
+        """Produz esta página e as seguintes, até a última ou até `max_paginas`."""
+        pagina, paginas = self, 0
+        while pagina:
+            paginas += 1
+            yield pagina
+            if max_paginas is not None and paginas >= max_paginas:
+                return
+            pagina = self._proxima_pagina(pagina[-1].continuar_busca())
+
+    async def _paginas_async(
+        self, max_paginas: Optional[int] = None
+    ) -> AsyncIterator["ListaResultados"]:
+        """Versão assíncrona de `_paginas`."""
+        pagina, paginas = self, 0
+        while pagina:
+            paginas += 1
+            yield pagina
+            if max_paginas is not None and paginas >= max_paginas:
+                return
+            pagina = self._proxima_pagina(await pagina[-1].continuar_busca_async())
+
+    def _paginas_antecipadas(
+        self, max_paginas: Optional[int], prefetch: int
+    ) -> Iterator["ListaResultados"]:
+        """Produz as mesmas páginas que `_paginas`, buscando até `prefetch` páginas à frente em uma thread.
+
+        Erros da busca são relançados ao consumidor. Ao interromper a iteração, a thread para de buscar páginas.
+        """
+        fila = queue.Queue(maxsize=prefetch)
+        cancelado = threading.Event()
+
+        def colocar(valor) -> bool:
+            while not cancelado.is_set():
+                try:
+                    fila.put(valor, timeout=0.1)
+                    return True
+                except queue.Full:
+                    pass
+            return False
+
+        def buscar():
+            try:
+                paginas = self._paginas(max_paginas)
+                next(paginas)  # esta página já está em memória
+                for pagina in paginas:
+                    if not colocar(pagina):
+                        return
+            except BaseException as e:
+                colocar(e)
+            else:
+                colocar(_FIM_DAS_PAGINAS)
+
+        if not self:
+            return
+
+        threading.Thread(target=buscar, daemon=True).start()
+        try:
+            yield self
+            while True:
+                pagina = fila.get()
+                if pagina is _FIM_DAS_PAGINAS:
+                    return
+                if isinstance(pagina, BaseException):
+                    raise pagina
+                yield pagina
+        finally:
+            cancelado.set()
+
+    async def _paginas_antecipadas_async(
+        self, max_paginas: Optional[int], prefetch: int
+    ) -> AsyncIterator["ListaResultados"]:
+        """Versão assíncrona de `_paginas_antecipadas`, usando uma task ao invés de uma thread."""
+        fila = asyncio.Queue(maxsize=prefetch)
+
+        async def buscar():
+            try:
+                paginas = self._paginas_async(max_paginas)
+                await paginas.__anext__()  # esta página já está em memória
+                async for pagina in paginas:
+                    await fila.put(pagina)
+            except asyncio.CancelledError:
+                raise
+            except BaseException as e:
+                await fila.put(e)
+            else:
+                await fila.put(_FIM_DAS_PAGINAS)
+
+        if not self:
+            return
+
+        tarefa = asyncio.ensure_future(buscar())
+        try:
+            yield self
+            while True:
+                pagina = await fila.get()
+                if pagina is _FIM_DAS_PAGINAS:
+                    return
+                if isinstance(pagina, BaseException):
+                    raise pagina
+                yield pagina
+        finally:
+            tarefa.cancel()
+
+    @staticmethod
+    def _proxima_pagina(novos_resultados) -> "ListaResultados":
+        """Extrai a lista de resultados da resposta de `continuar_busca`."""
+        if (
+            novos_resultados
+            and len(novos_resultados) > 1
+            and isinstance(novos_resultados[1], ListaResultados)
+        ):
+            return novos_resultados[1]
+        return novos_resultados
+
     def mais_paginas(self, num_paginas: int = 1) -> int:
         """Extende a lista de resultados com mais resultados, caso existam.
 
@@ -32,11 +233,54 @@ class ListaResultados(list, metaclass=CustomListTypeHint):
         if not novos_resultados:
             return False
 
-        if len(novos_resultados) > 1 and isinstance(
-            novos_resultados[1], ListaResultados
-        ):
-            novos_resultados = novos_resultados[1]
-
-        self.extend(novos_resultados)
+        self.extend(self._proxima_pagina(novos_resultados))
 
         return True
+
+    def to_arrow(self, colunas: Optional[Sequence[str]] = None):
+        """Exporta os resultados desta lista para uma `pyarrow.Table`, com uma linha por item.
+
+        As colunas são montadas a partir dos itens (ou do json original dos itens construídos de forma
+        preguiçosa), achatando os campos aninhados mais usados (ex: a sigla da fonte de uma movimentação).
+        Disponível para listas de `Processo`, `Movimentacao` e `Envolvido`. Requer o pyarrow
+        (`pip install escavador[arrow]`).
+
+        :param colunas: nomes das colunas desejadas. Se omitido, inclui todas as colunas disponíveis.
+        :return: a tabela
+
+        >>> resultado = Processo.movimentacoes("0000000-00.0000.0.00.0000") # doctest: +SKIP
+        >>> resultado.to_arrow(["data", "tipo", "fonte_sigla"]) # doctest: +SKIP
+        """
+        return tabela.para_arrow(self._itens_brutos(), self._especificacao(colunas))
+
+    def to_pandas(self, colunas: Optional[Sequence[str]] = None):
+        """Exporta os resultados desta lista para um `pandas.DataFrame`, com uma linha por item.
+
+        As colunas são as mesmas de `to_arrow`. Requer o pandas (`pip install escavador[pandas]`).
+
+        :param colunas: nomes das colunas desejadas. Se omitido, inclui todas as colunas disponíveis.
+        :return: o DataFrame
+        """
+        return tabela.para_pandas(self._itens_brutos(), self._especificacao(colunas))
+
+    def _itens_brutos(self) -> Iterator:
+        """Produz o json de cada item construído de forma preguiçosa, ou o próprio item quando o json original não
+        foi guardado."""
+        return (getattr(item, "_json", None) or item for item in self)
+
+    def _especificacao(self, colunas: Optional[Sequence[str]]) -> List[tabela.Coluna]:
+        """Colunas da tabela para o tipo dos itens desta lista, filtradas por `colunas`."""
+        if not len(self):
+            return []
+
+        especificacao = getattr(type(self[0]), "_COLUNAS_TABELA", None)
+        if especificacao is None:
+            raise TypeError(f"Não é possível exportar uma lista de {type(self[0]).__name__} como tabela")
+        if colunas is None:
+            return list(especificacao)
+
+        por_nome = {coluna[0]: coluna for coluna in especificacao}
+        desconhecidas = [nome for nome in colunas if nome not in por_nome]
+        if desconhecidas:
+            raise ValueError(f"Colunas desconhecidas: {', '.join(desconhecidas)}")
+        return [por_nome[nome] for nome in colunas]
@@ -0,0 +1,75 @@
+"""Oferece métodos para executar requisições em paralelo, com uma quantidade limitada de requisições em andamento"""
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor, Future, wait, FIRST_COMPLETED
+from typing import Callable, Iterable, Iterator, Tuple, TypeVar, Union, Type, Deque
+
+import requests
+from ratelimit import RateLimitException
+
+from escavador.exceptions import FailedRequest
+
+T = TypeVar("T")
+R = TypeVar("R")
+
+DEFAULT_MAX_WORKERS = 8
+
+# falhas de um único item: erros da API, de conexão (inclusive timeouts) e do limitador de requisições
+CAPTURAR_PADRAO: Tuple[Type[BaseException], ...] = (FailedRequest, requests.RequestException, RateLimitException)
+
+
+def executar_em_paralelo(
+    funcao: Callable[[T], R],
+    itens: Iterable[T],
+    *,
+    max_workers: int = DEFAULT_MAX_WORKERS,
+    ordenado: bool = False,
+    capturar: Tuple[Type[BaseException], ...] = CAPTURAR_PADRAO,
+) -> Iterator[Tuple[T, Union[R, BaseException]]]:
+    """Aplica `funcao` a cada item de `itens` em um pool de threads, produzindo os resultados à medida que ficam prontos
+
+    O iterável de entrada é consumido sob demanda: no máximo `2 * max_workers` itens ficam em andamento ao mesmo
+    tempo, o que permite processar iteráveis muito grandes (ou infinitos) com memória constante. Se a iteração for
+    interrompida, os itens ainda não iniciados são cancelados.
+
+    :param funcao: função a ser aplicada a cada item
+    :param itens: itens a serem processados
+    :param max_workers: quantidade de threads do pool
+    :param ordenado: se True, os resultados são produzidos na ordem dos itens de entrada. Caso contrário, são
+    produzidos em ordem de conclusão.
+    :param capturar: exceções que, ao invés de interromper a iteração, são produzidas como resultado do item. Por
+    padrão, as falhas da API, de conexão e do limitador de requisições (veja `CAPTURAR_PADRAO`)
+    :return: iterador de tuplas (item, resultado ou exceção capturada)
+    """
+    itens = iter(itens)
+    limite = 2 * max_workers
+    pendentes: Deque[Tuple[T, Future]] = deque()
+
+    def executar(item: T) -> Union[R, BaseException]:
+        try:
+            return funcao(item)
+        except capturar as e:
+            return e
+
+    def preencher():
+        for item in itens:
+            pendentes.append((item, executor.submit(executar, item)))
+            if len(pendentes) >= limite:
+                break
+
+    with ThreadPoolExecutor(max_workers=max_workers) as executor:
+        try:
+            preencher()
+            while pendentes:
+                if ordenado:
+                    item, futuro = pendentes.popleft()
+                else:
+                    wait([futuro for _, futuro in pendentes], return_when=FIRST_COMPLETED)
+                    indice = next(i for i, (_, futuro) in enumerate(pendentes) if futuro.done())
+                    item, futuro = pendentes[indice]
+                    del pendentes[indice]
+                resultado = futuro.result()
+                preencher()
+                yield item, resultado
+        finally:
+            for _, futuro in pendentes:
+                futuro.cancel()
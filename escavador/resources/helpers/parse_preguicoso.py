@@ -0,0 +1,48 @@
+from typing import Any, Dict, Tuple
+
+
+class ParsePreguicoso(object):
+    """Permite que os campos aninhados de um objeto sejam construídos apenas quando acessados.
+
+    A classe filha deve ser uma dataclass compacta (com `__slots__`), possuir um campo `_json` com o
+    dicionário original, listar os campos aninhados em `_CAMPOS_PREGUICOSOS` e implementar
+    `_construir_campo`. No modo preguiçoso esses campos ficam vazios até o primeiro acesso, quando são
+    construídos a partir de `_json` e guardados no próprio objeto.
+
+    :attr _CAMPOS_PREGUICOSOS: nomes dos campos construídos sob demanda
+    """
+    __slots__ = ()
+    _CAMPOS_PREGUICOSOS: Tuple[str, ...] = ()
+
+    @classmethod
+    def _construir_campo(cls, nome: str, json_dict: Dict, lazy: bool) -> Any:
+        """Constrói o valor de um dos campos de `_CAMPOS_PREGUICOSOS` a partir do json.
+
+        :param nome: nome do campo
+        :param json_dict: dicionário original do objeto
+        :param lazy: se os objetos aninhados também devem ser construídos de forma preguiçosa
+        :return: o valor do campo
+        """
+        raise NotImplementedError
+
+    def _preencher_campos(self, json_dict: Dict, lazy: bool) -> None:
+        """Constrói os campos aninhados imediatamente ou, se `lazy`, os deixa para o primeiro acesso.
+
+        :param json_dict: dicionário original do objeto
+        :param lazy: se True, os campos só são construídos quando acessados
+        """
+        for nome in self._CAMPOS_PREGUICOSOS:
+            if lazy:
+                object.__delattr__(self, nome)
+            else:
+                object.__setattr__(self, nome, self._construir_campo(nome, json_dict, lazy=False))
+
+    def __getattr__(self, nome: str) -> Any:
+        # só é chamado quando o atributo não foi encontrado, isto é, quando o slot ainda está vazio
+        if nome in type(self)._CAMPOS_PREGUICOSOS:
+            json_dict = getattr(self, "_json", None)
+            if json_dict is not None:
+                valor = self._construir_campo(nome, json_dict, lazy=True)
+                object.__setattr__(self, nome, valor)
+                return valor
+        raise AttributeError(f"'{type(self).__name__}' object has no attribute '{nome}'")
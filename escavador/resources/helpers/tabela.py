@@ -0,0 +1,99 @@
+"""Monta tabelas colunares (pyarrow / pandas) a partir dos itens de uma busca, sem criar objetos intermediários"""
+from typing import Any, Dict, Iterable, List, Sequence, Tuple
+
+# (nome da coluna, caminho até o valor no json do item, tipo da coluna)
+# No caminho, "*" percorre uma lista e gera uma coluna de listas.
+Coluna = Tuple[str, Tuple[str, ...], str]
+
+_TIPOS_ARROW = {
+    "string": lambda pa: pa.string(),
+    "int": lambda pa: pa.int64(),
+    "float": lambda pa: pa.float64(),
+    "bool": lambda pa: pa.bool_(),
+    "list<string>": lambda pa: pa.list_(pa.string()),
+    "list<int>": lambda pa: pa.list_(pa.int64()),
+}
+
+# `bool` não tem conversor: bool("false") é True, então valores que não são bool ficam com o tipo inferido
+_CONVERSORES = {"string": str, "int": int, "float": float}
+
+
+def extrair(item: Any, caminho: Sequence[str]) -> Any:
+    """Obtém o valor indicado por `caminho` em um item, seja ele um dicionário (json) ou um objeto.
+
+    :param item: json do item ou o objeto já instanciado
+    :param caminho: chaves (ou atributos) a percorrer. "*" percorre todos os elementos de uma lista
+    :return: o valor encontrado, ou None se alguma parte do caminho não existir
+    """
+    valor = item
+    for i, chave in enumerate(caminho):
+        if valor is None:
+            return None
+        if chave == "*":
+            return [extrair(elemento, caminho[i + 1:]) for elemento in valor]
+        valor = valor.get(chave) if isinstance(valor, dict) else getattr(valor, chave, None)
+    return valor
+
+
+def colunas(itens: Iterable[Any], especificacao: Sequence[Coluna]) -> Dict[str, List]:
+    """Monta as colunas de uma tabela a partir dos itens.
+
+    :param itens: jsons (ou objetos) dos itens, um por linha
+    :param especificacao: colunas a serem montadas
+    :return: dicionário com uma lista de valores por coluna
+    """
+    itens = list(itens)
+    return {nome: [extrair(item, caminho) for item in itens] for nome, caminho, _ in especificacao}
+
+
+def para_arrow(itens: Iterable[Any], especificacao: Sequence[Coluna]):
+    """Monta uma `pyarrow.Table` a partir dos itens.
+
+    :param itens: jsons (ou objetos) dos itens, um por linha
+    :param especificacao: colunas a serem montadas
+    :return: a tabela
+    """
+    try:
+        import pyarrow as pa
+    except ImportError:
+        raise ImportError(
+            "A exportação para Arrow depende do pyarrow. Instale-o com `pip install escavador[arrow]`"
+        )
+
+    valores = colunas(itens, especificacao)
+    return pa.table({nome: _array(pa, valores[nome], tipo) for nome, _, tipo in especificacao})
+
+
+def _array(pa, valores: List, tipo: str):
+    """Cria o array da coluna, convertendo os valores caso a API tenha retornado um tipo diferente do esperado."""
+    try:
+        return pa.array(valores, type=_TIPOS_ARROW[tipo](pa))
+    except (pa.ArrowInvalid, pa.ArrowTypeError):
+        converter = _CONVERSORES.get(tipo.replace("list<", "").rstrip(">"))
+        if converter is None:
+            return pa.array(valores)
+        if tipo.startswith("list<"):
+            valores = [
+                None if lista is None else [None if v is None else converter(v) for v in lista]
+                for lista in valores
+            ]
+        else:
+            valores = [None if v is None else converter(v) for v in valores]
+        return pa.array(valores, type=_TIPOS_ARROW[tipo](pa))
+
+
+def para_pandas(itens: Iterable[Any], especificacao: Sequence[Coluna]):
+    """Monta um `pandas.DataFrame` a partir dos itens.
+
+    :param itens: jsons (ou objetos) dos itens, um por linha
+    :param especificacao: colunas a serem montadas
+    :return: o DataFrame
+    """
+    try:
+        import pandas as pd
+    except ImportError:
+        raise ImportError(
+            "A exportação para pandas depende do pandas. Instale-o com `pip install escavador[pandas]`"
+        )
+
+    return pd.DataFrame(colunas(itens, especificacao), columns=[nome for nome, _, _ in especificacao])
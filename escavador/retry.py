@@ -0,0 +1,130 @@
+"""Política de novas tentativas para requisições que falharam por motivos transitórios"""
+import random
+import threading
+from dataclasses import dataclass, field
+from datetime import datetime, timezone
+from email.utils import parsedate_to_datetime
+from typing import Dict, FrozenSet, Optional
+
+STATUS_RETENTAVEIS = frozenset({429, 502, 503, 504})
+
+METODOS_IDEMPOTENTES = frozenset({"GET", "HEAD", "OPTIONS", "PUT", "DELETE"})
+
+
+@dataclass
+class RetryPolicy:
+    """Define quando e após quanto tempo uma requisição deve ser tentada novamente.
+
+    Requisições com métodos não idempotentes (ex: POST `solicitar-atualizacao`) só são repetidas quando a API
+    responde 429, pois nesse caso a requisição foi rejeitada antes de ser processada.
+
+    :attr max_tentativas: quantidade máxima de tentativas, incluindo a primeira. 1 desabilita novas tentativas
+    :attr backoff_inicial: espera, em segundos, antes da segunda tentativa. Dobra a cada nova tentativa
+    :attr backoff_maximo: espera máxima entre tentativas, em segundos, inclusive quando informada pelo Retry-After
+    :attr jitter: se True, sorteia a espera entre 0 e o backoff calculado, evitando que clientes sincronizem
+    :attr status_retentaveis: códigos de status HTTP que indicam uma falha transitória
+    :attr metodos_idempotentes: métodos HTTP que podem ser repetidos com segurança
+    """
+
+    max_tentativas: int = 3
+    backoff_inicial: float = 0.5
+    backoff_maximo: float = 60
+    jitter: bool = True
+    status_retentaveis: FrozenSet[int] = STATUS_RETENTAVEIS
+    metodos_idempotentes: FrozenSet[str] = METODOS_IDEMPOTENTES
+    _contadores: Dict[str, int] = field(
+        default_factory=lambda: dict.fromkeys(("requisicoes", "tentativas", "retentativas", "desistencias"), 0),
+        init=False,
+        repr=False,
+        compare=False,
+    )
+    _lock: threading.Lock = field(default_factory=threading.Lock, init=False, repr=False, compare=False)
+
+    def deve_tentar_novamente(
+        self, method: str, tentativa: int, status: Optional[int] = None, erro: Optional[BaseException] = None
+    ) -> bool:
+        """Decide se uma requisição deve ser tentada novamente, registrando a decisão nas estatísticas.
+
+        :param method: método HTTP da requisição
+        :param tentativa: número da tentativa que acabou de ser feita, começando em 1
+        :param status: código de status da resposta, caso tenha sido recebida
+        :param erro: erro de conexão, caso a resposta não tenha sido recebida
+        :return: True se a requisição deve ser tentada novamente
+        """
+        idempotente = method.upper() in self.metodos_idempotentes
+        if erro is not None:
+            retentavel = idempotente
+        else:
+            retentavel = status in self.status_retentaveis and (idempotente or status == 429)
+
+        if not retentavel:
+            return False
+        if tentativa >= self.max_tentativas:
+            self._registrar("desistencias")
+            return False
+        self._registrar("retentativas")
+        return True
+
+    def espera(self, tentativa: int, retry_after: Optional[str] = None) -> float:
+        """Calcula quanto tempo aguardar antes da próxima tentativa.
+
+        :param tentativa: número da tentativa que acabou de ser feita, começando em 1
+        :param retry_after: valor do header Retry-After da resposta, em segundos ou como data HTTP
+        :return: tempo de espera em segundos
+        """
+        backoff = min(self.backoff_maximo, self.backoff_inicial * 2 ** (tentativa - 1))
+        if self.jitter:
+            backoff = random.uniform(0, backoff)
+        solicitado = self._segundos_retry_after(retry_after)
+        if solicitado is not None:
+            backoff = max(backoff, min(solicitado, self.backoff_maximo))
+        return backoff
+
+    @staticmethod
+    def _segundos_retry_after(retry_after: Optional[str]) -> Optional[float]:
+        if not retry_after:
+            return None
+        try:
+            return max(0.0, float(retry_after))
+        except ValueError:
+            pass
+        try:
+            data = parsedate_to_datetime(retry_after)
+        except (TypeError, ValueError):
+            return None
+        if data.tzinfo is None:
+            data = data.replace(tzinfo=timezone.utc)
+        return max(0.0, (data - datetime.now(timezone.utc)).total_seconds())
+
+    def _registrar(self, contador: str):
+        with self._lock:
+            self._contadores[contador] += 1
+
+    def registrar_tentativa(self, tentativa: int):
+        """Registra nas estatísticas que uma tentativa de requisição foi feita.
+
+        :param tentativa: número da tentativa, começando em 1
+        """
+        with self._lock:
+            self._contadores["tentativas"] += 1
+            if tentativa == 1:
+                self._contadores["requisicoes"] += 1
+
+    @property
+    def estatisticas(self) -> Dict[str, float]:
+        """Contadores de requisições, tentativas, novas tentativas e desistências.
+
+        `amplificacao` é a média de tentativas por requisição.
+        """
+        with self._lock:
+            estatisticas = dict(self._contadores)
+        estatisticas["amplificacao"] = (
+            estatisticas["tentativas"] / estatisticas["requisicoes"] if estatisticas["requisicoes"] else 0.0
+        )
+        return estatisticas
+
+    def zerar_estatisticas(self):
+        """Zera os contadores de `estatisticas`."""
+        with self._lock:
+            for contador in self._contadores:
+                self._contadores[contador] = 0
@@ -0,0 +1,101 @@
+"""Agrupamento de requisições GET idênticas feitas ao mesmo tempo
+
+Quando várias threads (ou corrotinas) fazem a mesma requisição enquanto ela ainda está em andamento, apenas a
+primeira acessa a API, e as demais aguardam e recebem a mesma resposta, sem consumir créditos novamente.
+
+O agrupamento é opcional e desabilitado por padrão. Para habilitá-lo, atribua uma instância de `SingleFlight` a
+`Method.single_flight`:
+
+>>> from escavador.method import Method
+>>> from escavador.single_flight import SingleFlight
+>>> Method.single_flight = SingleFlight() # doctest: +SKIP
+
+A mesma resposta (o mesmo objeto) é entregue a todas as chamadas agrupadas, então ela não deve ser modificada.
+"""
+import asyncio
+import threading
+from typing import Any, Awaitable, Callable, Dict, Tuple
+
+
+class _Chamada(object):
+    __slots__ = ("concluida", "resultado", "erro")
+
+    def __init__(self):
+        self.concluida = threading.Event()
+        self.resultado = None
+        self.erro = None
+
+
+class SingleFlight(object):
+    """Executa no máximo uma chamada por chave de cada vez, compartilhando o resultado com as chamadas simultâneas.
+
+    Funciona tanto com threads (`executar`) quanto com asyncio (`executar_async`). Uma exceção lançada pela
+    chamada é lançada em todas as chamadas agrupadas.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._chamadas: Dict[str, _Chamada] = {}
+        self._tarefas: Dict[Tuple[asyncio.AbstractEventLoop, str], "asyncio.Future"] = {}
+        self._estatisticas = dict.fromkeys(("chamadas", "agrupadas"), 0)
+
+    def executar(self, chave: str, funcao: Callable[[], Any]) -> Any:
+        """Executa `funcao`, ou aguarda o resultado de uma execução com a mesma chave já em andamento.
+
+        :param chave: identificador da chamada (ex: `chave_requisicao` da requisição)
+        :param funcao: função sem argumentos que faz a chamada
+        :return: o resultado de `funcao`
+        """
+        with self._lock:
+            chamada = self._chamadas.get(chave)
+            lider = chamada is None
+            if lider:
+                chamada = self._chamadas[chave] = _Chamada()
+            self._estatisticas["chamadas" if lider else "agrupadas"] += 1
+
+        if not lider:
+            chamada.concluida.wait()
+            if chamada.erro is not None:
+                raise chamada.erro
+            return chamada.resultado
+
+        try:
+            chamada.resultado = funcao()
+        except BaseException as erro:
+            chamada.erro = erro
+            raise
+        finally:
+            with self._lock:
+                del self._chamadas[chave]
+            chamada.concluida.set()
+        return chamada.resultado
+
+    async def executar_async(self, chave: str, funcao: Callable[[], Awaitable[Any]]) -> Any:
+        """Versão assíncrona de `executar`, que agrupa as chamadas feitas no mesmo event loop.
+
+        Se a corrotina que iniciou a chamada for cancelada, a chamada continua para as demais que a aguardam.
+
+        :param chave: identificador da chamada (ex: `chave_requisicao` da requisição)
+        :param funcao: função sem argumentos que retorna a corrotina que faz a chamada
+        :return: o resultado da corrotina
+        """
+        # as tarefas só podem ser aguardadas no loop em que foram criadas
+        identificador = (asyncio.get_running_loop(), chave)
+        with self._lock:
+            tarefa = self._tarefas.get(identificador)
+            lider = tarefa is None
+            if lider:
+                tarefa = self._tarefas[identificador] = asyncio.ensure_future(funcao())
+                tarefa.add_done_callback(lambda _: self._remover_tarefa(identificador))
+            self._estatisticas["chamadas" if lider else "agrupadas"] += 1
+        return await asyncio.shield(tarefa)
+
+    def _remover_tarefa(self, identificador: Tuple[asyncio.AbstractEventLoop, str]):
+        with self._lock:
+            del self._tarefas[identificador]
+
+    @property
+    def estatisticas(self) -> Dict[str, int]:
+        """Quantidade de chamadas executadas e de chamadas agrupadas a uma execução em andamento."""
+        with self._lock:
+            return dict(self._estatisticas)
@@ -1,10 +1,36 @@
-from datetime import datetime
+import json
+import re
+from dataclasses import dataclass, field
+from datetime import datetime, timedelta
 
+from escavador.exceptions import FailedRequest
+from escavador.resources.helpers.checkpoint import Checkpoint, CheckpointStore
 from escavador.resources.helpers.endpoint import EndpointV1
-from typing import Optional, List, Dict
+from escavador.resources.helpers.paralelo import executar_em_paralelo, DEFAULT_MAX_WORKERS
+from typing import Optional, List, Dict, Callable, Iterator, Tuple
 
 from escavador.resources.helpers.enums import StatusCallback
 
+_FORMATO_DATA = "%Y-%m-%d %H:%M:%S"
+
+
+@dataclass
+class ResultadoDrenagem:
+    """Resultado de `Callback.drenar`.
+
+    :attr processados: quantidade de callbacks processados sem erro pelo handler
+    :attr confirmados: quantidade de callbacks marcados como recebidos
+    :attr falhas: callbacks em que o handler lançou uma exceção, com a exceção. Não são marcados como recebidos.
+    :attr janelas: quantidade de janelas de datas percorridas
+    :attr marca: data até a qual todos os callbacks foram processados, salva no checkpoint
+    """
+
+    processados: int = 0
+    confirmados: int = 0
+    falhas: List[Tuple[Dict, Exception]] = field(default_factory=list)
+    janelas: int = 0
+    marca: Optional[datetime] = None
+
 
 class Callback(EndpointV1):
 
@@ -14,7 +40,7 @@ class Callback(EndpointV1):
     @classmethod
     def callbacks(cls, *, data_maxima: Optional[datetime] = None, data_minima: Optional[datetime] = None,
             evento: Optional[str] = None, item_tipo: Optional[str] = None, item_id: Optional[int] = None,
-            status: Optional[StatusCallback]) -> Dict:
+            status: Optional[StatusCallback] = None) -> Dict:
         """
         Retorna todos os callbacks, de acordo com os filtros enviados
         :param item_id:o id do item do callback, obrigatório se o item_tipo foi enviado
@@ -32,7 +58,7 @@ class Callback(EndpointV1):
             "evento": evento,
             "item_tipo": item_tipo,
             "item_id": item_id,
-            "status": status.value
+            "status": status.value if status else None
         }
 
         return cls.methods.get('callbacks', params=params)
@@ -59,4 +85,109 @@ class Callback(EndpointV1):
         :return: Dict
         """
 
-        return cls.methods.post(f'callbacks/{id}/reenviar')
\ No newline at end of file
+        return cls.methods.post(f'callbacks/{id}/reenviar')
+
+    @classmethod
+    def drenar(cls, handler: Callable[[Dict], None], *, data_minima: datetime,
+               data_maxima: Optional[datetime] = None, janela: timedelta = timedelta(days=1),
+               store: Optional[CheckpointStore] = None, checkpoint_id: str = "callbacks",
+               max_workers: int = DEFAULT_MAX_WORKERS, tamanho_lote: int = 100,
+               evento: Optional[str] = None, item_tipo: Optional[str] = None, item_id: Optional[int] = None,
+               status: Optional[StatusCallback] = None) -> ResultadoDrenagem:
+        """
+        Processa os callbacks acumulados, janela de datas por janela, marcando-os como recebidos em lotes
+        Os callbacks de cada janela são passados para o handler em paralelo, e os ids dos processados sem erro são
+        marcados como recebidos a cada `tamanho_lote` callbacks. Ao fim de cada janela, a data final dela é salva
+        no checkpoint, e uma nova drenagem com o mesmo `checkpoint_id` continua a partir dessa data.
+        A data só avança enquanto nenhum callback falhou: uma janela interrompida ou com falhas é percorrida
+        novamente na próxima drenagem, então cada callback é processado pelo menos uma vez.
+        :param handler: função chamada com o json de cada callback
+        :param data_minima: data a partir da qual os callbacks são processados, se não houver checkpoint
+        :param data_maxima: data até a qual os callbacks são processados. Se omitida, até o momento atual
+        :param janela: duração de cada janela de datas
+        :param store: onde o checkpoint é salvo. Se omitido, a drenagem não é retomável
+        :param checkpoint_id: identificador do checkpoint
+        :param max_workers: quantidade de callbacks processados simultaneamente
+        :param tamanho_lote: quantidade máxima de ids marcados como recebidos por requisição
+        :param evento: filtra os callbacks do evento, como em `callbacks`
+        :param item_tipo: filtra os callbacks do tipo de item, como em `callbacks`
+        :param item_id: filtra os callbacks do item, como em `callbacks`
+        :param status: filtra os callbacks com o status, como em `callbacks`
+        :return: ResultadoDrenagem
+        """
+        filtros = {"evento": evento, "item_tipo": item_tipo, "item_id": item_id, "status": status}
+        parametros = json.loads(json.dumps({**filtros, "status": status.value if status else None}))
+        data_maxima = data_maxima or datetime.now().replace(microsecond=0)
+
+        checkpoint = store.carregar(checkpoint_id) if store is not None else None
+        if checkpoint is None:
+            checkpoint = Checkpoint(id=checkpoint_id, parametros=parametros)
+        elif checkpoint.parametros != parametros:
+            raise ValueError(
+                f"O checkpoint '{checkpoint_id}' pertence a uma drenagem com outros filtros"
+            )
+        elif checkpoint.cursor:
+            data_minima = max(data_minima, datetime.strptime(checkpoint.cursor, _FORMATO_DATA))
+
+        resultado = ResultadoDrenagem()
+        processados: List[int] = []
+        salvos = 0
+
+        def confirmar():
+            for inicio_lote in range(0, len(processados), tamanho_lote):
+                lote = processados[inicio_lote:inicio_lote + tamanho_lote]
+                resposta = cls.marcarRecebido(lote)
+                if not resposta["sucesso"]:
+                    conteudo = resposta.get("resposta", {})
+                    raise FailedRequest(status=resposta["http_status"], **conteudo)
+                resultado.confirmados += len(lote)
+            processados.clear()
+
+        def processar(callback: Dict):
+            try:
+                handler(callback)
+            except Exception as e:
+                return e
+
+        inicio = data_minima
+        while inicio < data_maxima:
+            fim = min(inicio + janela, data_maxima)
+            callbacks = cls._callbacks_da_janela(inicio, fim, **filtros)
+            for callback, erro in executar_em_paralelo(processar, callbacks, max_workers=max_workers):
+                if erro is not None:
+                    resultado.falhas.append((callback, erro))
+                    continue
+                resultado.processados += 1
+                processados.append(callback["id"])
+                if len(processados) >= tamanho_lote:
+                    confirmar()
+            confirmar()
+
+            resultado.janelas += 1
+            if not resultado.falhas:
+                resultado.marca = fim
+                if store is not None:
+                    checkpoint.cursor = fim.strftime(_FORMATO_DATA)
+                    checkpoint.itens += resultado.processados - salvos
+                    checkpoint.paginas += 1
+                    salvos = resultado.processados
+                    store.salvar(checkpoint)
+            inicio = fim
+
+        return resultado
+
+    @classmethod
+    def _callbacks_da_janela(cls, data_minima: datetime, data_maxima: datetime,
+                             **filtros) -> Iterator[Dict]:
+        """Percorre todas as páginas de callbacks de uma janela de datas."""
+        resposta = cls.callbacks(data_minima=data_minima, data_maxima=data_maxima, **filtros)
+        while True:
+            if not resposta["sucesso"]:
+                conteudo = resposta.get("resposta", {})
+                raise FailedRequest(status=resposta["http_status"], **conteudo)
+
+            yield from resposta["resposta"].get("items", [])
+            proxima = (resposta["resposta"].get("links") or {}).get("next")
+            if not proxima:
+                return
+            resposta = cls.methods.get(re.sub(r".*/api/v\d/", "", proxima))
@@ -1,6 +1,40 @@
+import time
+from dataclasses import dataclass, field
+from pathlib import Path
+
+from escavador.exceptions import FailedRequest
 from escavador.resources.helpers.endpoint import EndpointV1
 from escavador.resources.helpers.documento import Documento
-from typing import Optional, Dict
+from escavador.resources.helpers.paralelo import executar_em_paralelo, DEFAULT_MAX_WORKERS
+from typing import Optional, Dict, IO, Iterable, Union
+
+
+@dataclass
+class RelatorioDownload:
+    """Resultado de `DiarioOficial.baixar_edicao`.
+
+    :attr paginas: quantidade de páginas solicitadas
+    :attr baixadas: quantidade de páginas baixadas nesta execução
+    :attr existentes: quantidade de páginas que já estavam no diretório, e não foram baixadas novamente
+    :attr falhas: resposta de erro de cada página que não pôde ser baixada, pelo número da página
+    :attr bytes: quantidade de bytes baixados nesta execução
+    :attr segundos: duração do download
+    """
+
+    paginas: int = 0
+    baixadas: int = 0
+    existentes: int = 0
+    falhas: Dict[int, Dict] = field(default_factory=dict)
+    bytes: int = 0
+    segundos: float = 0.0
+
+    @property
+    def paginas_por_segundo(self) -> float:
+        return self.baixadas / self.segundos if self.segundos else 0.0
+
+    @property
+    def megabytes_por_segundo(self) -> float:
+        return self.bytes / 2 ** 20 / self.segundos if self.segundos else 0.0
 
 
 class DiarioOficial(EndpointV1):
@@ -31,18 +65,92 @@ class DiarioOficial(EndpointV1):
         return cls.methods.get(f"diarios/{id_diario}", params=params)
 
     @classmethod
-    def download_pdf_pagina(cls, id_diario: int, page: int, path: str, nome_arquivo: str) -> Dict:
+    def download_pdf_pagina(cls, id_diario: int, page: int, path: Optional[str] = None,
+                            nome_arquivo: Optional[str] = None, *, arquivo: Optional[IO] = None,
+                            sha256: Optional[str] = None) -> Dict:
         """
         Retorna em formato PDF, uma página do Diário Oficial pelo seu identificador
+        O pdf é escrito no disco à medida que é baixado, sem ficar inteiro em memória.
         :param nome_arquivo:nome para o arquivo baixado
         :param path: diretorio onde o arquivo será salvo
         :param id_diario: o ID do diario oficial
         :param page: número da página do diário oficial
+        :param arquivo: arquivo binário já aberto onde o pdf será escrito, ao invés de `path` e `nome_arquivo`
+        :param sha256: hash SHA-256 esperado do pdf, em hexadecimal
         :return: Dict
         """
-        conteudo = cls.methods.get(f"diarios/{id_diario}/pdf/pagina/{page}/baixar")
+        destino = Documento.destino(path, nome_arquivo, arquivo)
+        if isinstance(destino, dict):
+            return destino
+        return cls.methods.baixar(f"diarios/{id_diario}/pdf/pagina/{page}/baixar", destino, sha256=sha256)
+
+    @classmethod
+    def quantidade_paginas(cls, id_diario: int) -> int:
+        """
+        Retorna a quantidade de páginas de um Diário Oficial, lida de "paginador.last_page" na sua primeira página
+        :param id_diario: o ID do diario oficial
+        :return: int
+        """
+        resposta = cls.pagina(id_diario, page=1)
+        if not resposta["sucesso"]:
+            raise FailedRequest(status=resposta["http_status"], **resposta.get("resposta", {}))
+
+        try:
+            return int(resposta["resposta"]["paginador"]["last_page"])
+        except (KeyError, TypeError, ValueError):
+            raise ValueError(f"A resposta do diário {id_diario} não informa a quantidade de páginas em "
+                             "\"paginador.last_page\". Informe as páginas desejadas.") from None
+
+    @classmethod
+    def baixar_edicao(cls, id_diario: int, diretorio: Union[str, Path], *,
+                      paginas: Optional[Iterable[int]] = None,
+                      max_workers: int = DEFAULT_MAX_WORKERS) -> RelatorioDownload:
+        """
+        Baixa as páginas de um Diário Oficial em PDF, em paralelo, para um diretório
+        Cada página é salva como "pagina_0001.pdf", "pagina_0002.pdf", etc. Páginas que já estão no diretório não são
+        baixadas novamente, então uma execução interrompida é retomada chamando o método de novo. Como cada pdf só
+        aparece no diretório depois de completo, um arquivo existente nunca está pela metade.
+        Os arquivos temporários (".pagina_0001.pdf.*.tmp") são apagados pelo próprio download, mesmo se ele falhar,
+        então outros downloads podem usar o mesmo diretório ao mesmo tempo. Apenas um processo encerrado à força
+        deixa temporários para trás.
+        :param id_diario: o ID do diario oficial
+        :param diretorio: diretório onde as páginas serão salvas. Criado se não existir
+        :param paginas: números das páginas a baixar (ex: range(1, 51)). Se omitido, baixa todas as páginas
+        :param max_workers: quantidade máxima de downloads simultâneos
+        :return: RelatorioDownload
+        """
+        diretorio = Path(diretorio)
+        diretorio.mkdir(parents=True, exist_ok=True)
+        if paginas is None:
+            paginas = range(1, cls.quantidade_paginas(id_diario) + 1)
+        paginas = list(dict.fromkeys(paginas))
+
+        relatorio = RelatorioDownload(paginas=len(paginas))
+        inicio = time.monotonic()
+        pendentes = []
+        for page in paginas:
+            if Documento.caminho(diretorio, cls._nome_pagina(page)).exists():
+                relatorio.existentes += 1
+            else:
+                pendentes.append(page)
+
+        def baixar(page: int) -> Dict:
+            return cls.download_pdf_pagina(id_diario, page, diretorio, cls._nome_pagina(page))
+
+        # erros de conexão de uma página não interrompem as demais
+        for page, resultado in executar_em_paralelo(baixar, pendentes, max_workers=max_workers,
+                                                    capturar=(Exception,)):
+            if isinstance(resultado, Exception):
+                relatorio.falhas[page] = {"error": str(resultado) or type(resultado).__name__}
+            elif "path" in resultado:
+                relatorio.baixadas += 1
+                relatorio.bytes += resultado["tamanho"]
+            else:
+                relatorio.falhas[page] = resultado
+
+        relatorio.segundos = time.monotonic() - inicio
+        return relatorio
 
-        if type(conteudo) is dict:
-            return conteudo
-        else:
-            return Documento.get_pdf(conteudo, path, nome_arquivo)
+    @staticmethod
+    def _nome_pagina(page: int) -> str:
+        return f"pagina_{page:04d}"
@@ -1,6 +1,6 @@
 from escavador.resources.helpers.endpoint import EndpointV1
 from escavador.resources.helpers.documento import Documento
-from typing import Optional, Dict, List
+from typing import Optional, Dict, List, IO
 from datetime import datetime
 
 
@@ -61,21 +61,23 @@ class Jurisprudencia(EndpointV1):
         return cls.methods.get(f"jurisprudencias/documento/{tipo_documento}/{id_documento}")
 
     @classmethod
-    def download_documento_jurisprudencia(cls, tipo_documento: str, id_documento: int, id_arquivo: str, path: str,
-                                          nome_arquivo: str) -> Dict:
+    def download_documento_jurisprudencia(cls, tipo_documento: str, id_documento: int, id_arquivo: str,
+                                          path: Optional[str] = None, nome_arquivo: Optional[str] = None, *,
+                                          arquivo: Optional[IO] = None, sha256: Optional[str] = None) -> Dict:
         """
         Retorna, em formato PDF, um documento de jurisprudência
-         :param tipo_documento: o tipo de documento
+        O pdf é escrito no disco à medida que é baixado, sem ficar inteiro em memória.
+        :param tipo_documento: o tipo de documento
         :param id_documento: o ID do documento
         :param id_arquivo: o ID do arquivo do documento
         :param path: caminho onde o pdf será salvo
         :param nome_arquivo: nome do arquivo a ser criado
+        :param arquivo: arquivo binário já aberto onde o pdf será escrito, ao invés de `path` e `nome_arquivo`
+        :param sha256: hash SHA-256 esperado do pdf, em hexadecimal
         :return: Dict
         """
-
-        conteudo = cls.methods.get(f"jurisprudencias/pdf/{tipo_documento}/{id_documento}/{id_arquivo}")
-
-        if conteudo['sucesso'] is True:
-            return Documento.get_pdf(conteudo, path, nome_arquivo)
-        else:
-            return conteudo
+        destino = Documento.destino(path, nome_arquivo, arquivo)
+        if isinstance(destino, dict):
+            return destino
+        return cls.methods.baixar(f"jurisprudencias/pdf/{tipo_documento}/{id_documento}/{id_arquivo}", destino,
+                                  sha256=sha256)
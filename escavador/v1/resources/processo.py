@@ -1,7 +1,7 @@
 from escavador.resources.helpers.endpoint import EndpointV1
 from escavador.resources.helpers.enums_v1 import TiposBusca
 from escavador.resources.helpers.documento import Documento
-from typing import Optional, List, Dict, Union
+from typing import Optional, List, Dict, Union, IO
 
 
 class Processo(EndpointV1):
@@ -238,17 +238,19 @@ class Processo(EndpointV1):
         return cls.methods.get(f"processos/{id_processo}/envolvidos", params=params)
 
     @classmethod
-    def get_pdf(cls, link_pdf: str, path: str, nome_arquivo: str) -> Dict:
+    def get_pdf(cls, link_pdf: str, path: Optional[str] = None, nome_arquivo: Optional[str] = None, *,
+                arquivo: Optional[IO] = None, sha256: Optional[str] = None) -> Dict:
         """
         Baixa um pdf de autos de acordo com seu link e salva no caminho enviado, com o nome enviado
+        O pdf é escrito no disco à medida que é baixado, sem ficar inteiro em memória.
         :param nome_arquivo: nome do arquivo a ser criado
         :param link_pdf: link do documento
         :param path: caminho onde o pdf será salvo
+        :param arquivo: arquivo binário já aberto onde o pdf será escrito, ao invés de `path` e `nome_arquivo`
+        :param sha256: hash SHA-256 esperado do pdf, em hexadecimal
         :return: Dict
         """
-        conteudo = cls.methods.get(link_pdf)
-
-        if type(conteudo) is dict:
-            return conteudo
-        else:
-            return Documento.get_pdf(conteudo, path, nome_arquivo)
+        destino = Documento.destino(path, nome_arquivo, arquivo)
+        if isinstance(destino, dict):
+            return destino
+        return cls.methods.baixar(link_pdf, destino, sha256=sha256)
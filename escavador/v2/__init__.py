@@ -1,4 +1,4 @@
 from .resources.envolvido import Envolvido
-from .resources.movimentacao import Movimentacao
+from .resources.movimentacao import Movimentacao, MarcaMovimentacoes
 from .resources.processo import Processo
 from .resources.tribunal import Tribunal
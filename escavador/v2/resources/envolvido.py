@@ -1,18 +1,24 @@
-from dataclasses import dataclass, field
+from dataclasses import field
+from functools import partial
 
-from typing import Optional, List, Dict, Tuple, Union, TYPE_CHECKING, Type
+from typing import Optional, List, Dict, Tuple, Union, TYPE_CHECKING, Type, Callable
 
 from escavador.resources import ListaResultados
 from escavador.exceptions import FailedRequest
 from escavador.resources.helpers.enums_v2 import CriterioOrdenacao, Ordem, SiglaTribunal
 from escavador.resources.helpers.endpoint import DataEndpoint
-from escavador.resources.helpers.consume_cursor import consumir_cursor, json_to_class
+from escavador.resources.helpers.dataclass_compacta import dataclass_compacta
+from escavador.resources.helpers.consume_cursor import (
+    consumir_cursor,
+    consumir_cursor_async,
+    json_to_class,
+)
 
 if TYPE_CHECKING:
     from escavador.v2 import Processo
 
 
-@dataclass
+@dataclass_compacta
 class Oab:
     """Representação de uma carteira da OAB.
 
@@ -37,7 +43,7 @@ class Oab:
         )
 
 
-@dataclass
+@dataclass_compacta
 class EnvolvidoEncontrado:
     """Representação do envolvido encontrado na busca por envolvido.
 
@@ -56,6 +62,7 @@ class EnvolvidoEncontrado:
     _classe_buscada: Type["DataEndpoint"] = field(
         default=None, hash=False, compare=False, repr=False
     )
+    _lazy: bool = field(default=False, hash=False, compare=False, repr=False)
 
     @classmethod
     def from_json(
@@ -63,6 +70,7 @@ class EnvolvidoEncontrado:
         json_dict: Optional[Dict],
         last_cursor: str = "",
         classe_buscada: Type["DataEndpoint"] = None,
+        lazy: bool = False,
     ) -> Optional["EnvolvidoEncontrado"]:
         if json_dict is None:
             return None
@@ -77,6 +85,7 @@ class EnvolvidoEncontrado:
             cpfs_com_esse_nome=json_dict.get("cpfs_com_esse_nome", None),
             last_valid_cursor=last_cursor,
             _classe_buscada=classe_buscada,
+            _lazy=lazy,
         )
 
     def continuar_busca(self) -> Union[ListaResultados["DataEndpoint"], FailedRequest]:
@@ -92,10 +101,33 @@ class EnvolvidoEncontrado:
                 raise FailedRequest(status=resposta["http_status"], **conteudo)
 
             self.last_valid_cursor = resposta["resposta"].get("links", {}).get("next", "")
-            return json_to_class(resposta, self._classe_buscada.from_json, add_cursor=True)
+            return json_to_class(resposta, self._construtor(), add_cursor=True)
 
         return ListaResultados()
 
+    async def continuar_busca_async(self) -> Union[ListaResultados["DataEndpoint"], FailedRequest]:
+        """Versão assíncrona de `continuar_busca`.
+
+        :return: lista contendo a próxima página de resultados, ou FailedRequest em caso de erro
+        """
+        if self.last_valid_cursor and self._classe_buscada:
+            resposta = await consumir_cursor_async(self.last_valid_cursor)
+
+            if not resposta["sucesso"]:
+                conteudo = resposta.get("resposta", {})
+                raise FailedRequest(status=resposta["http_status"], **conteudo)
+
+            self.last_valid_cursor = resposta["resposta"].get("links", {}).get("next", "")
+            return json_to_class(resposta, self._construtor(), add_cursor=True)
+
+        return ListaResultados()
+
+    def _construtor(self) -> Callable[..., Optional["DataEndpoint"]]:
+        """Construtor dos resultados da busca, mantendo o modo preguiçoso da busca original."""
+        if self._lazy:
+            return partial(self._classe_buscada.from_json, lazy=True)
+        return self._classe_buscada.from_json
+
     def __eq__(self, other):
         if isinstance(other, Envolvido):
             # se só tem um CPF com esse nome, podemos dar como certo que é a mesma pessoa
@@ -120,7 +152,7 @@ class EnvolvidoEncontrado:
         return False
 
 
-@dataclass
+@dataclass_compacta
 class Envolvido(DataEndpoint):
     """Representação de um envolvido em um processo, seja ele um advogado, um polo, um juiz, ou um terceiro.
 
@@ -141,6 +173,22 @@ class Envolvido(DataEndpoint):
     :attr last_valid_cursor: último cursor válido para a próxima página de resultados
     """
 
+    _COLUNAS_TABELA = (
+        ("nome", ("nome",), "string"),
+        ("tipo", ("tipo",), "string"),
+        ("tipo_normalizado", ("tipo_normalizado",), "string"),
+        ("tipo_pessoa", ("tipo_pessoa",), "string"),
+        ("polo", ("polo",), "string"),
+        ("quantidade_processos", ("quantidade_processos",), "int"),
+        ("prefixo", ("prefixo",), "string"),
+        ("sufixo", ("sufixo",), "string"),
+        ("cpf", ("cpf",), "string"),
+        ("cnpj", ("cnpj",), "string"),
+        ("oabs_numero", ("oabs", "*", "numero"), "list<int>"),
+        ("oabs_uf", ("oabs", "*", "uf"), "list<string>"),
+        ("advogados_nome", ("advogados", "*", "nome"), "list<string>"),
+    )
+
     nome: Optional[str]
     tipo: Optional[str]
     tipo_normalizado: str
@@ -273,7 +321,7 @@ class Envolvido(DataEndpoint):
         return False
 
 
-@dataclass
+@dataclass_compacta
 class TipoEnvolvidoPesquisado:
     """Representação padronizada do tipo que o envolvido pesquisado assumiu na fonte específica
 
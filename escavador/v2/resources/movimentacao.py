@@ -1,17 +1,22 @@
-from dataclasses import dataclass, field
-from typing import Optional, Dict, Union, TYPE_CHECKING
+from dataclasses import field
+from typing import Optional, Dict, List, Union, TYPE_CHECKING
 
 from escavador.resources import ListaResultados
 from escavador.exceptions import FailedRequest
 from escavador.v2.resources.tribunal import Tribunal
-from escavador.resources.helpers.consume_cursor import consumir_cursor, json_to_class
+from escavador.resources.helpers.consume_cursor import (
+    consumir_cursor,
+    consumir_cursor_async,
+    json_to_class,
+)
 from escavador.resources.helpers.endpoint import DataEndpoint
+from escavador.resources.helpers.dataclass_compacta import dataclass_compacta
 
 if TYPE_CHECKING:
     from escavador.v2 import Processo
 
 
-@dataclass
+@dataclass_compacta
 class FonteMovimentacao:
     """Fonte de onde uma movimentação foi extraída.
 
@@ -51,7 +56,7 @@ class FonteMovimentacao:
         )
 
 
-@dataclass(frozen=True)
+@dataclass_compacta(frozen=True)
 class ClassificacaoMovimentacao:
     """Classificação de uma movimentação.
 
@@ -66,7 +71,7 @@ class ClassificacaoMovimentacao:
     hierarquia: str
 
 
-@dataclass
+@dataclass_compacta
 class Movimentacao(DataEndpoint):
     """Uma movimentação em um processo.
 
@@ -82,6 +87,24 @@ class Movimentacao(DataEndpoint):
     :attr last_valid_cursor: link do cursor caso queira mais resultados. Não é um atributo da movimentação
     """
 
+    _COLUNAS_TABELA = (
+        ("id", ("id",), "int"),
+        ("data", ("data",), "string"),
+        ("tipo", ("tipo",), "string"),
+        ("tipo_publicacao", ("tipo_publicacao",), "string"),
+        ("conteudo", ("conteudo",), "string"),
+        ("texto_categoria", ("texto_categoria",), "string"),
+        ("classificacao_predita_nome", ("classificacao_predita", "nome"), "string"),
+        ("classificacao_predita_descricao", ("classificacao_predita", "descricao"), "string"),
+        ("classificacao_predita_hierarquia", ("classificacao_predita", "hierarquia"), "string"),
+        ("fonte_nome", ("fonte", "nome"), "string"),
+        ("fonte_sigla", ("fonte", "sigla"), "string"),
+        ("fonte_tipo", ("fonte", "tipo"), "string"),
+        ("fonte_grau", ("fonte", "grau"), "int"),
+        ("fonte_caderno", ("fonte", "caderno"), "string"),
+        ("fonte_tribunal_sigla", ("fonte", "tribunal", "sigla"), "string"),
+    )
+
     id: int
     data: str
     tipo: Optional[str] = None
@@ -157,3 +180,74 @@ class Movimentacao(DataEndpoint):
             return json_to_class(resposta, self.from_json, add_cursor=True)
 
         return ListaResultados()
+
+    async def continuar_busca_async(self) -> Union[ListaResultados["Movimentacao"], FailedRequest]:
+        """Versão assíncrona de `continuar_busca`.
+
+        :return: lista de movimentações ou FailedRequest
+        """
+        if self.last_valid_cursor:
+            resposta = await consumir_cursor_async(self.last_valid_cursor)
+
+            if not resposta["sucesso"]:
+                conteudo = resposta.get("resposta", {})
+                raise FailedRequest(status=resposta["http_status"], **conteudo)
+
+            return json_to_class(resposta, self.from_json, add_cursor=True)
+
+        return ListaResultados()
+
+
+@dataclass_compacta(frozen=True)
+class MarcaMovimentacoes:
+    """Marca até onde as movimentações de um processo já foram sincronizadas.
+
+    Deve ser guardada pelo usuário entre uma sincronização e outra (ver `to_json` e `from_json`).
+
+    :attr id: id da movimentação mais recente já vista
+    :attr data: data da movimentação mais recente já vista
+    """
+
+    id: Optional[int] = None
+    data: Optional[str] = None
+
+    @classmethod
+    def from_json(cls, json_dict: Optional[Dict]) -> Optional["MarcaMovimentacoes"]:
+        if json_dict is None:
+            return None
+
+        return cls(id=json_dict.get("id"), data=json_dict.get("data"))
+
+    def to_json(self) -> Dict:
+        return {"id": self.id, "data": self.data}
+
+    @classmethod
+    def da_movimentacao(cls, movimentacao: Movimentacao) -> "MarcaMovimentacoes":
+        """Cria a marca a partir da movimentação mais recente já vista."""
+        return cls(id=movimentacao.id, data=movimentacao.data)
+
+    def ja_vista(self, movimentacao: Movimentacao) -> bool:
+        """Indica se a movimentação já tinha sido vista na sincronização que gerou esta marca.
+
+        A movimentação é considerada vista se for a própria movimentação da marca ou se for de uma data
+        anterior a ela. Movimentações da mesma data e com outro id são consideradas novas.
+        """
+        if self.id is not None and movimentacao.id == self.id:
+            return True
+        return bool(self.data and movimentacao.data and movimentacao.data[:10] < self.data[:10])
+
+
+@dataclass_compacta
+class SincronizacaoMovimentacoes:
+    """Resultado de uma sincronização incremental de movimentações.
+
+    :attr numero_cnj: número do processo sincronizado
+    :attr novas: movimentações que não tinham sido vistas, da mais recente para a mais antiga
+    :attr marca: nova marca, a ser usada na próxima sincronização
+    :attr paginas: quantidade de páginas buscadas na API
+    """
+
+    numero_cnj: str
+    novas: List[Movimentacao]
+    marca: Optional[MarcaMovimentacoes]
+    paginas: int = 0
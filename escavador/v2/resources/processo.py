@@ -1,18 +1,35 @@
-from functools import total_ordering
-from dataclasses import dataclass, field
-from typing import Optional, Dict, List, Union, Tuple
+import heapq
+import time
+from functools import partial, total_ordering
+from dataclasses import field
+from pathlib import Path
+from typing import Optional, Dict, List, Union, Tuple, Iterable, Iterator, Callable, IO, Sequence
 
 from escavador.resources import ListaResultados
 from escavador.exceptions import FailedRequest
 from escavador.resources.helpers.endpoint import DataEndpoint
+from escavador.resources.helpers.dataclass_compacta import dataclass_compacta
+from escavador.resources.helpers.parse_preguicoso import ParsePreguicoso
 from escavador.resources.helpers.enums_v2 import Ordem, CriterioOrdenacao, SiglaTribunal
-from escavador.resources.helpers.consume_cursor import json_to_class, consumir_cursor
-from escavador.v2.resources.movimentacao import Movimentacao
+from escavador.resources.helpers.paralelo import executar_em_paralelo, DEFAULT_MAX_WORKERS
+from escavador.resources.helpers.consume_cursor import (
+    json_to_class,
+    consumir_cursor,
+    consumir_cursor_async,
+    pagina_do_cursor,
+)
+from escavador.resources.helpers.checkpoint import CheckpointStore, iterar_com_checkpoint
+from escavador.resources.helpers.exportacao import exportar_ndjson
+from escavador.v2.resources.movimentacao import (
+    Movimentacao,
+    MarcaMovimentacoes,
+    SincronizacaoMovimentacoes,
+)
 from escavador.v2.resources.tribunal import Tribunal
 from escavador.v2.resources.envolvido import Envolvido, EnvolvidoEncontrado, TipoEnvolvidoPesquisado
 
 
-@dataclass(frozen=True)
+@dataclass_compacta(frozen=True)
 class SolicitacaoAtualizacao:
     """Informações sobre a solicitação de atualização de um processo.
 
@@ -58,7 +75,7 @@ class SolicitacaoAtualizacao:
         return StatusAtualizacao.from_json(resposta["resposta"])
 
 
-@dataclass
+@dataclass_compacta
 class StatusAtualizacao:
     """Informações sobre o status do último pedido de atualização de um processo."""
 
@@ -99,8 +116,35 @@ class StatusAtualizacao:
         return self
 
 
+@dataclass_compacta
+class EventoAtualizacao:
+    """Resultado da atualização de um processo solicitada por `Processo.atualizar_em_lote`.
 
-@dataclass
+    :attr numero_cnj: número do CNJ do processo
+    :attr status: status final da solicitação ("SUCESSO", "NAO_ENCONTRADO", "ERRO"), ou "TEMPO_ESGOTADO" se ela
+    não terminou dentro do tempo máximo informado
+    :attr solicitacao: a solicitação de atualização, com o último status consultado
+    :attr processo: o processo atualizado, buscado apenas quando a atualização termina com sucesso
+    :attr erro: o erro ao solicitar a atualização, consultar o status ou buscar o processo (FailedRequest, falha
+    de conexão ou do limitador de requisições)
+    :attr verificacoes: quantidade de consultas de status feitas
+    :attr duracao: segundos entre a solicitação e o fim da atualização
+    """
+
+    numero_cnj: str
+    status: str
+    solicitacao: Optional[SolicitacaoAtualizacao] = None
+    processo: Optional["Processo"] = None
+    erro: Optional[Exception] = None
+    verificacoes: int = 0
+    duracao: float = 0.0
+
+    @property
+    def sucesso(self) -> bool:
+        return self.status == "SUCESSO" and self.erro is None
+
+
+@dataclass_compacta
 class EstadoOrigem:
     """Estado de origem de um processo.
 
@@ -122,7 +166,7 @@ class EstadoOrigem:
         )
 
 
-@dataclass
+@dataclass_compacta
 class UnidadeOrigem:
     """Unidade de origem de um processo.
 
@@ -156,8 +200,8 @@ class UnidadeOrigem:
         )
 
 
-@dataclass
-class Processo(DataEndpoint):
+@dataclass_compacta
+class Processo(DataEndpoint, ParsePreguicoso):
     """
     Representa um processo retornado pela API do Escavador.
 
@@ -180,8 +224,35 @@ class Processo(DataEndpoint):
     :attr unidade_origem: unidade de origem do processo
     :attr fontes: lista de fontes do processo
     :attr last_valid_cursor: link do cursor caso queira mais resultados. Não é um atributo do processo.
+
+    Quando construído com `lazy=True`, os campos `match_fontes`, `estado_origem`, `unidade_origem` e
+    `fontes` só são montados no primeiro acesso, a partir do json original.
     """
 
+    _CAMPOS_PREGUICOSOS = ("match_fontes", "estado_origem", "unidade_origem", "fontes")
+    _COLUNAS_TABELA = (
+        ("numero_cnj", ("numero_cnj",), "string"),
+        ("titulo_polo_ativo", ("titulo_polo_ativo",), "string"),
+        ("titulo_polo_passivo", ("titulo_polo_passivo",), "string"),
+        ("ano_inicio", ("ano_inicio",), "int"),
+        ("data_inicio", ("data_inicio",), "string"),
+        ("data_ultima_movimentacao", ("data_ultima_movimentacao",), "string"),
+        ("data_ultima_verificacao", ("data_ultima_verificacao",), "string"),
+        ("quantidade_movimentacoes", ("quantidade_movimentacoes",), "int"),
+        ("fontes_tribunais_estao_arquivadas", ("fontes_tribunais_estao_arquivadas",), "bool"),
+        ("tipo_match", ("tipo_match",), "string"),
+        ("match_fontes_tribunal", ("match_fontes", "tribunal"), "bool"),
+        ("match_fontes_diario_oficial", ("match_fontes", "diario_oficial"), "bool"),
+        ("estado_origem_sigla", ("estado_origem", "sigla"), "string"),
+        ("unidade_origem_nome", ("unidade_origem", "nome"), "string"),
+        ("fontes_sigla", ("fontes", "*", "sigla"), "list<string>"),
+        ("fontes_tipo", ("fontes", "*", "tipo"), "list<string>"),
+        ("fontes_grau", ("fontes", "*", "grau"), "list<int>"),
+        ("fontes_tribunal_sigla", ("fontes", "*", "tribunal", "sigla"), "list<string>"),
+        ("fontes_classe", ("fontes", "*", "capa", "classe"), "list<string>"),
+        ("fontes_assunto", ("fontes", "*", "capa", "assunto"), "list<string>"),
+    )
+
     numero_cnj: str
     quantidade_movimentacoes: int
     fontes_tribunais_estao_arquivadas: bool = field(hash=False, compare=False)
@@ -198,9 +269,12 @@ class Processo(DataEndpoint):
     unidade_origem: Optional[UnidadeOrigem] = field(default=None, hash=False, compare=False)
     fontes: List["FonteProcesso"] = field(default_factory=list)
     last_valid_cursor: str = field(default="", repr=False, hash=False)
+    _json: Optional[Dict] = field(default=None, repr=False, hash=False, compare=False)
 
     @classmethod
-    def from_json(cls, json_dict: Optional[Dict], ultimo_cursor: str = "") -> Optional["Processo"]:
+    def from_json(
+        cls, json_dict: Optional[Dict], ultimo_cursor: str = "", lazy: bool = False
+    ) -> Optional["Processo"]:
         if json_dict is None:
             return None
 
@@ -216,20 +290,31 @@ class Processo(DataEndpoint):
             data_ultima_verificacao=json_dict.get("data_ultima_verificacao", None),
             tempo_desde_ultima_verificacao=json_dict.get("tempo_desde_ultima_verificacao", None),
             tipo_match=json_dict.get("tipo_match", None),
-            match_fontes=MatchFontes(
-                tribunal=json_dict.get("match_fontes", {}).get("tribunal", False),
-                diario_oficial=json_dict.get("match_fontes", {}).get("diario_oficial", False),
-            ),
-            estado_origem=EstadoOrigem.from_json(json_dict.get("estado_origem")),
-            unidade_origem=UnidadeOrigem.from_json(json_dict.get("unidade_origem")),
+            match_fontes=None,
             last_valid_cursor=ultimo_cursor,
+            _json=json_dict if lazy else None,
         )
-        instance.fontes += [
-            FonteProcesso.from_json(fonte) for fonte in json_dict.get("fontes", []) if fonte
-        ]
+        instance._preencher_campos(json_dict, lazy)
 
         return instance
 
+    @classmethod
+    def _construir_campo(cls, nome: str, json_dict: Dict, lazy: bool):
+        if nome == "match_fontes":
+            return MatchFontes(
+                tribunal=json_dict.get("match_fontes", {}).get("tribunal", False),
+                diario_oficial=json_dict.get("match_fontes", {}).get("diario_oficial", False),
+            )
+        if nome == "estado_origem":
+            return EstadoOrigem.from_json(json_dict.get("estado_origem"))
+        if nome == "unidade_origem":
+            return UnidadeOrigem.from_json(json_dict.get("unidade_origem"))
+        return [
+            FonteProcesso.from_json(fonte, lazy=lazy)
+            for fonte in json_dict.get("fontes", [])
+            if fonte
+        ]
+
     @staticmethod
     def por_numero(numero_cnj: str, **kwargs) -> "Processo":
         """
@@ -249,6 +334,56 @@ class Processo(DataEndpoint):
 
         return Processo.from_json(resposta["resposta"], resposta.get("links", {}).get("next", ""))
 
+    @staticmethod
+    def por_numeros(
+        numeros_cnj: Iterable[str],
+        *,
+        max_workers: int = DEFAULT_MAX_WORKERS,
+        ordenado: bool = False,
+        **kwargs,
+    ) -> Iterator[Tuple[str, Union["Processo", Exception]]]:
+        """
+        Busca os dados de vários processos pelos seus números únicos do CNJ, em paralelo.
+
+        As requisições respeitam o limite de requisições por minuto do SDK. Os números são consumidos sob
+        demanda, então é possível informar um gerador com milhares de processos.
+
+        :param numeros_cnj: os números únicos do CNJ dos processos
+        :param max_workers: quantidade máxima de requisições simultâneas
+        :param ordenado: se True, os resultados são produzidos na mesma ordem dos números informados.
+        Caso contrário, são produzidos à medida que as requisições terminam.
+        :return: iterador de tuplas com o número do CNJ e o processo encontrado, ou a exceção em caso de erro
+        (FailedRequest, falha de conexão ou do limitador de requisições)
+
+        >>> for numero_cnj, processo in Processo.por_numeros(["0000000-00.0000.0.00.0000"]): # doctest: +SKIP
+        ...     print(numero_cnj, processo)
+        """
+        return executar_em_paralelo(
+            lambda numero_cnj: Processo.por_numero(numero_cnj, **kwargs),
+            numeros_cnj,
+            max_workers=max_workers,
+            ordenado=ordenado,
+        )
+
+    @staticmethod
+    async def por_numero_async(numero_cnj: str, **kwargs) -> "Processo":
+        """
+        Versão assíncrona de `Processo.por_numero`.
+
+        :param numero_cnj: o número único do CNJ do processo
+        :return: o processo encontrado, ou uma exception caso não seja encontrado
+
+        >>> await Processo.por_numero_async("0000000-00.0000.0.00.0000") # doctest: +SKIP
+        """
+
+        resposta = await Processo.async_methods.get(f"processos/numero_cnj/{numero_cnj}", **kwargs)
+
+        if not resposta["sucesso"]:
+            conteudo = resposta.get("resposta", {})
+            raise FailedRequest(status=resposta["http_status"], **conteudo)
+
+        return Processo.from_json(resposta["resposta"], resposta.get("links", {}).get("next", ""))
+
     @staticmethod
     def movimentacoes(numero_cnj: str, **kwargs) -> ListaResultados[Movimentacao]:
         """
@@ -271,6 +406,133 @@ class Processo(DataEndpoint):
 
         return json_to_class(first_response, constructor=Movimentacao.from_json, add_cursor=True)
 
+    @staticmethod
+    def movimentacoes_novas(
+        numero_cnj: str, marca: Optional[MarcaMovimentacoes] = None, **kwargs
+    ) -> SincronizacaoMovimentacoes:
+        """
+        Busca apenas as movimentações de um processo posteriores à marca da última sincronização.
+
+        As movimentações são retornadas da mais recente para a mais antiga, então as páginas só são
+        percorridas até a primeira movimentação já vista. Na maior parte dos dias, isso significa uma única
+        requisição por processo, ao invés de todas as páginas.
+
+        :param numero_cnj: o número único do CNJ do processo
+        :param marca: marca retornada pela sincronização anterior. Se omitida, todas as movimentações são
+        buscadas.
+        :param kwargs: parâmetros da busca, como em `Processo.movimentacoes` (ex: limit=50)
+        :return: as movimentações novas e a marca a ser usada na próxima sincronização
+
+        >>> resultado = Processo.movimentacoes_novas("0000000-00.0000.0.00.0000", marca) # doctest: +SKIP
+        >>> salvar(resultado.marca.to_json()) # doctest: +SKIP
+        """
+        novas = []
+        paginas = 0
+        pagina = Processo.movimentacoes(numero_cnj, **kwargs)
+        while pagina:
+            paginas += 1
+            for movimentacao in pagina:
+                if marca is not None and marca.ja_vista(movimentacao):
+                    pagina = None
+                    break
+                novas.append(movimentacao)
+            else:
+                pagina = pagina.continuar_busca()
+
+        return SincronizacaoMovimentacoes(
+            numero_cnj=numero_cnj,
+            novas=novas,
+            marca=MarcaMovimentacoes.da_movimentacao(novas[0]) if novas else marca,
+            paginas=paginas,
+        )
+
+    @staticmethod
+    def sincronizar_movimentacoes(
+        marcas: Union[Dict[str, Optional[MarcaMovimentacoes]], Iterable[str]],
+        *,
+        max_workers: int = DEFAULT_MAX_WORKERS,
+        ordenado: bool = False,
+        **kwargs,
+    ) -> Iterator[Tuple[str, Union[SincronizacaoMovimentacoes, Exception]]]:
+        """
+        Executa `Processo.movimentacoes_novas` para vários processos, em paralelo.
+
+        :param marcas: dicionário com o número do CNJ de cada processo e a sua última marca (ou None), ou
+        apenas os números do CNJ, para buscar todas as movimentações
+        :param max_workers: quantidade máxima de processos sincronizados simultaneamente
+        :param ordenado: se True, os resultados são produzidos na mesma ordem dos processos informados
+        :param kwargs: parâmetros da busca, como em `Processo.movimentacoes`
+        :return: iterador de tuplas com o número do CNJ e o resultado da sincronização, ou a exceção em caso de
+        erro (FailedRequest, falha de conexão ou do limitador de requisições)
+
+        >>> for numero_cnj, resultado in Processo.sincronizar_movimentacoes(marcas): # doctest: +SKIP
+        ...     marcas[numero_cnj] = resultado.marca
+        """
+        if not isinstance(marcas, dict):
+            marcas = dict.fromkeys(marcas)
+
+        return executar_em_paralelo(
+            lambda numero_cnj: Processo.movimentacoes_novas(numero_cnj, marcas[numero_cnj], **kwargs),
+            marcas,
+            max_workers=max_workers,
+            ordenado=ordenado,
+        )
+
+    @staticmethod
+    def exportar_movimentacoes(
+        numero_cnj: str,
+        destino: Union[str, Path, IO],
+        campos: Optional[Sequence[str]] = None,
+        comprimir: Optional[bool] = None,
+        **kwargs,
+    ) -> int:
+        """
+        Exporta todas as movimentações de um processo para um arquivo NDJSON (um json por linha).
+
+        As páginas são percorridas uma a uma e cada movimentação é escrita exatamente como retornada pela
+        API, sem instanciar objetos `Movimentacao`, então o consumo de memória não depende da quantidade
+        de movimentações.
+
+        :param numero_cnj: o número único do CNJ do processo
+        :param destino: caminho do arquivo (comprimido em gzip se terminar em ".gz") ou arquivo já aberto
+        :param campos: campos a manter em cada movimentação, com "." para campos aninhados
+        (ex: ["id", "data", "fonte.sigla"]). Se omitido, a movimentação é escrita inteira.
+        :param comprimir: força ou desabilita a compressão em gzip
+        :param kwargs: parâmetros da busca, como em `Processo.movimentacoes` (ex: limit=500)
+        :return: quantidade de movimentações exportadas
+
+        >>> Processo.exportar_movimentacoes("0000000-00.0000.0.00.0000", "movimentacoes.ndjson.gz") # doctest: +SKIP
+        """
+        return exportar_ndjson(
+            destino,
+            f"processos/numero_cnj/{numero_cnj}/movimentacoes",
+            params=kwargs,
+            campos=campos,
+            comprimir=comprimir,
+        )
+
+    @staticmethod
+    async def movimentacoes_async(numero_cnj: str, **kwargs) -> ListaResultados[Movimentacao]:
+        """
+        Versão assíncrona de `Processo.movimentacoes`.
+
+        :param numero_cnj: o número único do CNJ do processo
+        :return: uma lista de movimentacoes
+
+        >>> await Processo.movimentacoes_async("0000000-00.0000.0.00.0000") # doctest: +SKIP
+        """
+        params = kwargs
+
+        first_response = await Processo.async_methods.get(
+            f"processos/numero_cnj/{numero_cnj}/movimentacoes", params=params, **kwargs
+        )
+
+        if not first_response["sucesso"]:
+            conteudo = first_response.get("resposta", {})
+            raise FailedRequest(status=first_response["http_status"], **conteudo)
+
+        return json_to_class(first_response, constructor=Movimentacao.from_json, add_cursor=True)
+
     @staticmethod
     def por_nome(
         nome: str,
@@ -443,6 +705,7 @@ class Processo(DataEndpoint):
         data_minima: Optional[str] = None,
         data_maxima: Optional[str] = None,
         limit: Optional[int] = None,
+        lazy: bool = False,
         **kwargs,
     ) -> Tuple[Optional[EnvolvidoEncontrado], ListaResultados["Processo"]]:
         """
@@ -467,6 +730,9 @@ class Processo(DataEndpoint):
         A data deve ser estar no formato AAAA-MM-DD, e caso a data mínima seja informada, deve ser maior que ela.
         :param limit: quantidade de resultados desejados por página. Se não estiver dentro dos
         valores permitidos, resultará em uma exceção.
+        :param lazy: se True, as fontes, o estado e a unidade de origem de cada processo só são
+        construídos quando acessados pela primeira vez, o que acelera buscas em que só os dados
+        principais dos processos são usados
         :return: tupla com os dados do envolvido encontrado e uma lista de processos
 
         >>> Processo.por_envolvido(cpf_cnpj="07.838.351/0021.60") # doctest: +SKIP
@@ -478,7 +744,135 @@ class Processo(DataEndpoint):
         ...                             limit=100) # doctest: +SKIP
         """
 
-        params = {
+        params = Processo._params_por_envolvido(
+            cpf_cnpj=cpf_cnpj,
+            nome=nome,
+            ordena_por=ordena_por,
+            ordem=ordem,
+            tribunais=tribunais,
+            incluir_homonimos=incluir_homonimos,
+            status=status,
+            data_minima=data_minima,
+            data_maxima=data_maxima,
+            limit=limit,
+        )
+
+        first_response = Processo.methods.get("envolvido/processos", params=params, **kwargs)
+
+        return Processo._resultado_busca(first_response, "envolvido_encontrado", lazy=lazy)
+
+    @staticmethod
+    async def por_envolvido_async(
+        cpf_cnpj: Optional[str] = None,
+        nome: Optional[str] = None,
+        ordena_por: Optional[CriterioOrdenacao] = None,
+        ordem: Optional[Ordem] = None,
+        tribunais: Optional[List[SiglaTribunal]] = None,
+        incluir_homonimos: Optional[bool] = None,
+        status: Optional[str] = None,
+        data_minima: Optional[str] = None,
+        data_maxima: Optional[str] = None,
+        limit: Optional[int] = None,
+        lazy: bool = False,
+        **kwargs,
+    ) -> Tuple[Optional[EnvolvidoEncontrado], ListaResultados["Processo"]]:
+        """
+        Versão assíncrona de `Processo.por_envolvido`.
+
+        :return: tupla com os dados do envolvido encontrado e uma lista de processos
+
+        >>> await Processo.por_envolvido_async(cpf_cnpj="07.838.351/0021.60") # doctest: +SKIP
+        """
+        params = Processo._params_por_envolvido(
+            cpf_cnpj=cpf_cnpj,
+            nome=nome,
+            ordena_por=ordena_por,
+            ordem=ordem,
+            tribunais=tribunais,
+            incluir_homonimos=incluir_homonimos,
+            status=status,
+            data_minima=data_minima,
+            data_maxima=data_maxima,
+            limit=limit,
+        )
+
+        first_response = await Processo.async_methods.get(
+            "envolvido/processos", params=params, **kwargs
+        )
+
+        return Processo._resultado_busca(first_response, "envolvido_encontrado", lazy=lazy)
+
+    @staticmethod
+    def por_envolvido_com_checkpoint(
+        checkpoint_id: str,
+        store: CheckpointStore,
+        cpf_cnpj: Optional[str] = None,
+        nome: Optional[str] = None,
+        ordena_por: Optional[CriterioOrdenacao] = None,
+        ordem: Optional[Ordem] = None,
+        tribunais: Optional[List[SiglaTribunal]] = None,
+        incluir_homonimos: Optional[bool] = None,
+        status: Optional[str] = None,
+        data_minima: Optional[str] = None,
+        data_maxima: Optional[str] = None,
+        limit: Optional[int] = None,
+    ) -> Iterator["Processo"]:
+        """
+        Percorre todos os processos de um envolvido, salvando um checkpoint ao fim de cada página.
+
+        Se a varredura for interrompida, chamar o método novamente com o mesmo `checkpoint_id` retoma a
+        busca a partir da página seguinte à última concluída, então no máximo uma página é buscada novamente.
+        Os parâmetros da busca devem ser os mesmos da varredura original.
+
+        :param checkpoint_id: identificador da varredura
+        :param store: onde os checkpoints são salvos (ex: `FileCheckpointStore` ou `SqliteCheckpointStore`)
+        :return: iterador sobre os processos das páginas ainda não concluídas
+
+        Os demais parâmetros são os mesmos de `Processo.por_envolvido`.
+
+        >>> store = SqliteCheckpointStore("checkpoints.db") # doctest: +SKIP
+        >>> for processo in Processo.por_envolvido_com_checkpoint("empresa", store, cpf_cnpj="07838351002160"): # doctest: +SKIP
+        ...     print(processo.numero_cnj)
+        """
+        params = Processo._params_por_envolvido(
+            cpf_cnpj=cpf_cnpj,
+            nome=nome,
+            ordena_por=ordena_por,
+            ordem=ordem,
+            tribunais=tribunais,
+            incluir_homonimos=incluir_homonimos,
+            status=status,
+            data_minima=data_minima,
+            data_maxima=data_maxima,
+            limit=limit,
+        )
+
+        def primeira_pagina() -> ListaResultados["Processo"]:
+            first_response = Processo.methods.get("envolvido/processos", params=params)
+            return Processo._resultado_busca(first_response, "envolvido_encontrado")[1]
+
+        return iterar_com_checkpoint(
+            checkpoint_id,
+            store,
+            params,
+            primeira_pagina,
+            lambda cursor: pagina_do_cursor(cursor, Processo.from_json),
+        )
+
+    @staticmethod
+    def _params_por_envolvido(
+        cpf_cnpj: Optional[str],
+        nome: Optional[str],
+        ordena_por: Optional[CriterioOrdenacao],
+        ordem: Optional[Ordem],
+        tribunais: Optional[List[SiglaTribunal]],
+        incluir_homonimos: Optional[bool],
+        status: Optional[str],
+        data_minima: Optional[str],
+        data_maxima: Optional[str],
+        limit: Optional[int],
+    ) -> Dict:
+        return {
             "nome": nome,
             "cpf_cnpj": cpf_cnpj,
             "ordena_por": ordena_por.value if ordena_por else None,
@@ -491,22 +885,37 @@ class Processo(DataEndpoint):
             "incluir_homonimos": int(incluir_homonimos) if incluir_homonimos is not None else None,
         }
 
-        first_response = Processo.methods.get("envolvido/processos", params=params, **kwargs)
+    @staticmethod
+    def _resultado_busca(
+        first_response: Dict, chave_encontrado: str, lazy: bool = False
+    ) -> Tuple[Optional[EnvolvidoEncontrado], ListaResultados["Processo"]]:
+        """Monta o resultado de uma busca de processos por envolvido ou advogado.
 
+        :param first_response: resposta da primeira página da busca
+        :param chave_encontrado: chave da resposta com os dados do envolvido ou advogado encontrado
+        :param lazy: se True, os processos são construídos no modo preguiçoso
+        :return: tupla com os dados do envolvido encontrado e uma lista de processos
+        """
         if not first_response["sucesso"]:
             conteudo = first_response.get("resposta", {})
             raise FailedRequest(status=first_response["http_status"], **conteudo)
 
-        envolvido_encontrado = EnvolvidoEncontrado.from_json(
-            first_response["resposta"].get("envolvido_encontrado"),
+        encontrado = EnvolvidoEncontrado.from_json(
+            first_response["resposta"].get(chave_encontrado),
             last_cursor=first_response["resposta"].get("links", {}).get("next", ""),
             classe_buscada=Processo,
+            lazy=lazy,
         )
 
-        return envolvido_encontrado, json_to_class(
-            first_response, Processo.from_json, add_cursor=True
+        return encontrado, json_to_class(
+            first_response, Processo._construtor(lazy), add_cursor=True
         )
 
+    @staticmethod
+    def _construtor(lazy: bool) -> Callable[..., Optional["Processo"]]:
+        """Retorna o construtor de processos a partir do json, no modo preguiçoso ou não."""
+        return partial(Processo.from_json, lazy=True) if lazy else Processo.from_json
+
     @staticmethod
     def por_oab(
         numero: Union[str, int],
@@ -518,6 +927,7 @@ class Processo(DataEndpoint):
         data_maxima: Optional[str] = None,
         limit: Optional[int] = None,
         oab_tipo: Optional[str] = None,
+        lazy: bool = False,
         **kwargs,
     ) -> Tuple[Optional[EnvolvidoEncontrado], ListaResultados["Processo"]]:
         """
@@ -538,6 +948,8 @@ class Processo(DataEndpoint):
         valores permitidos, resultará em uma exceção.
         :param oab_tipo: Tipo da OAB. Pode ser informado caso o mesmo número exista para diferentes tipos.
         Pode ser 'ADVOGADO', 'SUPLEMENTAR', 'ESTAGIARIO' ou 'CONSULTOR_ESTRANGEIRO'.
+        :param lazy: se True, as fontes, o estado e a unidade de origem de cada processo só são
+        construídos quando acessados pela primeira vez
         :return: uma tupla contendo um objeto representando o advogado encontrado e a lista de processos
 
         >>> Processo.por_oab(1234, "AC") # doctest: +SKIP
@@ -549,7 +961,74 @@ class Processo(DataEndpoint):
         ...                  limit=100,
         ...                  oab_tipo="ESTAGIARIO") # doctest: +SKIP
         """
-        params = {
+        params = Processo._params_por_oab(
+            numero=numero,
+            estado=estado,
+            ordena_por=ordena_por,
+            ordem=ordem,
+            status=status,
+            data_minima=data_minima,
+            data_maxima=data_maxima,
+            limit=limit,
+            oab_tipo=oab_tipo,
+        )
+
+        first_response = Processo.methods.get("advogado/processos", params=params, **kwargs)
+
+        return Processo._resultado_busca(first_response, "advogado_encontrado", lazy=lazy)
+
+    @staticmethod
+    async def por_oab_async(
+        numero: Union[str, int],
+        estado: str,
+        ordena_por: Optional[CriterioOrdenacao] = None,
+        ordem: Optional[Ordem] = None,
+        status: Optional[str] = None,
+        data_minima: Optional[str] = None,
+        data_maxima: Optional[str] = None,
+        limit: Optional[int] = None,
+        oab_tipo: Optional[str] = None,
+        lazy: bool = False,
+        **kwargs,
+    ) -> Tuple[Optional[EnvolvidoEncontrado], ListaResultados["Processo"]]:
+        """
+        Versão assíncrona de `Processo.por_oab`.
+
+        :return: uma tupla contendo um objeto representando o advogado encontrado e a lista de processos
+
+        >>> await Processo.por_oab_async(1234, "AC") # doctest: +SKIP
+        """
+        params = Processo._params_por_oab(
+            numero=numero,
+            estado=estado,
+            ordena_por=ordena_por,
+            ordem=ordem,
+            status=status,
+            data_minima=data_minima,
+            data_maxima=data_maxima,
+            limit=limit,
+            oab_tipo=oab_tipo,
+        )
+
+        first_response = await Processo.async_methods.get(
+            "advogado/processos", params=params, **kwargs
+        )
+
+        return Processo._resultado_busca(first_response, "advogado_encontrado", lazy=lazy)
+
+    @staticmethod
+    def _params_por_oab(
+        numero: Union[str, int],
+        estado: str,
+        ordena_por: Optional[CriterioOrdenacao],
+        ordem: Optional[Ordem],
+        status: Optional[str],
+        data_minima: Optional[str],
+        data_maxima: Optional[str],
+        limit: Optional[int],
+        oab_tipo: Optional[str],
+    ) -> Dict:
+        return {
             "oab_numero": f"{numero}",
             "oab_estado": estado,
             "ordena_por": ordena_por.value if ordena_por else None,
@@ -561,22 +1040,6 @@ class Processo(DataEndpoint):
             "oab_tipo": oab_tipo,
         }
 
-        first_response = Processo.methods.get("advogado/processos", params=params, **kwargs)
-
-        if not first_response["sucesso"]:
-            conteudo = first_response.get("resposta", {})
-            raise FailedRequest(status=first_response["http_status"], **conteudo)
-
-        advogado_encontrado = EnvolvidoEncontrado.from_json(
-            first_response["resposta"].get("advogado_encontrado"),
-            last_cursor=first_response["resposta"].get("links", {}).get("next", ""),
-            classe_buscada=Processo,
-        )
-
-        return advogado_encontrado, json_to_class(
-            first_response, Processo.from_json, add_cursor=True
-        )
-
     @staticmethod
     def resumo_envolvido(
         cpf_cnpj: Optional[str] = None, nome: Optional[str] = None, **kwargs
@@ -640,7 +1103,25 @@ class Processo(DataEndpoint):
                 conteudo = resposta.get("resposta", {})
                 raise FailedRequest(status=resposta["http_status"], **conteudo)
 
-            return json_to_class(resposta, self.from_json, add_cursor=True)
+            construtor = self._construtor(lazy=self._json is not None)
+            return json_to_class(resposta, construtor, add_cursor=True)
+
+        return ListaResultados()
+
+    async def continuar_busca_async(self) -> ListaResultados["Processo"]:
+        """Versão assíncrona de `continuar_busca`.
+
+        :return: lista de processos ou FailedRequest
+        """
+        if self.last_valid_cursor:
+            resposta = await consumir_cursor_async(self.last_valid_cursor)
+
+            if not resposta["sucesso"]:
+                conteudo = resposta.get("resposta", {})
+                raise FailedRequest(status=resposta["http_status"], **conteudo)
+
+            construtor = self._construtor(lazy=self._json is not None)
+            return json_to_class(resposta, construtor, add_cursor=True)
 
         return ListaResultados()
 
@@ -687,8 +1168,114 @@ class Processo(DataEndpoint):
 
         return StatusAtualizacao.from_json(resposta["resposta"])
 
-
-@dataclass
+    @staticmethod
+    def atualizar_em_lote(
+        numeros_cnj: Iterable[str],
+        *,
+        buscar_processo: bool = True,
+        intervalo_minimo: float = 5,
+        intervalo_maximo: float = 60,
+        tempo_maximo: Optional[float] = None,
+        max_workers: int = DEFAULT_MAX_WORKERS,
+        enviar_callback: int = 0,
+        documentos_publicos: int = 0,
+    ) -> Iterator[EventoAtualizacao]:
+        """Solicita a atualização de vários processos e acompanha as solicitações até terminarem.
+
+        As solicitações são enviadas em paralelo e, em seguida, um único laço consulta o status das que ainda
+        estão pendentes. O intervalo entre as consultas de cada processo cresce com o tempo que a atualização
+        já levou (um quarto do tempo decorrido, entre `intervalo_minimo` e `intervalo_maximo`): atualizações
+        rápidas são percebidas logo, e as demoradas não geram consultas desnecessárias. Números repetidos são
+        atualizados uma única vez.
+
+        :param numeros_cnj: os números únicos do CNJ dos processos
+        :param buscar_processo: se True, busca o processo atualizado quando a atualização termina com sucesso
+        :param intervalo_minimo: segundos mínimos entre a solicitação e a primeira consulta, e entre consultas
+        :param intervalo_maximo: segundos máximos entre duas consultas do mesmo processo
+        :param tempo_maximo: segundos máximos para aguardar cada atualização. Se omitido, aguarda até terminar.
+        :param max_workers: quantidade máxima de requisições simultâneas
+        :param enviar_callback: como em `Processo.solicitar_atualizacao`
+        :param documentos_publicos: como em `Processo.solicitar_atualizacao`
+        :return: iterador de eventos, um por processo, produzidos à medida que as atualizações terminam
+
+        >>> for evento in Processo.atualizar_em_lote(numeros_cnj, tempo_maximo=600): # doctest: +SKIP
+        ...     if evento.sucesso:
+        ...         salvar(evento.processo)
+        """
+        solicitacoes: Dict[str, SolicitacaoAtualizacao] = {}
+        inicios: Dict[str, float] = {}
+        verificacoes: Dict[str, int] = {}
+        agenda: List[Tuple[float, str]] = []
+
+        def solicitar(numero_cnj: str) -> SolicitacaoAtualizacao:
+            return Processo.solicitar_atualizacao(
+                numero_cnj, enviar_callback=enviar_callback, documentos_publicos=documentos_publicos
+            )
+
+        def verificar(numero_cnj: str) -> Tuple[SolicitacaoAtualizacao, Optional[Processo]]:
+            solicitacao = solicitacoes[numero_cnj]
+            ultima = Processo.status_atualizacao(numero_cnj).ultima_verificacao
+            # o status pode ainda se referir a uma solicitação anterior à nossa
+            if ultima is not None and ultima.id >= solicitacao.id:
+                solicitacao = ultima
+            if solicitacao.status != "SUCESSO" or not buscar_processo:
+                return solicitacao, None
+            # a resposta em cache (ou em andamento) pode ser anterior à atualização
+            return solicitacao, Processo.por_numero(numero_cnj, usar_cache=False)
+
+        def evento(numero_cnj: str, status: str, **kwargs) -> EventoAtualizacao:
+            return EventoAtualizacao(
+                numero_cnj=numero_cnj,
+                status=status,
+                solicitacao=solicitacoes.get(numero_cnj),
+                verificacoes=verificacoes.get(numero_cnj, 0),
+                duracao=time.monotonic() - inicios[numero_cnj],
+                **kwargs,
+            )
+
+        for numero_cnj, resultado in executar_em_paralelo(
+            solicitar, dict.fromkeys(numeros_cnj), max_workers=max_workers
+        ):
+            inicios[numero_cnj] = time.monotonic()
+            if isinstance(resultado, Exception):
+                yield evento(numero_cnj, "ERRO", erro=resultado)
+                continue
+            solicitacoes[numero_cnj] = resultado
+            verificacoes[numero_cnj] = 0
+            heapq.heappush(agenda, (inicios[numero_cnj] + intervalo_minimo, numero_cnj))
+
+        while agenda:
+            espera = agenda[0][0] - time.monotonic()
+            if espera > 0:
+                time.sleep(espera)
+
+            agora = time.monotonic()
+            vencidos = []
+            while agenda and agenda[0][0] <= agora:
+                vencidos.append(heapq.heappop(agenda)[1])
+
+            for numero_cnj, resultado in executar_em_paralelo(verificar, vencidos, max_workers=max_workers):
+                verificacoes[numero_cnj] += 1
+                if isinstance(resultado, Exception):
+                    yield evento(numero_cnj, "ERRO", erro=resultado)
+                    continue
+
+                solicitacao, processo = resultado
+                solicitacoes[numero_cnj] = solicitacao
+                if solicitacao.status != "PENDENTE":
+                    yield evento(numero_cnj, solicitacao.status, processo=processo)
+                    continue
+
+                agora = time.monotonic()
+                decorrido = agora - inicios[numero_cnj]
+                if tempo_maximo is not None and decorrido >= tempo_maximo:
+                    yield evento(numero_cnj, "TEMPO_ESGOTADO")
+                    continue
+                intervalo = min(intervalo_maximo, max(intervalo_minimo, decorrido / 4))
+                heapq.heappush(agenda, (agora + intervalo, numero_cnj))
+
+
+@dataclass_compacta
 class MatchFontes:
     """Informa em que tipo de fonte o match do envolvido ou advogado buscado aconteceu.
 
@@ -699,8 +1286,8 @@ class MatchFontes:
     diario_oficial: bool
 
 
-@dataclass
-class FonteProcesso:
+@dataclass_compacta
+class FonteProcesso(ParsePreguicoso):
     """Uma fonte da qual foram extraídas as informações de um processo.
 
     :attr id: id da fonte no sistema do Escavador
@@ -727,8 +1314,13 @@ class FonteProcesso:
     :attr tribunal: informações do tribunal de origem do processo
     :attr capa: informações da capa do processo
     :attr envolvidos: pessoas e instituições envolvidas no processo
+
+    Quando construída com `lazy=True`, os campos `tribunal`, `capa`, `envolvidos` e
+    `tipos_envolvido_pesquisado` só são montados no primeiro acesso.
     """
 
+    _CAMPOS_PREGUICOSOS = ("tribunal", "capa", "envolvidos", "tipos_envolvido_pesquisado")
+
     id: int
     processo_fonte_id: int
     descricao: str
@@ -756,9 +1348,10 @@ class FonteProcesso:
     tribunal: Optional[Tribunal] = None
     capa: Optional["CapaProcessoTribunal"] = field(default=None, hash=False, compare=False)
     envolvidos: List[Envolvido] = field(default_factory=list, hash=False, compare=False)
+    _json: Optional[Dict] = field(default=None, repr=False, hash=False, compare=False)
 
     @classmethod
-    def from_json(cls, json_dict: Optional[Dict]) -> Optional["FonteProcesso"]:
+    def from_json(cls, json_dict: Optional[Dict], lazy: bool = False) -> Optional["FonteProcesso"]:
         if json_dict is None:
             return None
 
@@ -784,23 +1377,28 @@ class FonteProcesso:
             url=json_dict["url"],
             caderno=json_dict.get("caderno"),
             data_ultima_verificacao=json_dict.get("data_ultima_verificacao"),
-            tribunal=Tribunal.from_json(json_dict.get("tribunal", None)),
-            capa=CapaProcessoTribunal.from_json(json_dict.get("capa", None)),
+            _json=json_dict if lazy else None,
         )
+        instance._preencher_campos(json_dict, lazy)
 
-        instance.envolvidos += [
-            Envolvido.from_json(env) for env in json_dict.get("envolvidos") or [] if env
-        ]
-        instance.tipos_envolvido_pesquisado += [
+        return instance
+
+    @classmethod
+    def _construir_campo(cls, nome: str, json_dict: Dict, lazy: bool):
+        if nome == "tribunal":
+            return Tribunal.from_json(json_dict.get("tribunal", None))
+        if nome == "capa":
+            return CapaProcessoTribunal.from_json(json_dict.get("capa", None))
+        if nome == "envolvidos":
+            return [Envolvido.from_json(env) for env in json_dict.get("envolvidos") or [] if env]
+        return [
             TipoEnvolvidoPesquisado.from_json(tipo)
             for tipo in json_dict.get("tipos_envolvido_pesquisado") or []
             if tipo
         ]
 
-        return instance
-
 
-@dataclass
+@dataclass_compacta
 class CapaProcessoTribunal:
     """Informações da capa de um processo em uma fonte, quando foi extraído de um tribunal.
 
@@ -861,7 +1459,7 @@ class CapaProcessoTribunal:
         return instance
 
 
-@dataclass
+@dataclass_compacta
 class Assunto:
     """O assunto de um processo em formato normalizado.
 
@@ -890,7 +1488,7 @@ class Assunto:
 
 
 @total_ordering
-@dataclass
+@dataclass_compacta
 class ValorCausa:
     """Valor monetário da causa de um processo.
 
@@ -945,7 +1543,7 @@ class ValorCausa:
         return self.valor_formatado
 
 
-@dataclass
+@dataclass_compacta
 class InformacaoComplementar:
     """Informações complementares de um processo.
 
@@ -1,12 +1,13 @@
-from dataclasses import dataclass, field
+from dataclasses import field
 from typing import Optional, List, Dict, Union
 
 from escavador.exceptions import FailedRequest
 from escavador.resources.helpers.consume_cursor import json_to_class
 from escavador.resources.helpers.endpoint import DataEndpoint
+from escavador.resources.helpers.dataclass_compacta import dataclass_compacta
 
 
-@dataclass
+@dataclass_compacta
 class Tribunal(DataEndpoint):
     """Informações de um tribunal.
 
@@ -69,8 +70,30 @@ class Tribunal(DataEndpoint):
 
         return json_to_class(response, Tribunal.from_json, add_cursor=False)
 
+    @staticmethod
+    async def listar_async(estados: List[str] = None) -> Union[List["Tribunal"], FailedRequest]:
+        """
+        Versão assíncrona de `Tribunal.listar`.
+
+        :param estados: permite que apenas tribunais que atendem os estados cujas siglas foram
+        especificadas sejam retornados. Se não for especificado, todos os tribunais serão retornados.
+        :return: lista de tribunais
+
+        >>> await Tribunal.listar_async(["SP", "RJ"]) # doctest: +SKIP
+        """
+        params = {}
+        if estados is not None:
+            params["estados[]"] = estados
+
+        response = await Tribunal.async_methods.get("tribunais", params=params)
+        if not response["sucesso"]:
+            conteudo = response.get("resposta", {})
+            raise FailedRequest(status=response["http_status"], **conteudo)
+
+        return json_to_class(response, Tribunal.from_json, add_cursor=False)
+
 
-@dataclass
+@dataclass_compacta
 class Estado:
     """Informações de um ente federativo brasileiro.
 
@@ -0,0 +1,72 @@
+import tempfile
+import unittest
+
+from escavador.resources.helpers.checkpoint import (
+    Checkpoint,
+    FileCheckpointStore,
+    SqliteCheckpointStore,
+    iterar_com_checkpoint,
+)
+from escavador.resources.helpers.lista_resultados import ListaResultados
+from escavador.v2 import Movimentacao
+
+
+class TestCheckpointStore(unittest.TestCase):
+    def _testar_store(self, store):
+        self.assertIsNone(store.carregar("busca"))
+        store.salvar(Checkpoint(id="busca", parametros={"nome": "Fulano"}, cursor="abc", itens=10))
+        checkpoint = store.carregar("busca")
+        self.assertEqual(checkpoint.cursor, "abc")
+        self.assertEqual(checkpoint.itens, 10)
+        self.assertEqual(checkpoint.parametros, {"nome": "Fulano"})
+        store.remover("busca")
+        self.assertIsNone(store.carregar("busca"))
+
+    def test_file_store(self):
+        with tempfile.TemporaryDirectory() as diretorio:
+            self._testar_store(FileCheckpointStore(diretorio))
+
+    def test_sqlite_store(self):
+        with tempfile.TemporaryDirectory() as diretorio:
+            self._testar_store(SqliteCheckpointStore(f"{diretorio}/checkpoints.db"))
+
+
+class TestIterarComCheckpoint(unittest.TestCase):
+    PAGINAS = {
+        "": ["pagina-2", [1, 2]],
+        "pagina-2": ["pagina-3", [3, 4]],
+        "pagina-3": ["", [5]],
+    }
+
+    def _pagina(self, cursor):
+        proximo, ids = self.PAGINAS[cursor]
+        return ListaResultados(Movimentacao(id=i, data="", last_valid_cursor=proximo) for i in ids)
+
+    def _iterar(self, store, parametros=None):
+        return iterar_com_checkpoint(
+            "busca", store, parametros or {"nome": "Fulano"}, lambda: self._pagina(""), self._pagina
+        )
+
+    def test_retoma_apos_ultima_pagina_concluida(self):
+        with tempfile.TemporaryDirectory() as diretorio:
+            store = FileCheckpointStore(diretorio)
+            iterador = self._iterar(store)
+            self.assertEqual([next(iterador).id for _ in range(3)], [1, 2, 3])
+            iterador.close()  # interrompida no meio da segunda página
+
+            self.assertEqual([movimentacao.id for movimentacao in self._iterar(store)], [3, 4, 5])
+            checkpoint = store.carregar("busca")
+            self.assertTrue(checkpoint.concluido)
+            self.assertEqual(checkpoint.itens, 5)
+            self.assertEqual(list(self._iterar(store)), [])
+
+    def test_parametros_diferentes(self):
+        with tempfile.TemporaryDirectory() as diretorio:
+            store = FileCheckpointStore(diretorio)
+            list(self._iterar(store))
+            with self.assertRaises(ValueError):
+                list(self._iterar(store, {"nome": "Outro"}))
+
+
+if __name__ == "__main__":
+    unittest.main()
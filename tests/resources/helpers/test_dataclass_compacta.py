@@ -0,0 +1,64 @@
+import pickle
+import unittest
+from dataclasses import dataclass, FrozenInstanceError
+
+from escavador.resources.helpers.dataclass_compacta import dataclass_compacta, _adicionar_slots
+from escavador.v2.resources.movimentacao import Movimentacao
+from escavador.v2.resources.processo import Processo
+
+
+class TestDataclassCompacta(unittest.TestCase):
+    def test_modelos_v2_nao_possuem_dict(self):
+        movimentacao = Movimentacao.from_json(
+            {
+                "id": 1,
+                "data": "2023-01-01",
+                "classificacao_predita": {"nome": "a", "descricao": "b", "hierarquia": "c"},
+            },
+            ultimo_cursor="cursor",
+        )
+        processo = Processo.from_json({"numero_cnj": "0000000-00.0000.0.00.0000"})
+
+        self.assertFalse(hasattr(movimentacao, "__dict__"))
+        self.assertFalse(hasattr(movimentacao.classificacao_predita, "__dict__"))
+        self.assertFalse(hasattr(processo, "__dict__"))
+        with self.assertRaises(AttributeError):
+            movimentacao.atributo_inexistente = 1
+
+    def test_pickle_preserva_objetos(self):
+        movimentacao = Movimentacao.from_json(
+            {
+                "id": 1,
+                "data": "2023-01-01",
+                "classificacao_predita": {"nome": "a", "descricao": "b", "hierarquia": "c"},
+            },
+            ultimo_cursor="cursor",
+        )
+        copia = pickle.loads(pickle.dumps(movimentacao))
+
+        self.assertEqual(copia, movimentacao)
+        self.assertEqual(copia.classificacao_predita, movimentacao.classificacao_predita)
+        self.assertEqual(copia.last_valid_cursor, "cursor")
+
+    def test_fallback_sem_slots_nativo(self):
+        @dataclass(frozen=True)
+        class Ponto:
+            x: int
+            y: int = 0
+
+        Ponto = _adicionar_slots(Ponto, frozen=True)
+        ponto = Ponto(1)
+
+        self.assertEqual(Ponto.__slots__, ("x", "y"))
+        self.assertFalse(hasattr(ponto, "__dict__"))
+        self.assertEqual(ponto.y, 0)
+        with self.assertRaises(FrozenInstanceError):
+            ponto.x = 2
+
+    def test_decorador_sem_parenteses(self):
+        @dataclass_compacta
+        class Ponto:
+            x: int
+
+        self.assertEqual(Ponto(3).x, 3)
+        self.assertFalse(hasattr(Ponto(3), "__dict__"))
@@ -1,5 +1,10 @@
+import hashlib
+import io
+import os
+import tempfile
 from random import randint
 import unittest
+from pathlib import Path
 from escavador.resources.helpers.documento import Documento
 from tempfile import NamedTemporaryFile
 
@@ -19,5 +24,72 @@ class TestDocumento(unittest.TestCase):
             self.assertEqual(erro, "File exists")
 
 
+class TestDocumentoStream(unittest.TestCase):
+    def setUp(self):
+        self.diretorio = tempfile.TemporaryDirectory()
+        self.path = os.path.join(self.diretorio.name, "documento.pdf")
+
+    def tearDown(self):
+        self.diretorio.cleanup()
+
+    def test_salvar_stream(self):
+        resultado = Documento.salvar_stream(iter([b"a" * 10, b"b" * 5]), self.path)
+
+        self.assertEqual(str(resultado["path"]), self.path)
+        self.assertEqual(resultado["tamanho"], 15)
+        with open(self.path, "rb") as arquivo:
+            self.assertEqual(arquivo.read(), b"a" * 10 + b"b" * 5)
+        self.assertEqual(os.listdir(self.diretorio.name), ["documento.pdf"])
+
+    def test_nao_substitui_arquivo_existente(self):
+        Documento.get_pdf(b"primeiro", self.diretorio.name, "documento")
+        resultado = Documento.get_pdf(b"segundo", self.diretorio.name, "documento")
+
+        self.assertEqual(resultado, {"error": "File exists"})
+        with open(self.path, "rb") as arquivo:
+            self.assertEqual(arquivo.read(), b"primeiro")
+        self.assertEqual(os.listdir(self.diretorio.name), ["documento.pdf"])
+
+    def test_diretorio_inexistente(self):
+        resultado = Documento.get_pdf(b"pdf", os.path.join(self.diretorio.name, "outro"), "documento")
+        self.assertEqual(resultado, {"error": "No such file or directory"})
+
+    def test_hash_diferente_nao_salva(self):
+        resultado = Documento.salvar_stream([b"pdf"], self.path, sha256="0" * 64)
+
+        self.assertIn("error", resultado)
+        self.assertEqual(os.listdir(self.diretorio.name), [])
+
+    def test_falha_durante_download_nao_deixa_arquivo(self):
+        def blocos():
+            yield b"parte"
+            raise ConnectionError
+
+        with self.assertRaises(ConnectionError):
+            Documento.salvar_stream(blocos(), self.path)
+        self.assertEqual(os.listdir(self.diretorio.name), [])
+
+    def test_salvar_em_arquivo_aberto(self):
+        destino = io.BytesIO()
+        resultado = Documento.salvar_stream([b"pdf"], destino, sha256=hashlib.sha256(b"pdf").hexdigest())
+
+        self.assertEqual(destino.getvalue(), b"pdf")
+        self.assertEqual(resultado["tamanho"], 3)
+
+    def test_hash_diferente_nao_escreve_no_arquivo_aberto(self):
+        destino = io.BytesIO()
+        resultado = Documento.salvar_stream([b"pdf"], destino, sha256="0" * 64)
+
+        self.assertIn("error", resultado)
+        self.assertEqual(destino.getvalue(), b"")
+
+    def test_destino(self):
+        arquivo = io.BytesIO()
+        self.assertIs(Documento.destino(None, None, arquivo), arquivo)
+        self.assertEqual(Documento.destino(self.diretorio.name, "documento"), Path(self.path))
+        self.assertIn("error", Documento.destino(self.diretorio.name, None))
+        self.assertIn("error", Documento.destino(None, None))
+
+
 if __name__ == "__main__":
     unittest.main()
@@ -0,0 +1,87 @@
+import gzip
+import io
+import json
+import os
+import tempfile
+import unittest
+from unittest.mock import patch
+
+from escavador.exceptions import FailedRequest
+from escavador.resources.helpers.enums_v2 import SiglaTribunal
+from escavador.resources.helpers.exportacao import exportar_ndjson, itens_do_cursor, projetar, _com_parametros
+from escavador.v2 import Processo
+
+
+def _pagina(itens, proxima=""):
+    return {
+        "resposta": {"items": itens, "links": {"next": proxima}},
+        "http_status": 200,
+        "sucesso": True,
+    }
+
+
+PAGINAS = [
+    _pagina(
+        [{"id": 1, "data": "2023-01-01", "fonte": {"sigla": "TJSP", "nome": "Tribunal"}}],
+        "https://api.escavador.com/api/v2/processos/numero_cnj/1/movimentacoes?cursor=a",
+    ),
+    _pagina([{"id": 2, "data": "2023-01-02", "fonte": None}]),
+]
+
+
+class TestExportacao(unittest.TestCase):
+    def test_itens_do_cursor_percorre_paginas_sob_demanda(self):
+        with patch(
+            "escavador.resources.helpers.exportacao.consumir_cursor", side_effect=PAGINAS
+        ) as consumir:
+            itens = itens_do_cursor("processos/numero_cnj/1/movimentacoes")
+            self.assertEqual(next(itens)["id"], 1)
+            self.assertEqual(consumir.call_count, 1)
+            self.assertEqual([item["id"] for item in itens], [2])
+            self.assertEqual(consumir.call_count, 2)
+
+    def test_projetar(self):
+        item = {"id": 1, "fonte": {"sigla": "TJSP", "nome": "Tribunal"}}
+        self.assertEqual(projetar(item, ["id", "fonte.sigla"]), {"id": 1, "fonte": {"sigla": "TJSP"}})
+        self.assertEqual(projetar({"id": 2, "fonte": None}, ["fonte.sigla"]), {"fonte": {"sigla": None}})
+
+    def test_parametros_na_url(self):
+        params = {"nome": "Fulano", "tribunais[]": [SiglaTribunal.TJSP], "limit": None}
+        url = _com_parametros("envolvido/processos", params)
+        self.assertEqual(url, "envolvido/processos?nome=Fulano&tribunais%5B%5D=TJSP")
+
+    def test_exportar_gzip(self):
+        with tempfile.TemporaryDirectory() as diretorio:
+            caminho = os.path.join(diretorio, "movimentacoes.ndjson.gz")
+            with patch("escavador.resources.helpers.exportacao.consumir_cursor", side_effect=PAGINAS):
+                escritos = Processo.exportar_movimentacoes("1", caminho, campos=["id", "fonte.sigla"])
+
+            with gzip.open(caminho, "rt", encoding="utf-8") as arquivo:
+                linhas = [json.loads(linha) for linha in arquivo]
+            self.assertEqual(os.listdir(diretorio), ["movimentacoes.ndjson.gz"])
+
+        self.assertEqual(escritos, 2)
+        self.assertEqual(linhas, [{"id": 1, "fonte": {"sigla": "TJSP"}}, {"id": 2, "fonte": {"sigla": None}}])
+
+    def test_exportar_para_arquivo_de_texto(self):
+        destino = io.StringIO()
+        with patch("escavador.resources.helpers.exportacao.consumir_cursor", side_effect=PAGINAS):
+            exportar_ndjson(destino, "processos/numero_cnj/1/movimentacoes")
+
+        linhas = destino.getvalue().splitlines()
+        self.assertEqual([json.loads(linha)["id"] for linha in linhas], [1, 2])
+
+    def test_falha_nao_deixa_arquivo(self):
+        erro = {"resposta": {"code": "NOT_FOUND"}, "http_status": 404, "sucesso": False}
+        with tempfile.TemporaryDirectory() as diretorio:
+            caminho = os.path.join(diretorio, "movimentacoes.ndjson")
+            with patch(
+                "escavador.resources.helpers.exportacao.consumir_cursor", side_effect=[PAGINAS[0], erro]
+            ):
+                with self.assertRaises(FailedRequest):
+                    exportar_ndjson(caminho, "processos/numero_cnj/1/movimentacoes")
+            self.assertEqual(os.listdir(diretorio), [])
+
+
+if __name__ == "__main__":
+    unittest.main()
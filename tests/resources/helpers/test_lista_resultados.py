@@ -1,4 +1,8 @@
+import asyncio
+import threading
 import unittest
+
+from escavador.exceptions import FailedRequest
 from escavador.resources.helpers.lista_resultados import ListaResultados
 from escavador.v2 import Movimentacao
 
@@ -40,6 +44,74 @@ class TestListaResultados(unittest.TestCase):
         self.assertEqual(len(lista), 60)
         self.assertNotEqual(lista[:40], lista[40:])
 
+    def test_iterar_limita_itens(self):
+        lista = ListaResultados([self.MockDadoRetornado() for i in range(20)])
+        itens = list(lista.iterar(max_itens=50))
+        self.assertEqual(len(itens), 50)
+        self.assertEqual(len(lista), 20)
+
+    def test_iterar_nao_busca_pagina_alem_de_max_itens(self):
+        buscas = []
+
+        class Dado:
+            def continuar_busca(self):
+                buscas.append(1)
+                return [Dado() for _ in range(10)]
+
+            async def continuar_busca_async(self):
+                return self.continuar_busca()
+
+        lista = ListaResultados([Dado() for _ in range(10)])
+        self.assertEqual(len(list(lista.iterar(max_itens=20))), 20)
+        self.assertEqual(len(buscas), 1)
+
+        buscas.clear()
+
+        async def iterar():
+            return [item async for item in lista.iterar_async(max_itens=20)]
+
+        self.assertEqual(len(asyncio.run(iterar())), 20)
+        self.assertEqual(len(buscas), 1)
+
+        buscas.clear()
+        self.assertEqual(list(lista.iterar(max_itens=0)), [])
+        self.assertEqual(len(buscas), 0)
+
+    def test_iterar_limita_paginas(self):
+        lista = ListaResultados([self.MockDadoRetornado() for i in range(20)])
+        self.assertEqual(len(list(lista.iterar(max_paginas=3))), 60)
+
+    def test_iterar_para_na_ultima_pagina(self):
+        lista = ListaResultados([Movimentacao(id=i, data="", last_valid_cursor="") for i in range(3)])
+        self.assertEqual([movimentacao.id for movimentacao in lista.iterar()], [0, 1, 2])
+
+    def test_iterar_com_prefetch(self):
+        lista = ListaResultados([self.MockDadoRetornado() for i in range(20)])
+        self.assertEqual(len(list(lista.iterar(max_paginas=4, prefetch=2))), 80)
+        self.assertEqual(len(list(lista.iterar(max_itens=30, prefetch=1))), 30)
+
+    def test_iterar_com_prefetch_repassa_erros(self):
+        class DadoComErro:
+            def continuar_busca(self):
+                raise FailedRequest(status=500)
+
+        lista = ListaResultados([DadoComErro()])
+        with self.assertRaises(FailedRequest):
+            list(lista.iterar(prefetch=1))
+
+    def test_iterar_com_prefetch_antecipa_pagina(self):
+        buscou_proxima = threading.Event()
+
+        class DadoLento:
+            def continuar_busca(self):
+                buscou_proxima.set()
+                return []
+
+        iterador = ListaResultados([DadoLento()]).iterar(prefetch=1)
+        next(iterador)
+        self.assertTrue(buscou_proxima.wait(timeout=1))
+        iterador.close()
+
 
 if __name__ == "__main__":
     unittest.main()
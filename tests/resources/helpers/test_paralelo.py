@@ -0,0 +1,59 @@
+import time
+import unittest
+from itertools import count
+
+import requests
+
+from escavador.exceptions import FailedRequest
+from escavador.resources.helpers.paralelo import executar_em_paralelo
+
+
+class TestExecutarEmParalelo(unittest.TestCase):
+    @staticmethod
+    def _dobrar_devagar(numero):
+        time.sleep(0.01 * (5 - numero % 5))
+        return numero * 2
+
+    def test_ordenado_preserva_ordem_de_entrada(self):
+        resultados = list(executar_em_paralelo(self._dobrar_devagar, range(20), max_workers=4, ordenado=True))
+        self.assertEqual(resultados, [(i, i * 2) for i in range(20)])
+
+    def test_ordem_de_conclusao_retorna_todos(self):
+        resultados = list(executar_em_paralelo(self._dobrar_devagar, range(20), max_workers=4))
+        self.assertEqual(sorted(resultados), [(i, i * 2) for i in range(20)])
+
+    def test_captura_failed_request(self):
+        def falhar(numero):
+            raise FailedRequest(status=404, code="NOT_FOUND")
+
+        resultados = list(executar_em_paralelo(falhar, ["a", "b"], max_workers=2, ordenado=True))
+        self.assertEqual([item for item, _ in resultados], ["a", "b"])
+        for _, erro in resultados:
+            self.assertIsInstance(erro, FailedRequest)
+            self.assertEqual(erro, 404)
+
+    def test_captura_erro_de_conexao_sem_interromper_os_demais(self):
+        def buscar(numero):
+            if numero == 2:
+                raise requests.ConnectionError("conexão recusada")
+            return numero * 2
+
+        resultados = dict(executar_em_paralelo(buscar, range(5), max_workers=2))
+        self.assertIsInstance(resultados.pop(2), requests.ConnectionError)
+        self.assertEqual(resultados, {0: 0, 1: 2, 3: 6, 4: 8})
+
+    def test_nao_captura_erros_de_programacao(self):
+        def falhar(numero):
+            raise TypeError
+
+        with self.assertRaises(TypeError):
+            list(executar_em_paralelo(falhar, range(3), max_workers=2))
+
+    def test_consome_iteravel_sob_demanda(self):
+        iterador = executar_em_paralelo(lambda numero: numero, count(), max_workers=2, ordenado=True)
+        self.assertEqual([next(iterador) for _ in range(5)], [(i, i) for i in range(5)])
+        iterador.close()
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,102 @@
+import unittest
+
+from escavador.resources import ListaResultados
+from escavador.resources.helpers.consume_cursor import json_to_class
+from escavador.resources.helpers.tabela import extrair, colunas, _array
+from escavador.v2.resources.movimentacao import Movimentacao
+
+try:
+    import pyarrow
+except ImportError:
+    pyarrow = None
+
+try:
+    import pandas
+except ImportError:
+    pandas = None
+
+
+RESPOSTA_MOVIMENTACOES = {
+    "resposta": {
+        "items": [
+            {
+                "id": 1,
+                "data": "2023-01-01",
+                "tipo": "ANDAMENTO",
+                "conteudo": "Conclusos para despacho",
+                "classificacao_predita": {"nome": "Conclusão", "descricao": "", "hierarquia": "Conclusão"},
+                "fonte": {"fonte_id": 10, "sigla": "TJSP", "tipo": "TRIBUNAL", "grau": "1"},
+            },
+            {"id": 2, "data": "2023-01-02", "conteudo": "Publicado", "fonte": None},
+        ],
+        "links": {},
+    },
+    "http_status": 200,
+    "sucesso": True,
+}
+
+
+class TestTabela(unittest.TestCase):
+    def test_extrair_de_json_e_de_objeto(self):
+        item = {"fontes": [{"sigla": "TJSP"}, {"sigla": "TRF1"}], "estado_origem": None}
+        movimentacao = Movimentacao.from_json(RESPOSTA_MOVIMENTACOES["resposta"]["items"][0])
+
+        self.assertEqual(extrair(item, ("fontes", "*", "sigla")), ["TJSP", "TRF1"])
+        self.assertIsNone(extrair(item, ("estado_origem", "sigla")))
+        self.assertEqual(extrair(movimentacao, ("fonte", "sigla")), "TJSP")
+
+    def test_colunas(self):
+        itens = [{"a": 1, "b": {"c": "x"}}, {"a": 2}]
+        resultado = colunas(itens, [("a", ("a",), "int"), ("b_c", ("b", "c"), "string")])
+        self.assertEqual(resultado, {"a": [1, 2], "b_c": ["x", None]})
+
+    def test_lista_nao_guarda_json_dos_itens(self):
+        lista = json_to_class(RESPOSTA_MOVIMENTACOES, Movimentacao.from_json)
+
+        self.assertFalse(hasattr(lista, "_json"))
+        especificacao = [("data", ("data",), "string"), ("fonte_sigla", ("fonte", "sigla"), "string")]
+        self.assertEqual(
+            colunas(lista._itens_brutos(), especificacao),
+            {"data": ["2023-01-01", "2023-01-02"], "fonte_sigla": ["TJSP", None]},
+        )
+
+    def test_tipo_sem_colunas(self):
+        with self.assertRaises(TypeError):
+            ListaResultados([1, 2]).to_pandas()
+
+    def test_coluna_desconhecida(self):
+        lista = json_to_class(RESPOSTA_MOVIMENTACOES, Movimentacao.from_json)
+        with self.assertRaises(ValueError):
+            lista.to_pandas(["inexistente"])
+
+    @unittest.skipIf(pyarrow is None, "pyarrow não instalado")
+    def test_to_arrow(self):
+        lista = json_to_class(RESPOSTA_MOVIMENTACOES, Movimentacao.from_json)
+        tabela = lista.to_arrow(["id", "fonte_sigla", "fonte_grau", "classificacao_predita_nome"])
+
+        self.assertEqual(tabela.num_rows, 2)
+        self.assertEqual(tabela.column("fonte_sigla").to_pylist(), ["TJSP", None])
+        self.assertEqual(tabela.column("fonte_grau").to_pylist(), [1, None])
+        self.assertEqual(tabela.column("classificacao_predita_nome").to_pylist(), ["Conclusão", None])
+
+    @unittest.skipIf(pyarrow is None, "pyarrow não instalado")
+    def test_bool_com_tipo_inesperado_nao_e_convertido(self):
+        self.assertEqual(_array(pyarrow, [True, None, False], "bool").type, pyarrow.bool_())
+        array = _array(pyarrow, ["false", None, "true"], "bool")
+        self.assertEqual(array.to_pylist(), ["false", None, "true"])
+        self.assertEqual(_array(pyarrow, ["1", 2], "int").to_pylist(), [1, 2])
+
+    @unittest.skipIf(pandas is None, "pandas não instalado")
+    def test_to_pandas_sem_json_usa_objetos(self):
+        movimentacoes = json_to_class(RESPOSTA_MOVIMENTACOES, Movimentacao.from_json)
+        lista = ListaResultados(movimentacoes)
+        tabela = lista.to_pandas(["id", "fonte_sigla"])
+
+        self.assertEqual(list(tabela.columns), ["id", "fonte_sigla"])
+        self.assertEqual(tabela["id"].tolist(), [1, 2])
+        self.assertEqual(tabela["fonte_sigla"][0], "TJSP")
+        self.assertTrue(pandas.isna(tabela["fonte_sigla"][1]))
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,187 @@
+import asyncio
+import hashlib
+import os
+import tempfile
+import unittest
+from unittest.mock import patch
+
+import requests
+
+from escavador.api import Api, AsyncApi
+from escavador.resources.helpers.paralelo import executar_em_paralelo
+from escavador.retry import RetryPolicy
+from escavador.resources.helpers.enums_v2 import SiglaTribunal
+
+
+class TestApiSession(unittest.TestCase):
+    def tearDown(self):
+        Api.fechar_pool()
+
+    def test_session_compartilhada_entre_instancias(self):
+        self.assertIs(Api(version=1).session(), Api(version=2).session())
+
+    def test_fechar_pool_descarta_session(self):
+        api = Api(version=2)
+        session = api.session()
+        Api.fechar_pool()
+        self.assertIsNot(api.session(), session)
+
+    def test_context_manager_nao_fecha_session_compartilhada(self):
+        outra = Api(version=1)
+        with Api(version=2) as api:
+            session = api.session()
+        self.assertIs(Api._session, session)
+        self.assertIs(outra.session(), session)
+
+    def test_configurar_pool(self):
+        Api.configurar_pool(pool_maxsize=32, pool_block=True)
+        try:
+            adapter = Api.session().get_adapter("https://api.escavador.com/")
+            self.assertEqual(adapter._pool_maxsize, 32)
+            self.assertTrue(adapter._pool_block)
+        finally:
+            Api.configurar_pool(pool_maxsize=10, pool_block=False)
+
+
+class TestApiRetry(unittest.TestCase):
+    class RespostaFalsa:
+        def __init__(self, status_code, headers=None):
+            self.status_code = status_code
+            self.headers = {"Content-Type": "application/json", **(headers or {})}
+
+        @property
+        def content(self):
+            return f'{{"status": {self.status_code}}}'.encode()
+
+        def __enter__(self):
+            return self
+
+        def __exit__(self, *args):
+            pass
+
+        def close(self):
+            pass
+
+    def _request(self, method, status_codes):
+        respostas = iter([self.RespostaFalsa(status) for status in status_codes])
+        sessao = type("SessaoFalsa", (), {"request": lambda self, **kwargs: next(respostas)})()
+        politica = RetryPolicy(max_tentativas=3, backoff_inicial=0)
+        with patch.object(Api, "session", classmethod(lambda cls: sessao)), patch.object(
+            Api, "headers", lambda self: {}
+        ), patch.object(Api, "retry_policy", politica):
+            return Api(version=2).request(method, "processos"), politica.estatisticas
+
+    def test_repete_get_ate_sucesso(self):
+        resposta, estatisticas = self._request("GET", [503, 502, 200])
+        self.assertTrue(resposta["sucesso"])
+        self.assertEqual(estatisticas["tentativas"], 3)
+        self.assertEqual(estatisticas["retentativas"], 2)
+
+    def test_desiste_apos_max_tentativas(self):
+        resposta, estatisticas = self._request("GET", [503, 503, 503])
+        self.assertEqual(resposta["http_status"], 503)
+        self.assertEqual(estatisticas["desistencias"], 1)
+
+    def test_nao_repete_post_com_503(self):
+        resposta, estatisticas = self._request("POST", [503, 200])
+        self.assertEqual(resposta["http_status"], 503)
+        self.assertEqual(estatisticas["tentativas"], 1)
+
+    def test_usa_json_decoder_configurado(self):
+        with patch.object(Api, "json_decoder", lambda conteudo: {"decodificado": conteudo}):
+            resposta, _ = self._request("GET", [200])
+        self.assertEqual(resposta["resposta"], {"decodificado": b'{"status": 200}'})
+
+    def test_corpo_que_nao_e_json_e_capturado_por_item(self):
+        class RespostaHtml(self.RespostaFalsa):
+            content = b"<html><body>502 Bad Gateway</body></html>"
+
+        def request(**kwargs):
+            if kwargs["url"].endswith("/2"):
+                return RespostaHtml(502, {"Content-Type": "text/html"})
+            return self.RespostaFalsa(200)
+
+        sessao = type("SessaoFalsa", (), {"request": lambda self, **kwargs: request(**kwargs)})()
+        with patch.object(Api, "session", classmethod(lambda cls: sessao)), patch.object(
+            Api, "headers", lambda self: {}
+        ), patch.object(Api, "retry_policy", RetryPolicy(max_tentativas=1)):
+            api = Api(version=2)
+            resultados = dict(executar_em_paralelo(lambda id: api.request("GET", f"processos/{id}"), [1, 2, 3]))
+
+        erro = resultados.pop(2)
+        self.assertIsInstance(erro, requests.exceptions.JSONDecodeError)
+        self.assertIn("502", str(erro))
+        self.assertEqual(erro.response.status_code, 502)
+        self.assertTrue(all(resposta["sucesso"] for resposta in resultados.values()))
+
+
+class TestApiBaixar(unittest.TestCase):
+    class RespostaPdf:
+        headers = {"Content-Type": "application/pdf"}
+        status_code = 200
+
+        def __init__(self, blocos):
+            self.blocos = blocos
+
+        @property
+        def content(self):
+            raise AssertionError("o pdf não deve ser lido inteiro em memória")
+
+        def iter_content(self, tamanho_bloco):
+            return iter(self.blocos)
+
+        def __enter__(self):
+            return self
+
+        def __exit__(self, *args):
+            pass
+
+    def test_baixar_em_blocos(self):
+        resposta = self.RespostaPdf([b"%PDF", b"-1.4", b" fim"])
+        argumentos = {}
+
+        def request(**kwargs):
+            argumentos.update(kwargs)
+            return resposta
+
+        sessao = type("SessaoFalsa", (), {"request": lambda self, **kwargs: request(**kwargs)})()
+        with patch.object(Api, "session", classmethod(lambda cls: sessao)), patch.object(
+            Api, "headers", lambda self: {}
+        ), tempfile.TemporaryDirectory() as diretorio:
+            destino = os.path.join(diretorio, "pagina.pdf")
+            resultado = Api(version=1).baixar("diarios/1/pdf/pagina/1/baixar", destino)
+            with open(destino, "rb") as arquivo:
+                self.assertEqual(arquivo.read(), b"%PDF-1.4 fim")
+
+        self.assertTrue(argumentos["stream"])
+        self.assertEqual(resultado["tamanho"], 12)
+        self.assertEqual(resultado["sha256"], hashlib.sha256(b"%PDF-1.4 fim").hexdigest())
+
+
+class TestAsyncApi(unittest.TestCase):
+    def test_params_aiohttp_expande_listas(self):
+        params = {"tribunais[]": [SiglaTribunal.STF, SiglaTribunal.TRT1], "limit": 10, "nome": "Fulano"}
+        self.assertEqual(
+            AsyncApi._params_aiohttp(params),
+            [("tribunais[]", "STF"), ("tribunais[]", "TRT-1"), ("limit", "10"), ("nome", "Fulano")],
+        )
+
+    def test_params_aiohttp_vazio(self):
+        self.assertIsNone(AsyncApi._params_aiohttp(None))
+
+    def test_fechar_pool_async_fecha_a_sessao_de_cada_loop(self):
+        async def usar():
+            sessao = AsyncApi.async_session()
+            self.assertIs(AsyncApi.async_session(), sessao)
+            await AsyncApi.fechar_pool_async()
+            return sessao
+
+        sessoes = [asyncio.run(usar()) for _ in range(3)]
+
+        self.assertEqual(len({id(sessao) for sessao in sessoes}), 3)
+        self.assertTrue(all(sessao.closed for sessao in sessoes))
+        self.assertEqual(len(AsyncApi._async_sessions), 0)
+
+
+if __name__ == "__main__":
+    unittest.main()
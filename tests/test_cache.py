@@ -0,0 +1,73 @@
+import tempfile
+import time
+import unittest
+from unittest.mock import patch
+
+from escavador.cache import SqliteResponseCache, chave_requisicao
+from escavador.method import Method
+
+
+class TestSqliteResponseCache(unittest.TestCase):
+    def setUp(self):
+        self.diretorio = tempfile.TemporaryDirectory()
+        self.cache = SqliteResponseCache(f"{self.diretorio.name}/cache.db", max_entradas=2)
+
+    def tearDown(self):
+        self.diretorio.cleanup()
+
+    def test_ttl_por_endpoint(self):
+        self.assertEqual(self.cache.ttl("https://api.escavador.com/api/v2/tribunais"), 24 * 60 * 60)
+        self.assertEqual(
+            self.cache.ttl("https://api.escavador.com/api/v2/processos/numero_cnj/0000000-00.0000.0.00.0000"),
+            5 * 60,
+        )
+        self.assertEqual(
+            self.cache.ttl(
+                "https://api.escavador.com/api/v2/processos/numero_cnj/0000000-00.0000.0.00.0000/status-atualizacao"
+            ),
+            0,
+        )
+
+    def test_expira(self):
+        self.cache.guardar("chave", {"sucesso": True}, ttl=0.01)
+        self.assertEqual(self.cache.obter("chave"), {"sucesso": True})
+        time.sleep(0.02)
+        self.assertIsNone(self.cache.obter("chave"))
+        self.assertEqual(self.cache.estatisticas["expirados"], 1)
+
+    def test_despeja_menos_acessado(self):
+        self.cache.guardar("a", {"a": 1}, ttl=60)
+        self.cache.guardar("b", {"b": 1}, ttl=60)
+        self.cache.obter("a")
+        self.cache.guardar("c", {"c": 1}, ttl=60)
+        self.assertIsNone(self.cache.obter("b"))
+        self.assertIsNotNone(self.cache.obter("a"))
+        self.assertEqual(self.cache.estatisticas["despejos"], 1)
+
+    def test_chave_independe_da_ordem_dos_parametros(self):
+        self.assertEqual(
+            chave_requisicao("GET", "url", {"a": 1, "b": 2}), chave_requisicao("get", "url", {"b": 2, "a": 1})
+        )
+
+
+class TestMethodCache(unittest.TestCase):
+    def test_get_usa_cache(self):
+        resposta = {"resposta": {"items": []}, "http_status": 200, "sucesso": True}
+        with tempfile.TemporaryDirectory() as diretorio:
+            cache = SqliteResponseCache(f"{diretorio}/cache.db")
+            with patch.object(Method, "cache", cache), patch(
+                "escavador.api.Api.request", return_value=resposta
+            ) as request:
+                methods = Method(api_version=2)
+                self.assertEqual(methods.get("tribunais"), resposta)
+                self.assertEqual(methods.get("tribunais"), resposta)
+                methods.get("processos/numero_cnj/0000000-00.0000.0.00.0000/status-atualizacao")
+                methods.get("processos/numero_cnj/0000000-00.0000.0.00.0000/status-atualizacao")
+
+            self.assertEqual(request.call_count, 3)
+            self.assertEqual(cache.estatisticas["hits"], 1)
+            self.assertEqual(cache.estatisticas["misses"], 1)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,200 @@
+import asyncio
+import json
+import os
+import tempfile
+import threading
+import time
+import unittest
+import urllib.error
+import urllib.request
+from unittest.mock import patch
+
+from escavador.callback_receiver import (
+    CallbackReceiver,
+    CallbackRecebido,
+    MemoryCallbackQueue,
+    SqliteCallbackQueue,
+)
+
+
+def _corpo(id, evento="diario_movimentacao_nova"):
+    return json.dumps({"event": evento, "id": id}).encode()
+
+
+class TestCallbackReceiver(unittest.TestCase):
+    def test_validacao(self):
+        receptor = CallbackReceiver(lambda callback: None, token="segredo")
+        autorizado = {"authorization": "Bearer segredo"}
+
+        self.assertEqual(receptor.receber("GET", autorizado, b"")[0], 405)
+        self.assertEqual(receptor.receber("POST", {"authorization": "outro"}, _corpo(1))[0], 401)
+        self.assertEqual(receptor.receber("POST", autorizado, b"{nao e json")[0], 400)
+        self.assertEqual(receptor.receber("POST", autorizado, b'{"sem": "evento"}')[0], 400)
+        self.assertEqual(receptor.receber("POST", {"authorization": "segredo"}, _corpo(1))[0], 202)
+        self.assertEqual(len(receptor.fila), 1)
+
+    def test_fila_cheia(self):
+        receptor = CallbackReceiver(lambda callback: None, fila=MemoryCallbackQueue(tamanho_maximo=1))
+        self.assertEqual(receptor.receber("POST", {}, _corpo(1))[0], 202)
+        self.assertEqual(receptor.receber("POST", {}, _corpo(2))[0], 503)
+
+    def test_processa_e_confirma_em_lotes(self):
+        processados = []
+        lotes = []
+
+        def handler(callback):
+            if callback.id == 3:
+                raise ValueError
+            processados.append(callback.id)
+
+        falhas = []
+        receptor = CallbackReceiver(
+            handler,
+            fila=MemoryCallbackQueue(max_tentativas=1),
+            max_workers=2,
+            tamanho_lote=2,
+            intervalo_confirmacao=60,
+            ao_falhar=lambda callback, erro: falhas.append(callback.id),
+        )
+        for id in range(1, 7):
+            receptor.receber("POST", {}, _corpo(id))
+
+        def marcar_recebido(ids):
+            lotes.append(ids)
+            return {"sucesso": True}
+
+        with patch("escavador.callback_receiver.Callback.marcarRecebido", side_effect=marcar_recebido):
+            with receptor:
+                while len(receptor.fila) or len(processados) + len(falhas) < 6:
+                    threading.Event().wait(0.01)
+
+        self.assertEqual(sorted(processados), [1, 2, 4, 5, 6])
+        self.assertEqual(falhas, [3])
+        self.assertEqual([callback.id for callback in receptor.fila.falhas()], [3])
+        self.assertTrue(all(len(lote) <= 2 for lote in lotes))
+        self.assertEqual(sorted(id for lote in lotes for id in lote), [1, 2, 4, 5, 6])
+
+    def test_confirmacao_com_falha_mantem_ids(self):
+        receptor = CallbackReceiver(lambda callback: None, tamanho_lote=2)
+        receptor._ids_processados = [1, 2, 3]
+        respostas = [{"sucesso": True}, {"sucesso": False}]
+
+        with patch("escavador.callback_receiver.Callback.marcarRecebido", side_effect=respostas):
+            self.assertEqual(receptor.confirmar_processados(), 2)
+        self.assertEqual(receptor._ids_processados, [3])
+
+    def test_servidor_wsgi(self):
+        recebidos = []
+        receptor = CallbackReceiver(recebidos.append, confirmar=False)
+        servidor = receptor.servir(porta=0)
+        url = f"http://127.0.0.1:{servidor.server_port}/"
+        try:
+            requisicao = urllib.request.Request(url, data=_corpo(1), method="POST")
+            with urllib.request.urlopen(requisicao) as resposta:
+                self.assertEqual(resposta.status, 202)
+            with self.assertRaises(urllib.error.HTTPError) as erro:
+                urllib.request.urlopen(urllib.request.Request(url, data=b"[]", method="POST"))
+            self.assertEqual(erro.exception.code, 400)
+        finally:
+            servidor.shutdown()
+            servidor.server_close()
+            receptor.parar()
+
+        self.assertEqual([callback.id for callback in recebidos], [1])
+
+    def test_asgi(self):
+        receptor = CallbackReceiver(lambda callback: None)
+        enviados = []
+
+        async def receive():
+            return {"type": "http.request", "body": _corpo(1), "more_body": False}
+
+        async def send(mensagem):
+            enviados.append(mensagem)
+
+        escopo = {"type": "http", "method": "POST", "headers": [(b"content-type", b"application/json")]}
+        asyncio.run(receptor.asgi(escopo, receive, send))
+
+        self.assertEqual(enviados[0]["status"], 202)
+        self.assertEqual(len(receptor.fila), 1)
+
+
+class TestMemoryCallbackQueue(unittest.TestCase):
+    def test_callback_adiado_vencendo_durante_retirar(self):
+        fila = MemoryCallbackQueue(espera_tentativas=0.5)
+        callback = CallbackRecebido("evento", {"event": "evento", "id": 1})
+        fila.devolver(callback, ValueError("falhou"))
+        disponivel_em = fila._adiados[0][0]
+        # o callback adiado vence logo depois da primeira leitura do relógio
+        leituras = iter([disponivel_em - 0.001])
+
+        with patch("escavador.callback_receiver.time.monotonic", lambda: next(leituras, disponivel_em + 1)):
+            self.assertIsNone(fila.retirar(timeout=1))
+            self.assertIs(fila.retirar(timeout=1), callback)
+
+
+class TestSqliteCallbackQueue(unittest.TestCase):
+    def test_callbacks_nao_concluidos_voltam_para_a_fila(self):
+        with tempfile.TemporaryDirectory() as diretorio:
+            path = os.path.join(diretorio, "callbacks.db")
+            fila = SqliteCallbackQueue(path, tamanho_maximo=2, prazo_processamento=60)
+            for id in (1, 2, 3):
+                fila.colocar(CallbackRecebido("evento", {"event": "evento", "id": id}))
+            self.assertEqual(len(fila), 2)
+
+            primeiro = fila.retirar(timeout=0)
+            fila.concluir(primeiro)
+            self.assertEqual(fila.retirar(timeout=0).id, 2)
+            self.assertIsNone(fila.retirar(timeout=0))
+
+            # outro processo abrindo o arquivo não retira o callback ainda reservado
+            reaberta = SqliteCallbackQueue(path)
+            self.assertEqual(primeiro.id, 1)
+            self.assertIsNone(reaberta.retirar(timeout=0))
+
+            depois_do_prazo = time.time() + 61
+            with patch("escavador.callback_receiver.time.time", lambda: depois_do_prazo):
+                self.assertEqual(reaberta.retirar(timeout=0).id, 2)
+                self.assertIsNone(fila.retirar(timeout=0))
+
+    def test_handler_com_erro_devolve_callback_para_a_fila(self):
+        with tempfile.TemporaryDirectory() as diretorio:
+            path = os.path.join(diretorio, "callbacks.db")
+            tentativas = []
+
+            def handler(callback):
+                tentativas.append(callback.tentativas)
+                if len(tentativas) < 3:
+                    raise ValueError("falhou")
+
+            fila = SqliteCallbackQueue(path, max_tentativas=3, espera_tentativas=0)
+            receptor = CallbackReceiver(handler, fila=fila, confirmar=False)
+            receptor.receber("POST", {}, _corpo(1))
+            with receptor:
+                while len(tentativas) < 3 or len(fila):
+                    threading.Event().wait(0.01)
+
+            self.assertEqual(tentativas, [0, 1, 2])
+            self.assertEqual(fila.falhas(), [])
+            self.assertEqual(SqliteCallbackQueue(path).retirar(timeout=0), None)
+
+    def test_callback_com_erro_vai_para_as_falhas(self):
+        with tempfile.TemporaryDirectory() as diretorio:
+            path = os.path.join(diretorio, "callbacks.db")
+            fila = SqliteCallbackQueue(path, max_tentativas=2, espera_tentativas=60)
+            fila.colocar(CallbackRecebido("evento", {"event": "evento", "id": 1}))
+
+            fila.devolver(fila.retirar(timeout=0), ValueError("falhou"))
+            # aguardando a espera da próxima tentativa, mas ainda na fila (inclusive ao reabrir o arquivo)
+            self.assertIsNone(fila.retirar(timeout=0))
+            self.assertEqual(len(SqliteCallbackQueue(path)), 1)
+
+            fila.espera_tentativas = 0
+            fila.devolver(CallbackRecebido("evento", {}, chave=1, tentativas=1), ValueError("falhou"))
+            self.assertIsNone(fila.retirar(timeout=0))
+            (falha,) = fila.falhas()
+            self.assertEqual((falha.id, falha.tentativas, falha.erro), (1, 2, "ValueError('falhou')"))
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,152 @@
+import hashlib
+import io
+import os
+import tempfile
+import threading
+import unittest
+from unittest.mock import patch
+
+from escavador.api import Api
+from escavador.document_store import DocumentStore
+from escavador.method import Method
+from escavador.resources.helpers.documento import Documento
+
+
+class TestDocumentStore(unittest.TestCase):
+    def setUp(self):
+        self.diretorio = tempfile.TemporaryDirectory()
+        self.store = DocumentStore(os.path.join(self.diretorio.name, "store"))
+        self.downloads = []
+
+    def tearDown(self):
+        self.diretorio.cleanup()
+
+    def baixar_para(self, conteudo):
+        def baixar(temporario):
+            self.downloads.append(temporario)
+            return Documento.salvar_stream([conteudo], temporario)
+
+        return baixar
+
+    def destino(self, nome):
+        return os.path.join(self.diretorio.name, nome)
+
+    def test_download_repetido_nao_acessa_a_rede(self):
+        primeiro = self.store.baixar("pagina/1", self.destino("a.pdf"), self.baixar_para(b"pdf"))
+        segundo = self.store.baixar("pagina/1", self.destino("b.pdf"), self.baixar_para(b"pdf"))
+
+        self.assertEqual(len(self.downloads), 1)
+        self.assertFalse(primeiro["armazenado"])
+        self.assertTrue(segundo["armazenado"])
+        self.assertEqual(segundo["sha256"], hashlib.sha256(b"pdf").hexdigest())
+        with open(self.destino("b.pdf"), "rb") as arquivo:
+            self.assertEqual(arquivo.read(), b"pdf")
+
+    def test_conteudo_igual_e_guardado_uma_vez(self):
+        self.store.baixar("pagina/1", self.destino("a.pdf"), self.baixar_para(b"pdf"))
+        self.store.baixar("pagina/2", self.destino("b.pdf"), self.baixar_para(b"pdf"))
+
+        blobs = list(self.store.diretorio.glob("blobs/*/*"))
+        self.assertEqual(len(blobs), 1)
+        self.assertEqual(os.stat(self.destino("b.pdf")).st_ino, os.stat(blobs[0]).st_ino)
+        self.assertEqual(os.listdir(self.store.diretorio / "tmp"), [])
+
+    def test_erro_do_download_nao_e_guardado(self):
+        resultado = self.store.baixar("pagina/1", self.destino("a.pdf"), lambda temporario: {"error": "falhou"})
+
+        self.assertEqual(resultado, {"error": "falhou"})
+        self.assertIsNone(self.store.obter("pagina/1"))
+
+    def test_nao_substitui_arquivo_existente(self):
+        with open(self.destino("a.pdf"), "wb") as arquivo:
+            arquivo.write(b"outro")
+
+        resultado = self.store.baixar("pagina/1", self.destino("a.pdf"), self.baixar_para(b"pdf"))
+
+        self.assertEqual(resultado, {"error": "File exists"})
+        self.assertEqual(self.downloads, [])
+        self.assertIsNone(self.store.obter("pagina/1"))
+
+    def test_diretorio_inexistente_nao_baixa(self):
+        resultado = self.store.baixar("pagina/1", self.destino("outro/a.pdf"), self.baixar_para(b"pdf"))
+
+        self.assertEqual(resultado, {"error": "No such file or directory"})
+        self.assertEqual(self.downloads, [])
+
+    def test_hash_diferente_baixa_de_novo(self):
+        self.store.baixar("pagina/1", self.destino("a.pdf"), self.baixar_para(b"antigo"))
+        resultado = self.store.baixar(
+            "pagina/1", self.destino("b.pdf"), self.baixar_para(b"novo"), sha256=hashlib.sha256(b"novo").hexdigest()
+        )
+
+        self.assertEqual(len(self.downloads), 2)
+        self.assertFalse(resultado["armazenado"])
+        self.assertEqual(self.store.obter("pagina/1")["sha256"], hashlib.sha256(b"novo").hexdigest())
+
+    def test_entrega_em_arquivo_aberto(self):
+        self.store.baixar("pagina/1", self.destino("a.pdf"), self.baixar_para(b"pdf"))
+        destino = io.BytesIO()
+
+        resultado = self.store.baixar("pagina/1", destino, self.baixar_para(b"pdf"))
+
+        self.assertEqual(destino.getvalue(), b"pdf")
+        self.assertEqual(resultado["tamanho"], 3)
+
+    def test_limpar_apaga_arquivos_sem_referencia(self):
+        self.store.baixar("pagina/1", self.destino("a.pdf"), self.baixar_para(b"pdf"))
+        self.store.baixar("pagina/2", self.destino("b.pdf"), self.baixar_para(b"outro pdf"))
+
+        self.store.remover("pagina/1")
+
+        self.assertEqual(self.store.limpar(), 3)
+        self.assertEqual(len(list(self.store.diretorio.glob("blobs/*/*"))), 1)
+        self.assertIsNotNone(self.store.obter("pagina/2"))
+
+    def test_limpar_aguarda_guardar_em_andamento(self):
+        movido = threading.Event()
+        continuar = threading.Event()
+        replace = os.replace
+
+        def replace_lento(origem, destino):
+            replace(origem, destino)
+            movido.set()
+            continuar.wait(5)
+
+        temporario = self.store.diretorio / "tmp" / "documento.tmp"
+        temporario.write_bytes(b"pdf")
+        liberados = []
+        with patch("escavador.document_store.os.replace", replace_lento):
+            guardar = threading.Thread(
+                target=self.store.guardar, args=("pagina/1", temporario, hashlib.sha256(b"pdf").hexdigest(), 3)
+            )
+            guardar.start()
+            movido.wait(5)
+            limpeza = threading.Thread(target=lambda: liberados.append(self.store.limpar()))
+            limpeza.start()
+            limpeza.join(0.2)
+            self.assertTrue(limpeza.is_alive())
+            continuar.set()
+            guardar.join()
+            limpeza.join()
+
+        self.assertEqual(liberados, [0])
+        self.assertIsNotNone(self.store.obter("pagina/1"))
+
+
+class TestMethodBaixarComDocumentStore(unittest.TestCase):
+    def test_usa_o_document_store(self):
+        chamadas = []
+
+        def baixar(api, url, destino, params=None, sha256=None):
+            chamadas.append(url)
+            return Documento.salvar_stream([b"pdf"], destino)
+
+        with tempfile.TemporaryDirectory() as diretorio, patch.object(Api, "baixar", baixar), patch.object(
+            Method, "document_store", DocumentStore(os.path.join(diretorio, "store"))
+        ):
+            method = Method(api_version=1)
+            for nome in ("a.pdf", "b.pdf"):
+                resultado = method.baixar("diarios/1/pdf/pagina/1/baixar", os.path.join(diretorio, nome))
+
+        self.assertEqual(chamadas, ["diarios/1/pdf/pagina/1/baixar"])
+        self.assertTrue(resultado["armazenado"])
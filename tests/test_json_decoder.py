@@ -0,0 +1,18 @@
+import unittest
+
+from escavador.json_decoder import decodificador_padrao, decodificar_stdlib
+
+
+class TestJsonDecoder(unittest.TestCase):
+    CONTEUDO = '{"items": [{"id": 1, "conteudo": "Sentença publicada"}], "links": {"next": null}}'.encode()
+
+    def test_decodificadores_equivalentes(self):
+        self.assertEqual(decodificador_padrao()(self.CONTEUDO), decodificar_stdlib(self.CONTEUDO))
+
+    def test_json_invalido(self):
+        with self.assertRaises(ValueError):
+            decodificador_padrao()(b"<html>")
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,162 @@
+import os
+import tempfile
+import unittest
+from unittest.mock import patch
+
+import requests
+
+from escavador.api import Api
+from escavador.hooks import RequestHooks, Requisicao, endpoint
+from escavador.metrics import MetricsCollector
+from escavador.retry import RetryPolicy
+
+
+class RespostaFalsa:
+    def __init__(self, status_code):
+        self.status_code = status_code
+        self.headers = {"Content-Type": "application/json"}
+        self.content = b'{"items": []}'
+        # bytes lidos da rede pelo urllib3, com o corpo comprimido
+        self.raw = type("RawFalso", (), {"tell": lambda self: 9})()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *args):
+        pass
+
+    def close(self):
+        pass
+
+
+class TestEndpoint(unittest.TestCase):
+    def test_substitui_segmentos_variaveis(self):
+        self.assertEqual(
+            endpoint("https://api.escavador.com/api/v2/processos/numero_cnj/0000000-00.0000.0.00.0000"),
+            "/api/v2/processos/numero_cnj/{id}",
+        )
+        self.assertEqual(
+            endpoint("https://api.escavador.com/api/v1/diarios/123/pdf/pagina/4/baixar"),
+            "/api/v1/diarios/{id}/pdf/pagina/{id}/baixar",
+        )
+        self.assertEqual(endpoint("https://api.escavador.com/api/v2/tribunais"), "/api/v2/tribunais")
+
+
+class TestMetricsCollector(unittest.TestCase):
+    def test_registra_resposta(self):
+        metricas = MetricsCollector(buckets=[0.1, 1])
+        requisicao = Requisicao("GET", "https://api.escavador.com/api/v2/tribunais", espera_limite=0.5)
+
+        metricas.antes_da_requisicao(requisicao)
+        metricas.apos_resposta(requisicao, 200, 100, 0.05)
+        metricas.apos_resposta(requisicao, 429, 10, 2)
+        metricas.ao_tentar_novamente(requisicao, 1)
+
+        snapshot = metricas.snapshot()["GET /api/v2/tribunais"]
+        self.assertEqual(snapshot["respostas"], 2)
+        self.assertEqual(snapshot["latencia"]["buckets"], {0.1: 1, 1: 1, float("inf"): 2})
+        self.assertEqual(snapshot["bytes_transferidos"], 110)
+        self.assertEqual(snapshot["status"], {200: 1, 429: 1})
+        self.assertEqual(snapshot["retentativas"], 1)
+        self.assertEqual(snapshot["espera_limite"], 0.5)
+
+    def test_prometheus(self):
+        metricas = MetricsCollector(buckets=[0.1])
+        requisicao = Requisicao("GET", "https://api.escavador.com/api/v2/tribunais")
+        metricas.apos_resposta(requisicao, 200, 100, 0.05)
+        metricas.ao_falhar(requisicao, requests.ConnectionError(), 0.2)
+
+        texto = metricas.prometheus()
+
+        rotulos = 'method="GET",endpoint="/api/v2/tribunais"'
+        self.assertIn("# TYPE escavador_request_duration_seconds histogram", texto)
+        self.assertIn(f'escavador_request_duration_seconds_bucket{{{rotulos},le="0.1"}} 1', texto)
+        self.assertIn(f'escavador_request_duration_seconds_bucket{{{rotulos},le="+Inf"}} 1', texto)
+        self.assertIn(f"escavador_request_duration_seconds_count{{{rotulos}}} 1", texto)
+        self.assertIn(f'escavador_responses_total{{{rotulos},status="200"}} 1', texto)
+        self.assertIn(f"escavador_response_wire_bytes_total{{{rotulos}}} 100", texto)
+        self.assertIn(f'escavador_request_errors_total{{{rotulos},error="ConnectionError"}} 1', texto)
+        self.assertTrue(texto.endswith("\n"))
+
+
+class TestApiHooks(unittest.TestCase):
+    def _api(self, respostas, hooks):
+        def request(**kwargs):
+            resposta = next(respostas)
+            if isinstance(resposta, Exception):
+                raise resposta
+            return resposta
+
+        sessao = type("SessaoFalsa", (), {"request": lambda self, **kwargs: request(**kwargs)})()
+        for contexto in (
+            patch.object(Api, "session", classmethod(lambda cls: sessao)),
+            patch.object(Api, "headers", lambda self: {}),
+            patch.object(Api, "retry_policy", RetryPolicy(backoff_inicial=0)),
+            patch.object(Api, "hooks", hooks),
+        ):
+            contexto.start()
+            self.addCleanup(contexto.stop)
+        return Api(version=2)
+
+    def _request(self, respostas, hooks):
+        return self._api(respostas, hooks).request("GET", "processos/numero_cnj/0000000-00.0000.0.00.0000")
+
+    def test_metricas_das_tentativas(self):
+        metricas = MetricsCollector()
+        respostas = iter([requests.ConnectionError(), RespostaFalsa(503), RespostaFalsa(200)])
+
+        resposta = self._request(respostas, [metricas])
+
+        self.assertTrue(resposta["sucesso"])
+        snapshot = metricas.snapshot()["GET /api/v2/processos/numero_cnj/{id}"]
+        self.assertEqual(snapshot["status"], {503: 1, 200: 1})
+        self.assertEqual(snapshot["erros"], {"ConnectionError": 1})
+        self.assertEqual(snapshot["retentativas"], 2)
+        self.assertEqual(snapshot["bytes_transferidos"], 2 * 9)
+
+    def test_ordem_dos_ganchos(self):
+        eventos = []
+
+        class Registro(RequestHooks):
+            def antes_da_requisicao(self, requisicao):
+                eventos.append(("antes", requisicao.tentativa))
+
+            def apos_resposta(self, requisicao, status, tamanho, duracao):
+                eventos.append(("resposta", status))
+
+            def ao_falhar(self, requisicao, erro, duracao):
+                eventos.append(("falha", type(erro).__name__))
+
+            def ao_tentar_novamente(self, requisicao, espera):
+                eventos.append(("nova tentativa", requisicao.tentativa))
+
+        with self.assertRaises(ValueError):
+            self._request(iter([RespostaFalsa(503), ValueError()]), [Registro()])
+
+        self.assertEqual(
+            eventos,
+            [("antes", 1), ("resposta", 503), ("nova tentativa", 1), ("antes", 2), ("falha", "ValueError")],
+        )
+
+    def test_falha_no_meio_do_download(self):
+        class RespostaPdf(RespostaFalsa):
+            def iter_content(self, tamanho_bloco):
+                yield b"%PDF"
+                raise requests.exceptions.ChunkedEncodingError("conexão interrompida")
+
+        resposta = RespostaPdf(200)
+        resposta.headers = {"Content-Type": "application/pdf", "Content-Length": "2048"}
+        metricas = MetricsCollector()
+        api = self._api(iter([resposta]), [metricas])
+
+        with tempfile.TemporaryDirectory() as diretorio, self.assertRaises(requests.exceptions.ChunkedEncodingError):
+            api.baixar("diarios/1/pdf/pagina/1/baixar", os.path.join(diretorio, "pagina.pdf"))
+
+        snapshot = metricas.snapshot()["GET /api/v2/diarios/{id}/pdf/pagina/{id}/baixar"]
+        self.assertEqual(snapshot["status"], {200: 1})
+        self.assertEqual(snapshot["bytes_transferidos"], 2048)
+        self.assertEqual(snapshot["erros"], {"ChunkedEncodingError": 1})
+
+
+if __name__ == "__main__":
+    unittest.main()
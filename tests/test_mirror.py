@@ -0,0 +1,190 @@
+import os
+import sqlite3
+import tempfile
+import unittest
+
+from escavador.mirror import SqliteMirror
+from escavador.v2 import Processo, Movimentacao
+
+
+def _processo(numero_cnj, documento="123.456.789-00", oab=None, tribunal="TJSP"):
+    advogado = {
+        "nome": "Advogada",
+        "tipo": "Advogado",
+        "tipo_normalizado": "Advogado",
+        "tipo_pessoa": "FISICA",
+        "quantidade_processos": 10,
+        "polo": "ADVOGADO",
+        "oabs": [{"numero": oab or 1234, "uf": "sp", "tipo": "ADVOGADO"}],
+    }
+    envolvido = {
+        "nome": "Fulano",
+        "tipo": "Autor",
+        "tipo_normalizado": "Autor",
+        "tipo_pessoa": "FISICA",
+        "quantidade_processos": 1,
+        "polo": "ATIVO",
+        "cpf": documento,
+        "advogados": [advogado],
+    }
+    fonte = {
+        "id": 1,
+        "processo_fonte_id": abs(hash(numero_cnj)) % 10 ** 9,
+        "descricao": f"{tribunal} - 1º grau",
+        "nome": tribunal,
+        "sigla": tribunal,
+        "tipo": "TRIBUNAL",
+        "grau": 1,
+        "grau_formatado": "Primeiro Grau",
+        "data_inicio": "2023-01-01",
+        "data_ultima_movimentacao": "2023-02-01",
+        "fisico": False,
+        "sistema": "ESAJ",
+        "quantidade_movimentacoes": 2,
+        "quantidade_envolvidos": 2,
+        "url": None,
+        "tribunal": {"id": 1, "nome": tribunal, "sigla": tribunal},
+        "capa": {
+            "assunto_principal_normalizado": None,
+            "classe": "Procedimento Comum",
+            "assunto": "Indenização",
+            "area": "Cível",
+            "orgao_julgador": "1ª Vara",
+            "data_distribuicao": None,
+            "data_arquivamento": None,
+            "valor_causa": {"valor": "1000.00", "moeda": "R$", "valor_formatado": "R$ 1.000,00"},
+        },
+        "envolvidos": [envolvido],
+    }
+    return Processo.from_json(
+        {
+            "numero_cnj": numero_cnj,
+            "ano_inicio": 2023,
+            "data_ultima_movimentacao": "2023-02-01",
+            "quantidade_movimentacoes": 2,
+            "fontes": [fonte],
+        }
+    )
+
+
+class TestSqliteMirror(unittest.TestCase):
+    def setUp(self):
+        self.diretorio = tempfile.TemporaryDirectory()
+        self.mirror = SqliteMirror(os.path.join(self.diretorio.name, "espelho.db"))
+
+    def tearDown(self):
+        self.mirror.fechar()
+        self.diretorio.cleanup()
+
+    def test_salvar_e_consultar_processos(self):
+        self.mirror.salvar_processos(
+            [_processo("1"), _processo("2", documento="999", oab=42, tribunal="TRF1")]
+        )
+
+        processo = self.mirror.processo("1")
+        self.assertEqual(processo["ano_inicio"], 2023)
+        self.assertEqual(processo["fontes"][0]["tribunal_sigla"], "TJSP")
+        self.assertEqual(processo["fontes"][0]["valor_causa"], 1000.0)
+        self.assertIsNone(self.mirror.processo("3"))
+
+        def numeros(processos):
+            return [processo["numero_cnj"] for processo in processos]
+
+        self.assertEqual(numeros(self.mirror.processos_por_documento("12345678900")), ["1"])
+        self.assertEqual(numeros(self.mirror.processos_por_oab(42, "SP")), ["2"])
+        self.assertEqual(numeros(self.mirror.processos_por_tribunal("TRF1")), ["2"])
+
+    def test_salvar_novamente_substitui_dados_do_processo(self):
+        self.mirror.salvar_processos([_processo("1")])
+        self.mirror.salvar_processos([_processo("1", documento="999")])
+
+        self.assertEqual(self.mirror.processos_por_documento("123.456.789-00"), [])
+        self.assertEqual(len(self.mirror.consultar("SELECT * FROM envolvidos")), 2)
+        self.assertEqual(len(self.mirror.consultar("SELECT * FROM oabs")), 1)
+
+    def test_movimentacoes(self):
+        movimentacoes = [
+            Movimentacao.from_json({"id": i, "data": f"2023-01-0{i}", "conteudo": f"texto {i}"})
+            for i in range(1, 5)
+        ]
+        self.mirror.salvar_movimentacoes("1", movimentacoes)
+        self.mirror.salvar_movimentacoes("1", movimentacoes[:1])
+
+        todas = self.mirror.movimentacoes("1")
+        self.assertEqual([m["id"] for m in todas], [4, 3, 2, 1])
+        periodo = self.mirror.movimentacoes(data_minima="2023-01-02", data_maxima="2023-01-03")
+        self.assertEqual([m["id"] for m in periodo], [3, 2])
+
+    def test_transacao_desfeita_em_caso_de_erro(self):
+        def processos():
+            yield _processo("1")
+            raise RuntimeError
+
+        with self.assertRaises(RuntimeError):
+            self.mirror.salvar_processos(processos())
+        self.assertIsNone(self.mirror.processo("1"))
+
+    def test_buscar_movimentacoes_ignora_acentos(self):
+        def movimentacao(id, conteudo):
+            return Movimentacao.from_json({"id": id, "data": "2023-01-01", "conteudo": conteudo})
+
+        self.mirror.salvar_movimentacoes(
+            "1", [movimentacao(1, "Trânsito em julgado"), movimentacao(2, "Sentença proferida")]
+        )
+        self.mirror.salvar_movimentacoes("2", [movimentacao(3, "Sentenca publicada")])
+
+        resultado = self.mirror.buscar_movimentacoes('"transito em julgado"', sintaxe_fts=True)
+        self.assertEqual([m["id"] for m in resultado], [1])
+        self.assertEqual({m["id"] for m in self.mirror.buscar_movimentacoes("SENTENÇA")}, {2, 3})
+        resultado = self.mirror.buscar_movimentacoes("sentenca", numero_cnj="2")
+        self.assertEqual(resultado[0]["numero_cnj"], "2")
+        self.assertEqual(resultado[0]["trecho"], "[Sentenca] publicada")
+
+    def test_buscar_movimentacoes_com_pontuacao(self):
+        conteudos = {
+            1: "Apensado ao processo 0000000-00.2020.8.26.0100",
+            2: 'Violação ao art. 5º, "caput", da Constituição',
+            3: "Processo 1111111-11.2021.8.26.0100 arquivado",
+        }
+        self.mirror.salvar_movimentacoes("1", [
+            Movimentacao.from_json({"id": id, "data": "2023-01-01", "conteudo": conteudo})
+            for id, conteudo in conteudos.items()
+        ])
+
+        for consulta, ids in (
+            ("0000000-00.2020.8.26.0100", [1]),
+            ('art. 5º, "caput"', [2]),
+            ('"caput', [2]),
+            ("penhora OR arquivado", []),
+            ("  ", []),
+        ):
+            with self.subTest(consulta=consulta):
+                self.assertEqual([m["id"] for m in self.mirror.buscar_movimentacoes(consulta)], ids)
+        resultado = self.mirror.buscar_movimentacoes("penhora OR arquivado", sintaxe_fts=True)
+        self.assertEqual([m["id"] for m in resultado], [3])
+        with self.assertRaises(sqlite3.OperationalError):
+            self.mirror.buscar_movimentacoes('art. 5º, "caput"', sintaxe_fts=True)
+
+    def test_buscar_movimentacoes_atualizadas(self):
+        movimentacao = {"id": 1, "data": "2023-01-01", "conteudo": "Conclusos para despacho"}
+        self.mirror.salvar_movimentacoes("1", [Movimentacao.from_json(movimentacao)])
+        movimentacao["conteudo"] = "Despacho proferido"
+        self.mirror.salvar_movimentacoes("1", [Movimentacao.from_json(movimentacao)])
+
+        self.assertEqual(self.mirror.buscar_movimentacoes("conclusos"), [])
+        self.assertEqual(len(self.mirror.buscar_movimentacoes("despacho")), 1)
+
+    def test_indice_criado_em_espelho_existente(self):
+        self.mirror.salvar_movimentacoes(
+            "1", [Movimentacao.from_json({"id": 1, "data": "2023-01-01", "conteudo": "Penhora"})]
+        )
+        self.mirror.consultar("DROP TABLE movimentacoes_busca")
+        self.mirror.fechar()
+
+        mirror = SqliteMirror(self.mirror.path)
+        self.assertEqual(len(mirror.buscar_movimentacoes("penhora")), 1)
+        mirror.fechar()
+
+
+if __name__ == "__main__":
+    unittest.main()
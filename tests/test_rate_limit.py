@@ -0,0 +1,79 @@
+import asyncio
+import os
+import tempfile
+import unittest
+
+from ratelimit import RateLimitException
+
+from escavador.rate_limit import TokenBucket, SqliteTokenBucket
+
+
+class TestTokenBucket(unittest.TestCase):
+    def test_consome_sem_esperar_dentro_da_capacidade(self):
+        bucket = TokenBucket(calls=600, period=60, capacidade=5)
+        for _ in range(5):
+            self.assertLess(bucket.acquire(), 0.05)
+        self.assertLess(bucket.disponivel, 1)
+
+    def test_aguarda_reabastecimento(self):
+        bucket = TokenBucket(calls=20, period=1, capacidade=1)
+        bucket.acquire()
+        self.assertGreater(bucket.acquire(), 0.02)
+
+    def test_timeout_lanca_rate_limit_exception(self):
+        bucket = TokenBucket(calls=1, period=60, capacidade=1)
+        bucket.acquire()
+        with self.assertRaises(RateLimitException):
+            bucket.acquire(timeout=0.01)
+
+    def test_acquire_async(self):
+        bucket = TokenBucket(calls=20, period=1, capacidade=1)
+        asyncio.run(bucket.acquire_async())
+        self.assertGreater(asyncio.run(bucket.acquire_async()), 0.02)
+
+
+class TestSqliteTokenBucket(unittest.TestCase):
+    def test_buckets_no_mesmo_arquivo_compartilham_tokens(self):
+        with tempfile.TemporaryDirectory() as diretorio:
+            path = os.path.join(diretorio, "limite.db")
+            bucket_1 = SqliteTokenBucket(path, calls=1, period=60, capacidade=2)
+            bucket_2 = SqliteTokenBucket(path, calls=1, period=60, capacidade=2)
+
+            bucket_1.acquire(timeout=0)
+            bucket_2.acquire(timeout=0)
+            self.assertLess(bucket_1.disponivel, 1)
+            with self.assertRaises(RateLimitException):
+                bucket_2.acquire(timeout=0)
+
+    def test_nao_abre_conexao_ao_ser_criado(self):
+        with tempfile.TemporaryDirectory() as diretorio:
+            path = os.path.join(diretorio, "limite.db")
+            bucket = SqliteTokenBucket(path, calls=1, period=60)
+            self.assertFalse(os.path.exists(path))
+            bucket.acquire(timeout=0)
+            self.assertTrue(os.path.exists(path))
+
+    @unittest.skipUnless(hasattr(os, "fork"), "os.fork indisponível")
+    def test_processo_filho_abre_sua_propria_conexao(self):
+        with tempfile.TemporaryDirectory() as diretorio:
+            bucket = SqliteTokenBucket(os.path.join(diretorio, "limite.db"), calls=1, period=60, capacidade=2)
+            bucket.acquire(timeout=0)
+            conexao_do_pai = bucket._conexao()
+
+            pid = os.fork()
+            if pid == 0:
+                try:
+                    bucket.acquire(timeout=0)
+                    os._exit(0 if bucket._conexao() is not conexao_do_pai else 1)
+                except BaseException:
+                    os._exit(2)
+
+            _, status = os.waitpid(pid, 0)
+            self.assertEqual(os.WEXITSTATUS(status), 0)
+            # o filho consumiu o último token
+            with self.assertRaises(RateLimitException):
+                bucket.acquire(timeout=0)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,43 @@
+import unittest
+from email.utils import formatdate
+from time import time
+
+from escavador.retry import RetryPolicy
+
+
+class TestRetryPolicy(unittest.TestCase):
+    def test_get_com_status_transitorio_e_repetido(self):
+        politica = RetryPolicy(max_tentativas=3)
+        self.assertTrue(politica.deve_tentar_novamente("GET", 1, status=503))
+        self.assertTrue(politica.deve_tentar_novamente("GET", 2, status=429))
+        self.assertFalse(politica.deve_tentar_novamente("GET", 3, status=502))
+        self.assertFalse(politica.deve_tentar_novamente("GET", 1, status=404))
+        self.assertEqual(politica.estatisticas["retentativas"], 2)
+        self.assertEqual(politica.estatisticas["desistencias"], 1)
+
+    def test_post_so_e_repetido_com_429(self):
+        politica = RetryPolicy()
+        self.assertFalse(politica.deve_tentar_novamente("POST", 1, status=503))
+        self.assertFalse(politica.deve_tentar_novamente("POST", 1, erro=ConnectionError()))
+        self.assertTrue(politica.deve_tentar_novamente("POST", 1, status=429))
+
+    def test_espera_respeita_retry_after(self):
+        politica = RetryPolicy(backoff_inicial=0.1, jitter=False)
+        self.assertEqual(politica.espera(1), 0.1)
+        self.assertEqual(politica.espera(3), 0.4)
+        self.assertEqual(politica.espera(1, "7"), 7)
+        self.assertAlmostEqual(politica.espera(1, formatdate(time() + 10, usegmt=True)), 10, delta=1.5)
+        self.assertEqual(politica.espera(1, "600"), politica.backoff_maximo)
+
+    def test_amplificacao(self):
+        politica = RetryPolicy()
+        for tentativa in (1, 2, 1):
+            politica.registrar_tentativa(tentativa)
+        self.assertEqual(politica.estatisticas["requisicoes"], 2)
+        self.assertEqual(politica.estatisticas["amplificacao"], 1.5)
+        politica.zerar_estatisticas()
+        self.assertEqual(politica.estatisticas["tentativas"], 0)
+
+
+if __name__ == "__main__":
+    unittest.main()
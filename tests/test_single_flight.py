@@ -0,0 +1,128 @@
+import asyncio
+import threading
+import time
+import unittest
+from unittest.mock import patch
+
+from escavador.method import AsyncMethod, Method
+from escavador.resources.helpers.paralelo import executar_em_paralelo
+from escavador.single_flight import SingleFlight
+
+
+class TestSingleFlight(unittest.TestCase):
+    def test_agrupa_chamadas_simultaneas(self):
+        single_flight = SingleFlight()
+        chamadas = []
+
+        def funcao():
+            chamadas.append(1)
+            time.sleep(0.1)
+            return {"sucesso": True}
+
+        resultados = [
+            resultado
+            for _, resultado in executar_em_paralelo(
+                lambda _: single_flight.executar("chave", funcao), range(8), max_workers=8
+            )
+        ]
+
+        self.assertEqual(len(chamadas), 1)
+        self.assertTrue(all(resultado is resultados[0] for resultado in resultados))
+        self.assertEqual(single_flight.estatisticas, {"chamadas": 1, "agrupadas": 7})
+
+    def test_chaves_diferentes_nao_sao_agrupadas(self):
+        single_flight = SingleFlight()
+        resultados = executar_em_paralelo(
+            lambda chave: single_flight.executar(chave, lambda: chave), ["a", "b"], max_workers=2
+        )
+
+        self.assertEqual(dict(resultados), {"a": "a", "b": "b"})
+        self.assertEqual(single_flight.estatisticas["agrupadas"], 0)
+
+    def test_excecao_e_lancada_em_todas_as_chamadas(self):
+        single_flight = SingleFlight()
+        iniciada = threading.Event()
+        erros = []
+
+        def funcao():
+            iniciada.set()
+            time.sleep(0.1)
+            raise ConnectionError
+
+        def chamar():
+            try:
+                single_flight.executar("chave", funcao)
+            except ConnectionError as erro:
+                erros.append(erro)
+
+        lider = threading.Thread(target=chamar)
+        lider.start()
+        iniciada.wait()
+        chamar()
+        lider.join()
+
+        self.assertEqual(len(erros), 2)
+        # a chamada seguinte não reaproveita o erro
+        self.assertEqual(single_flight.executar("chave", lambda: "ok"), "ok")
+
+    def test_agrupa_corrotinas_simultaneas(self):
+        single_flight = SingleFlight()
+        chamadas = []
+
+        async def funcao():
+            chamadas.append(1)
+            await asyncio.sleep(0.05)
+            return {"sucesso": True}
+
+        async def executar():
+            return await asyncio.gather(*(single_flight.executar_async("chave", funcao) for _ in range(5)))
+
+        resultados = asyncio.run(executar())
+
+        self.assertEqual(len(chamadas), 1)
+        self.assertTrue(all(resultado is resultados[0] for resultado in resultados))
+
+
+class TestMethodSingleFlight(unittest.TestCase):
+    def test_get_agrupa_requisicoes_identicas(self):
+        resposta = {"resposta": {"numero_cnj": "0000000-00.0000.0.00.0000"}, "http_status": 200, "sucesso": True}
+
+        def request(*args, **kwargs):
+            time.sleep(0.1)
+            return resposta
+
+        with patch.object(Method, "single_flight", SingleFlight()), patch(
+            "escavador.api.Api.request", side_effect=request
+        ) as mock_request:
+            methods = Method(api_version=2)
+            list(executar_em_paralelo(
+                lambda _: methods.get("processos/numero_cnj/0000000-00.0000.0.00.0000"), range(4), max_workers=4
+            ))
+            methods.get("processos/numero_cnj/0000000-00.0000.0.00.0000", params={"cursor": "abc"})
+
+        self.assertEqual(mock_request.call_count, 2)
+
+    def test_async_get_agrupa_requisicoes_identicas(self):
+        resposta = {"resposta": {}, "http_status": 200, "sucesso": True}
+        chamadas = []
+
+        async def request(*args, **kwargs):
+            chamadas.append(args)
+            await asyncio.sleep(0.05)
+            return resposta
+
+        async def executar():
+            methods = AsyncMethod(api_version=2)
+            return await asyncio.gather(*(methods.get("envolvido/resumo", params={"nome": "a"}) for _ in range(3)))
+
+        with patch.object(Method, "single_flight", SingleFlight()), patch(
+            "escavador.api.AsyncApi.request", request
+        ):
+            resultados = asyncio.run(executar())
+
+        self.assertEqual(len(chamadas), 1)
+        self.assertEqual(resultados, [resposta] * 3)
+
+
+if __name__ == "__main__":
+    unittest.main()
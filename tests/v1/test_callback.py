@@ -0,0 +1,118 @@
+import os
+import tempfile
+import unittest
+from contextlib import ExitStack
+from datetime import datetime, timedelta
+from unittest.mock import patch
+
+from escavador.exceptions import FailedRequest
+from escavador.resources.helpers.checkpoint import FileCheckpointStore
+from escavador.v1 import Callback
+
+INICIO = datetime(2023, 1, 1)
+
+
+def _resposta(items, proxima=None):
+    resposta = {"items": items, "links": {"next": proxima}}
+    return {"resposta": resposta, "http_status": 200, "sucesso": True}
+
+
+class CallbacksFalsos(object):
+    """Simula a listagem de callbacks: um callback por dia, dois por página."""
+
+    def __init__(self, dias=4):
+        self.callbacks = [
+            {"id": dia + 1, "evento": "teste", "created_at": INICIO + timedelta(days=dia, hours=12)}
+            for dia in range(dias)
+        ]
+        self.marcados = []
+
+    def listar(self, *, data_minima, data_maxima, **filtros):
+        itens = [c for c in self.callbacks if data_minima <= c["created_at"] <= data_maxima]
+        return self.pagina(itens, 0)
+
+    def pagina(self, itens, inicio):
+        proxima = None
+        if inicio + 2 < len(itens):
+            proxima = f"https://api.escavador.com/api/v1/callbacks?page={inicio // 2 + 2}"
+            self.restante = itens
+        return _resposta(itens[inicio:inicio + 2], proxima)
+
+    def get(self, url, **kwargs):
+        pagina = int(url.split("page=")[1])
+        return self.pagina(self.restante, (pagina - 1) * 2)
+
+    def marcar_recebido(self, ids):
+        self.marcados.append(list(ids))
+        return {"resposta": {}, "http_status": 200, "sucesso": True}
+
+    def patch(self) -> ExitStack:
+        patches = ExitStack()
+        patches.enter_context(patch.object(Callback, "callbacks", side_effect=self.listar))
+        patches.enter_context(patch.object(Callback.methods, "get", side_effect=self.get))
+        patches.enter_context(patch.object(Callback, "marcarRecebido", side_effect=self.marcar_recebido))
+        return patches
+
+
+class TestCallback(unittest.TestCase):
+    def test_callbacks_sem_status(self):
+        with patch.object(Callback.methods, "get", return_value=_resposta([])) as get:
+            Callback.callbacks(evento="teste")
+        self.assertIsNone(get.call_args.kwargs["params"]["status"])
+
+    def test_drenar_em_lotes(self):
+        falsos = CallbacksFalsos(dias=5)
+        processados = []
+        with falsos.patch():
+            resultado = Callback.drenar(
+                lambda callback: processados.append(callback["id"]),
+                data_minima=INICIO,
+                data_maxima=INICIO + timedelta(days=5),
+                janela=timedelta(days=3),
+                tamanho_lote=2,
+            )
+
+        self.assertEqual(sorted(processados), [1, 2, 3, 4, 5])
+        self.assertEqual(resultado.janelas, 2)
+        self.assertEqual(resultado.confirmados, 5)
+        self.assertTrue(all(len(lote) <= 2 for lote in falsos.marcados))
+        self.assertEqual(resultado.marca, INICIO + timedelta(days=5))
+
+    def test_drenar_retoma_do_checkpoint_sem_passar_de_falhas(self):
+        falsos = CallbacksFalsos(dias=4)
+        with tempfile.TemporaryDirectory() as diretorio:
+            store = FileCheckpointStore(os.path.join(diretorio, "checkpoints"))
+
+            def handler(callback):
+                if callback["id"] == 3:
+                    raise ValueError("falhou")
+
+            with falsos.patch():
+                kwargs = dict(data_minima=INICIO, data_maxima=INICIO + timedelta(days=4), store=store)
+                resultado = Callback.drenar(handler, janela=timedelta(days=1), **kwargs)
+                self.assertEqual([callback["id"] for callback, _ in resultado.falhas], [3])
+                self.assertEqual(resultado.marca, INICIO + timedelta(days=2))
+                self.assertEqual(store.carregar("callbacks").cursor, "2023-01-03 00:00:00")
+
+                processados = []
+                resultado = Callback.drenar(
+                    lambda callback: processados.append(callback["id"]),
+                    janela=timedelta(days=1),
+                    **kwargs,
+                )
+
+        self.assertEqual(processados, [3, 4])
+        self.assertEqual(resultado.marca, INICIO + timedelta(days=4))
+
+    def test_falha_ao_marcar_recebido(self):
+        falsos = CallbacksFalsos(dias=1)
+        erro = {"resposta": {"error": "Erro"}, "http_status": 500, "sucesso": False}
+        with falsos.patch(), patch.object(Callback, "marcarRecebido", return_value=erro):
+            with self.assertRaises(FailedRequest):
+                Callback.drenar(
+                    lambda callback: None, data_minima=INICIO, data_maxima=INICIO + timedelta(days=1)
+                )
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,83 @@
+import os
+import tempfile
+import unittest
+from unittest.mock import patch
+
+from escavador.resources.helpers.documento import Documento
+from escavador.v1 import DiarioOficial
+
+
+def _pagina(total):
+    resposta = {"id": 1, "paginador": {"current_page": 1, "last_page": total}}
+    return {"resposta": resposta, "http_status": 200, "sucesso": True}
+
+
+class TestDiarioOficialBaixarEdicao(unittest.TestCase):
+    def setUp(self):
+        self.diretorio = tempfile.TemporaryDirectory()
+        self.baixadas = []
+
+    def tearDown(self):
+        self.diretorio.cleanup()
+
+    def baixar(self, url, destino, **kwargs):
+        pagina = int(url.split("/")[-2])
+        self.baixadas.append(pagina)
+        if pagina == 3:
+            return {"resposta": {"error": "Não encontrado"}, "http_status": 404, "sucesso": False}
+        return Documento.salvar_stream([b"pdf %d" % pagina], destino)
+
+    def baixar_edicao(self, **kwargs):
+        with patch.object(DiarioOficial, "pagina", return_value=_pagina(4)), patch.object(
+            DiarioOficial.methods, "baixar", side_effect=self.baixar
+        ):
+            return DiarioOficial.baixar_edicao(1, self.diretorio.name, max_workers=2, **kwargs)
+
+    def test_baixa_todas_as_paginas(self):
+        relatorio = self.baixar_edicao()
+
+        self.assertEqual(relatorio.paginas, 4)
+        self.assertEqual(relatorio.baixadas, 3)
+        self.assertEqual(list(relatorio.falhas), [3])
+        self.assertEqual(relatorio.bytes, 15)
+        self.assertEqual(
+            sorted(os.listdir(self.diretorio.name)), ["pagina_0001.pdf", "pagina_0002.pdf", "pagina_0004.pdf"]
+        )
+
+    def test_retoma_sem_baixar_paginas_existentes(self):
+        self.baixar_edicao()
+        temporario = os.path.join(self.diretorio.name, ".pagina_0003.pdf.abc.tmp")
+        open(temporario, "wb").close()
+        self.baixadas.clear()
+
+        relatorio = self.baixar_edicao(paginas=[1, 2, 3, 3])
+
+        self.assertEqual(self.baixadas, [3])
+        self.assertEqual(relatorio.paginas, 3)
+        self.assertEqual(relatorio.existentes, 2)
+        # pode ser o download em andamento de outra execução no mesmo diretório
+        self.assertTrue(os.path.exists(temporario))
+
+    def test_quantidade_paginas(self):
+        with patch.object(DiarioOficial, "pagina", return_value=_pagina(12)):
+            self.assertEqual(DiarioOficial.quantidade_paginas(1), 12)
+
+    def test_quantidade_paginas_desconhecida(self):
+        for conteudo in ({"id": 1}, {"id": 1, "paginador": {"current_page": 1, "total": 300}}):
+            resposta = {"resposta": conteudo, "http_status": 200, "sucesso": True}
+            with patch.object(DiarioOficial, "pagina", return_value=resposta):
+                with self.assertRaises(ValueError):
+                    DiarioOficial.quantidade_paginas(1)
+
+
+class TestDiarioOficialDownloadPdfPagina(unittest.TestCase):
+    def test_sem_destino_retorna_erro(self):
+        with patch.object(DiarioOficial.methods, "baixar") as baixar:
+            resultado = DiarioOficial.download_pdf_pagina(1, 2)
+
+        self.assertIn("error", resultado)
+        baixar.assert_not_called()
+
+
+if __name__ == "__main__":
+    unittest.main()
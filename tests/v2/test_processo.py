@@ -1,5 +1,15 @@
+import asyncio
+import pickle
+import tempfile
 import unittest
-from escavador.v2 import Processo
+from unittest.mock import patch
+
+from escavador.cache import SqliteResponseCache
+from escavador.exceptions import FailedRequest
+from escavador.method import Method
+from escavador.v2 import Processo, MarcaMovimentacoes
+from escavador.v2.resources.movimentacao import SincronizacaoMovimentacoes
+from escavador.v2.resources.processo import SolicitacaoAtualizacao, StatusAtualizacao
 
 
 class TestProcesso(unittest.TestCase):
@@ -225,5 +235,294 @@ class TestProcesso(unittest.TestCase):
         self.assertEqual(fonte.tribunal.categoria, None)
 
 
+class TestProcessoLazy(unittest.TestCase):
+    JSON_PROCESSO = {
+        "numero_cnj": "0000000-00.0000.0.00.0000",
+        "ano_inicio": 2023,
+        "data_ultima_movimentacao": "2023-04-01",
+        "match_fontes": {"tribunal": True, "diario_oficial": False},
+        "estado_origem": {"nome": "Roraima", "sigla": "RR"},
+        "fontes": [
+            {
+                "id": 1,
+                "processo_fonte_id": 2,
+                "descricao": "TRF1 - 1º grau",
+                "nome": "Tribunal Regional Federal da 1ª Região",
+                "sigla": "TRF1",
+                "tipo": "TRIBUNAL",
+                "grau": 1,
+                "grau_formatado": "Primeiro Grau",
+                "data_inicio": "2023-04-01",
+                "data_ultima_movimentacao": "2023-04-01",
+                "fisico": False,
+                "sistema": "PJE",
+                "quantidade_movimentacoes": 1,
+                "quantidade_envolvidos": 0,
+                "url": None,
+                "tribunal": {"id": 5, "nome": "Tribunal Regional Federal da 1ª Região", "sigla": "TRF1"},
+                "capa": {
+                    "assunto_principal_normalizado": None,
+                    "classe": "AUTO DE PRISAO EM FLAGRANTE",
+                    "assunto": None,
+                    "area": None,
+                    "orgao_julgador": None,
+                    "data_distribuicao": None,
+                    "data_arquivamento": None,
+                    "valor_causa": None,
+                },
+            }
+        ],
+    }
+
+    def test_campos_aninhados_construidos_no_primeiro_acesso(self):
+        processo = Processo.from_json(self.JSON_PROCESSO, lazy=True)
+
+        self.assertEqual(processo.numero_cnj, "0000000-00.0000.0.00.0000")
+        with patch("escavador.v2.resources.processo.FonteProcesso.from_json") as from_json:
+            self.assertEqual(processo.data_ultima_movimentacao, "2023-04-01")
+            from_json.assert_not_called()
+
+        fonte = processo.fontes[0]
+        self.assertIs(processo.fontes[0], fonte)
+        self.assertEqual(processo.estado_origem.sigla, "RR")
+        self.assertTrue(processo.match_fontes.tribunal)
+        self.assertEqual(fonte.capa.classe, "AUTO DE PRISAO EM FLAGRANTE")
+        self.assertEqual(fonte.tribunal.sigla, "TRF1")
+        self.assertEqual(fonte.envolvidos, [])
+
+    def test_lazy_equivale_ao_modo_padrao(self):
+        preguicoso = Processo.from_json(self.JSON_PROCESSO, lazy=True)
+        padrao = Processo.from_json(self.JSON_PROCESSO)
+
+        self.assertEqual(preguicoso, padrao)
+        self.assertEqual(repr(preguicoso), repr(padrao))
+        self.assertEqual(pickle.loads(pickle.dumps(preguicoso)).fontes, padrao.fontes)
+
+    def test_continuar_busca_mantem_modo_lazy(self):
+        resposta = {
+            "resposta": {
+                "advogado_encontrado": {"nome": "Fulano", "tipo": "ADVOGADO", "quantidade_processos": 2},
+                "items": [self.JSON_PROCESSO],
+                "links": {"next": "https://api.escavador.com/api/v2/advogado/processos?cursor=abc"},
+            },
+            "http_status": 200,
+            "sucesso": True,
+        }
+        with patch("escavador.method.Method.get", return_value=resposta):
+            advogado, processos = Processo.por_oab(1234, "SP", lazy=True)
+            mais_processos = processos.continuar_busca()
+            pelo_advogado = advogado.continuar_busca()
+
+        for processo in (processos[0], mais_processos[0], pelo_advogado[0]):
+            self.assertIsNotNone(processo._json)
+            self.assertEqual(processo.fontes[0].sigla, "TRF1")
+
+
+class TestProcessoMovimentacoesNovas(unittest.TestCase):
+    @staticmethod
+    def _paginas(ids_por_pagina):
+        respostas = []
+        for i, ids in enumerate(ids_por_pagina):
+            proxima = (
+                f"https://api.escavador.com/api/v2/processos/numero_cnj/1/movimentacoes?cursor={i + 1}"
+                if i + 1 < len(ids_por_pagina)
+                else ""
+            )
+            itens = [{"id": id_, "data": f"2023-01-{id_:02d}"} for id_ in ids]
+            resposta = {"items": itens, "links": {"next": proxima}}
+            respostas.append({"resposta": resposta, "http_status": 200, "sucesso": True})
+        return respostas
+
+    def test_para_na_primeira_movimentacao_ja_vista(self):
+        marca = MarcaMovimentacoes(id=6, data="2023-01-06")
+        paginas = self._paginas([[9, 8, 7], [6, 5, 4], [3]])
+        with patch("escavador.method.Method.get", side_effect=paginas) as get:
+            resultado = Processo.movimentacoes_novas("1", marca)
+
+        self.assertEqual([movimentacao.id for movimentacao in resultado.novas], [9, 8, 7])
+        self.assertEqual(resultado.marca, MarcaMovimentacoes(id=9, data="2023-01-09"))
+        self.assertEqual(resultado.paginas, 2)
+        self.assertEqual(get.call_count, 2)
+
+    def test_sem_marca_busca_tudo(self):
+        with patch("escavador.method.Method.get", side_effect=self._paginas([[3, 2], [1]])):
+            resultado = Processo.movimentacoes_novas("1")
+
+        self.assertEqual([movimentacao.id for movimentacao in resultado.novas], [3, 2, 1])
+        self.assertEqual(resultado.marca.id, 3)
+
+    def test_marca_por_data(self):
+        marca = MarcaMovimentacoes.from_json({"data": "2023-01-02"})
+        with patch("escavador.method.Method.get", side_effect=self._paginas([[3, 2, 1]])):
+            resultado = Processo.movimentacoes_novas("1", marca)
+
+        self.assertEqual([movimentacao.id for movimentacao in resultado.novas], [3, 2])
+
+    def test_sem_novidades_mantem_marca(self):
+        marca = MarcaMovimentacoes(id=3, data="2023-01-03")
+        with patch("escavador.method.Method.get", side_effect=self._paginas([[3, 2], [1]])) as get:
+            resultado = Processo.movimentacoes_novas("1", marca)
+
+        self.assertEqual(resultado.novas, [])
+        self.assertIs(resultado.marca, marca)
+        self.assertEqual(get.call_count, 1)
+
+    def test_sincronizar_varios_processos(self):
+        def movimentacoes_novas(numero_cnj, marca, **kwargs):
+            if numero_cnj == "erro":
+                raise FailedRequest(status=404, code="NOT_FOUND")
+            return SincronizacaoMovimentacoes(numero_cnj=numero_cnj, novas=[], marca=marca)
+
+        marcas = {"1": MarcaMovimentacoes(id=1), "2": None, "erro": None}
+        with patch.object(Processo, "movimentacoes_novas", movimentacoes_novas):
+            resultados = dict(Processo.sincronizar_movimentacoes(marcas, max_workers=2))
+
+        self.assertEqual(resultados["1"].marca, MarcaMovimentacoes(id=1))
+        self.assertIsNone(resultados["2"].marca)
+        self.assertIsInstance(resultados["erro"], FailedRequest)
+
+
+class TestProcessoPorNumeros(unittest.TestCase):
+    def test_por_numeros(self):
+        def por_numero(numero_cnj, **kwargs):
+            if numero_cnj.startswith("9"):
+                raise FailedRequest(status=404, code="NOT_FOUND")
+            return Processo.from_json({"numero_cnj": numero_cnj})
+
+        numeros = [f"{i}000000-00.0000.0.00.0000" for i in range(10)]
+        with patch.object(Processo, "por_numero", por_numero):
+            resultados = list(Processo.por_numeros(numeros, max_workers=3, ordenado=True))
+
+        self.assertEqual([numero for numero, _ in resultados], numeros)
+        for numero, processo in resultados[:-1]:
+            self.assertEqual(processo.numero_cnj, numero)
+        self.assertIsInstance(resultados[-1][1], FailedRequest)
+
+
+class TestProcessoAtualizarEmLote(unittest.TestCase):
+    def setUp(self):
+        self.consultas = {}
+
+    def solicitar_atualizacao(self, numero_cnj, **kwargs):
+        if numero_cnj == "erro":
+            raise FailedRequest(status=402, code="SEM_CREDITOS")
+        return self.solicitacao(numero_cnj, 10, "PENDENTE")
+
+    def status_atualizacao(self, numero_cnj):
+        self.consultas[numero_cnj] = self.consultas.get(numero_cnj, 0) + 1
+        # "lento" só termina na terceira consulta, "antigo" ainda mostra a solicitação anterior
+        if numero_cnj == "antigo":
+            ultima = self.solicitacao(numero_cnj, 9, "SUCESSO")
+        elif numero_cnj == "lento" and self.consultas[numero_cnj] < 3:
+            ultima = self.solicitacao(numero_cnj, 10, "PENDENTE")
+        else:
+            ultima = self.solicitacao(numero_cnj, 10, "SUCESSO")
+        return StatusAtualizacao(numero_cnj, "2023-01-01", "há 1 minuto", ultima)
+
+    @staticmethod
+    def solicitacao(numero_cnj, id, status):
+        return SolicitacaoAtualizacao(id, status, "2023-01-01", numero_cnj)
+
+    def atualizar(self, numeros, **kwargs):
+        def por_numero(numero_cnj, **kwargs):
+            return Processo.from_json({"numero_cnj": numero_cnj})
+
+        with patch.object(Processo, "por_numero", por_numero):
+            return self.atualizar_sem_buscar(numeros, **kwargs)
+
+    def atualizar_sem_buscar(self, numeros, **kwargs):
+        with patch.object(Processo, "solicitar_atualizacao", self.solicitar_atualizacao), patch.object(
+            Processo, "status_atualizacao", self.status_atualizacao
+        ):
+            eventos = Processo.atualizar_em_lote(numeros, **kwargs)
+            return {evento.numero_cnj: evento for evento in eventos}
+
+    def test_atualizar_em_lote(self):
+        eventos = self.atualizar(["rapido", "lento", "rapido", "erro"], intervalo_minimo=0)
+
+        self.assertEqual(set(eventos), {"rapido", "lento", "erro"})
+        self.assertTrue(eventos["rapido"].sucesso)
+        self.assertEqual(eventos["rapido"].processo.numero_cnj, "rapido")
+        self.assertEqual(eventos["rapido"].verificacoes, 1)
+        self.assertEqual(eventos["lento"].verificacoes, 3)
+        self.assertEqual(eventos["lento"].solicitacao.status, "SUCESSO")
+        self.assertEqual(eventos["erro"].status, "ERRO")
+        self.assertEqual(eventos["erro"].erro.code, "SEM_CREDITOS")
+
+    def test_tempo_esgotado(self):
+        eventos = self.atualizar(
+            ["antigo"], intervalo_minimo=0, tempo_maximo=0, buscar_processo=False
+        )
+
+        self.assertEqual(eventos["antigo"].status, "TEMPO_ESGOTADO")
+        self.assertEqual(eventos["antigo"].solicitacao.id, 10)
+        self.assertIsNone(eventos["antigo"].processo)
+
+    def test_processo_atualizado_nao_vem_do_cache(self):
+        numero_cnj = "0000000-00.0000.0.00.0000"
+        antigo = {"resposta": {"numero_cnj": numero_cnj, "titulo_polo_ativo": "antigo"}, "http_status": 200,
+                  "sucesso": True}
+        novo = {"resposta": {"numero_cnj": numero_cnj, "titulo_polo_ativo": "novo"}, "http_status": 200,
+                "sucesso": True}
+        with tempfile.TemporaryDirectory() as diretorio:
+            cache = SqliteResponseCache(f"{diretorio}/cache.db")
+            with patch.object(Method, "cache", cache), patch("escavador.api.Api.request", return_value=antigo):
+                Processo.por_numero(numero_cnj)
+            with patch.object(Method, "cache", cache), patch("escavador.api.Api.request", return_value=novo):
+                eventos = self.atualizar_sem_buscar([numero_cnj], intervalo_minimo=0)
+                # a resposta nova também substitui a do cache
+                self.assertEqual(Processo.por_numero(numero_cnj).titulo_polo_ativo, "novo")
+
+        self.assertEqual(eventos[numero_cnj].processo.titulo_polo_ativo, "novo")
+
+
+class TestProcessoAsync(unittest.TestCase):
+    @staticmethod
+    def _mock_get(resposta):
+        async def get(self, url, **kwargs):
+            return resposta
+
+        return get
+
+    def test_por_numero_async(self):
+        resposta = {
+            "resposta": {"numero_cnj": "0000000-00.0000.0.00.0000", "fontes": []},
+            "http_status": 200,
+            "sucesso": True,
+        }
+        with patch("escavador.method.AsyncMethod.get", self._mock_get(resposta)):
+            processo = asyncio.run(Processo.por_numero_async("0000000-00.0000.0.00.0000"))
+        self.assertIsInstance(processo, Processo)
+        self.assertEqual(processo.numero_cnj, "0000000-00.0000.0.00.0000")
+
+    def test_por_numero_async_falha(self):
+        resposta = {
+            "resposta": {"code": "NOT_FOUND", "message": "Processo não encontrado"},
+            "http_status": 404,
+            "sucesso": False,
+        }
+        with patch("escavador.method.AsyncMethod.get", self._mock_get(resposta)):
+            with self.assertRaises(FailedRequest) as contexto:
+                asyncio.run(Processo.por_numero_async("0000000-00.0000.0.00.0000"))
+        self.assertEqual(contexto.exception, 404)
+
+    def test_por_oab_async_continua_busca(self):
+        resposta = {
+            "resposta": {
+                "advogado_encontrado": {"nome": "Fulano", "tipo": "ADVOGADO", "quantidade_processos": 2},
+                "items": [{"numero_cnj": "0000000-00.0000.0.00.0000"}],
+                "links": {"next": "https://api.escavador.com/api/v2/advogado/processos?cursor=abc"},
+            },
+            "http_status": 200,
+            "sucesso": True,
+        }
+        with patch("escavador.method.AsyncMethod.get", self._mock_get(resposta)):
+            advogado, processos = asyncio.run(Processo.por_oab_async(1234, "SP"))
+            mais_processos = asyncio.run(processos.continuar_busca_async())
+        self.assertEqual(advogado.nome, "Fulano")
+        self.assertEqual(len(processos), 1)
+        self.assertEqual(len(mais_processos), 1)
+
+
 if __name__ == "__main__":
     unittest.main()